@@ -0,0 +1,196 @@
+"""
+SUMMARY: Google Drive API call profiler with quota accounting.  Hooks the Drive service's transport (see
+    add_transport_hook in Selenium_googleDriveTestUpload_DriveAPI), so every Drive API request made by the folder, file
+    and clean up helpers is recorded with its API method (ex: files.list), query (q), latency, response size (bytes on
+    the wire, gzip compressed), status and the test step it was made in (the innermost span open, see
+    Selenium_googleDriveTestUpload_Metrics).
+
+    The report gives the calls per step, per API method and for the whole run, with the estimated quota used: the Drive
+    API quota counts queries, each request is 1 query and each request inside a batch is 1 query (the batch itself is
+    not counted).  Throttled requests (429, or a rate limit error) are counted separately, to show which helpers
+    account for the volume when the account is being throttled.
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+import json
+import logging
+import re
+import threading
+from urllib.parse import parse_qs, urlsplit
+from Selenium_googleDriveTestUpload_DriveAPI import add_transport_hook, remove_transport_hook
+from Selenium_googleDriveTestUpload_Metrics import current_span_name, percentile
+
+logger = logging.getLogger('seleniumTest.apiProfiler')  # Drive API profiler logger
+
+# Global variables
+API_NO_STEP = "(no step)"  # step name of the calls made outside of any span
+API_BATCH_PART = re.compile(rb"content-type:\s*application/http", re.IGNORECASE)  # one per request in a batch body
+API_BATCH_429 = re.compile(rb"^HTTP/1\.1 429", re.MULTILINE)  # throttled request in a batch response
+API_RATE_LIMIT = re.compile(rb'"reason":\s*"(user)?rateLimitExceeded"', re.IGNORECASE)  # 403/429 rate limit error
+API_PATHS = [  # (HTTP method, URL path pattern, API method), first match wins
+    ("POST", r"/batch/drive/v3$", "batch"),
+    ("POST", r"/upload/drive/v3/files$", "files.create (upload)"),
+    ("GET", r"/drive/v3/files$", "files.list"),
+    ("POST", r"/drive/v3/files$", "files.create"),
+    ("GET", r"/drive/v3/files/[^/]+$", "files.get"),
+    ("PATCH", r"/drive/v3/files/[^/]+$", "files.update"),
+    ("DELETE", r"/drive/v3/files/[^/]+$", "files.delete"),
+    ("GET", r"/drive/v3/changes/startPageToken$", "changes.getStartPageToken"),
+    ("GET", r"/drive/v3/changes$", "changes.list"),
+    ("GET", r"/drive/v3/about$", "about.get"),
+]
+
+_api_records = []  # [{'method': str, 'q': str, 'step': str, 'status': int, 'seconds': float, ...}]
+_api_records_lock = threading.Lock()
+
+
+def api_method(http_method: str, uri: str):
+    """
+    Gets the Drive API method (ex: files.list) of a request, from its HTTP method and URL.
+
+    :param http_method: HTTP method (ex: "GET")
+    :type http_method: str
+    :param uri: Request URL
+    :type uri: str
+    :return: API method (see API_PATHS), or "<HTTP method> <path>" if it isn't a known Drive API method
+    :rtype: str
+    """
+
+    path = urlsplit(uri).path
+    for method, pattern, name in API_PATHS:
+        if http_method.upper() == method and re.search(pattern, path):
+            return name
+    return f"{http_method.upper()} {path}"
+
+
+def get_api_records():
+    """
+    Gets the Drive API calls recorded so far, in the order they finished.
+
+    :return: List of calls, {'method': 'files.list', 'q': "name = 'x'", 'step': 'validate folder', 'status': 200,
+        'seconds': 0.18, 'bytes_sent': 0, 'bytes_received': 412, 'batch_parts': 0, 'quota_units': 1,
+        'throttled': 0 (number of throttled requests, a batch can have several)}
+    :rtype: list
+    """
+
+    with _api_records_lock:
+        return list(_api_records)
+
+
+def reset_api_records():
+    """
+    Clears the recorded Drive API calls (ex: at the start of a test run).
+    """
+
+    with _api_records_lock:
+        _api_records.clear()
+
+
+def start_api_profiler():
+    """
+    Starts recording every Drive API call (see get_api_records).  Calling it again while it is running does nothing.
+    """
+
+    remove_transport_hook(_record_api_call)  # never added twice
+    add_transport_hook(_record_api_call)
+    logger.debug("Profiling the Drive API calls")
+
+
+def stop_api_profiler():
+    """
+    Stops recording Drive API calls, the calls already recorded are kept.
+    """
+
+    remove_transport_hook(_record_api_call)
+
+
+def summarize_api_calls(records: list = None):
+    """
+    Summarizes the Drive API calls for the whole run, per step and per API method: calls, estimated quota units,
+    errors, throttled responses, bytes received and latency (total/p50/p95/max).
+
+    :param records: Calls to summarize, defaults to every call recorded so far
+    :type records: list
+    :return: {'run': {stats}, 'steps': {'validate folder': {stats}}, 'methods': {'files.list': {stats}}}, steps and
+        methods sorted by quota units (most first)
+    :rtype: dict
+    """
+
+    records = get_api_records() if records is None else records
+
+    def stats(group: list):
+        seconds = [record['seconds'] for record in group]
+        return {'calls': len(group), 'quota_units': sum(record['quota_units'] for record in group),
+                'errors': sum(record['status'] >= 400 for record in group),
+                'throttled': sum(record['throttled'] for record in group),
+                'bytes_received': sum(record['bytes_received'] for record in group),
+                'total': sum(seconds), 'p50': percentile(seconds, 50), 'p95': percentile(seconds, 95),
+                'max': max(seconds, default=None)}
+
+    def by(key: str):
+        groups = {}
+        for record in records:
+            groups.setdefault(record[key], []).append(record)
+        summary = {name: stats(group) for name, group in groups.items()}
+        return dict(sorted(summary.items(), key=lambda item: item[1]['quota_units'], reverse=True))
+
+    return {'run': stats(records), 'steps': by('step'), 'methods': by('method')}
+
+
+def write_api_report(filename: str, run_id: str = "", records: list = None):
+    """
+    Writes the Drive API report (JSON): the summary (see summarize_api_calls) and every call.  The summary is also
+    logged.
+
+    :param filename: JSON report file (ex: "seleniumTestGoogleDriveUpload_api.json")
+    :type filename: str
+    :param run_id: ID of the test run, saved in the report
+    :type run_id: str
+    :param records: Calls to report, defaults to every call recorded so far
+    :type records: list
+    :return: The summary
+    :rtype: dict
+    """
+
+    records = get_api_records() if records is None else records
+    summary = summarize_api_calls(records=records)
+
+    with open(filename, "w") as file:
+        json.dump({'run_id': run_id, 'summary': summary, 'calls': records}, file, indent=2)
+
+    run = summary['run']
+    logger.info(f"Drive API: {run['calls']} call(s), ~{run['quota_units']} quota unit(s), {run['errors']} error(s), "
+                f"{run['throttled']} throttled, {run['bytes_received']:,} bytes received, total {run['total']:.2f} "
+                f"second(s)")
+    for step, step_stats in summary['steps'].items():
+        logger.info(f"Drive API step '{step}': {step_stats['calls']} call(s), ~{step_stats['quota_units']} quota "
+                    f"unit(s), {step_stats['throttled']} throttled, total {step_stats['total']:.2f} second(s)")
+    logger.info(f"Drive API report written to '{filename}'")
+
+    return summary
+
+
+def _record_api_call(request: dict):
+    """Transport hook: records one Drive API request (see add_transport_hook for the request's fields)"""
+
+    method = api_method(http_method=request['method'], uri=request['uri'])
+    body = request.get('request_body') or b""
+    body = body if isinstance(body, bytes) else body.encode()
+    content = request.get('response_body') or b""
+
+    # throttled requests: a batch answers each of its requests separately, 403 is also used for permission errors
+    if method == "batch":
+        batch_parts = len(API_BATCH_PART.findall(body))
+        throttled = max(len(API_BATCH_429.findall(content)), len(API_RATE_LIMIT.findall(content)))
+    else:
+        batch_parts = 0
+        throttled = int(request['status'] == 429 or bool(API_RATE_LIMIT.search(content)))
+
+    record = {'method': method, 'q': parse_qs(urlsplit(request['uri']).query).get('q', [""])[0],
+              'step': current_span_name() or API_NO_STEP, 'status': request['status'],
+              'seconds': request['seconds'], 'bytes_sent': request['bytes_sent'],
+              'bytes_received': request['bytes_received'], 'batch_parts': batch_parts,
+              'quota_units': batch_parts if method == "batch" else 1, 'throttled': throttled}
+
+    with _api_records_lock:
+        _api_records.append(record)
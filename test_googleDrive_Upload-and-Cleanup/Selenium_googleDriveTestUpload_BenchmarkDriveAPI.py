@@ -0,0 +1,135 @@
+"""
+SUMMARY: Offline benchmark/load test of the Google Drive API paths (validations and clean up), against the local mock
+    Drive API (see Selenium_googleDriveTestUpload_MockDrive), so it needs no network and no credentials and every run
+    is repeatable.  The mock is seeded with test folders/files tagged with a run ID, and each scenario is timed and
+    profiled (API calls and quota units, see Selenium_googleDriveTestUpload_APIProfiler):
+        - validate files by ID, one after the other (validate_file_exists)
+        - validate files by ID, concurrently (validate_files_exist_async)
+        - validate files by name, in combined queries (validate_files_exist)
+        - clean up, batched deletes (cleanup_test)
+        - clean up, concurrent deletes (cleanup_test with use_async)
+
+    The mock's latency, rate limit and error rate are set with the parameters, ex: a rate limit shows how each path
+    behaves when the account is throttled.
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+import asyncio
+import json
+import logging
+import time
+from Selenium_googleDriveTestUpload_APIProfiler import (reset_api_records, start_api_profiler, stop_api_profiler,
+                                                        summarize_api_calls)
+from Selenium_googleDriveTestUpload_CleanUpTest import cleanup_test
+from Selenium_googleDriveTestUpload_DriveAPI import (MIMETYPE_FOLDER, new_run_id, RUN_ID_PROPERTY,
+                                                     set_drive_api_endpoint)
+from Selenium_googleDriveTestUpload_DriveAsync import validate_files_exist_async
+from Selenium_googleDriveTestUpload_Files import validate_file_exists, validate_files_exist
+from Selenium_googleDriveTestUpload_Logging import start_logging
+from Selenium_googleDriveTestUpload_MockDrive import (mock_drive_add_item, mock_drive_items, start_mock_drive,
+                                                      stop_mock_drive)
+
+logger = logging.getLogger('seleniumTest.benchmarkDriveAPI')  # drive API benchmark logger
+
+# Global variables
+BENCHMARK_FOLDERS = 10  # test folders seeded per scenario
+BENCHMARK_FILES_PER_FOLDER = 10  # test files seeded in each test folder
+BENCHMARK_LOOSE_FILES = 300  # test files seeded outside of the test folders (ex: failed uploads), each one is deleted
+BENCHMARK_VALIDATE_FILES = 50  # files validated by the validation scenarios
+BENCHMARK_RESULTS_FILE = "seleniumTestGoogleDriveUpload_benchmarkDriveAPI.json"
+
+
+def benchmark_drive_api(latency_sec: float = 0.05, jitter_sec: float = 0.02, rate_limit_per_sec: float = 0,
+                        error_rate: float = 0, seed: int = 0, results_file: str = BENCHMARK_RESULTS_FILE):
+    """
+    Runs each scenario against a freshly seeded mock Drive API and reports its duration and API calls.
+
+    :param latency_sec: Latency the mock adds to every HTTP request
+    :type latency_sec: float
+    :param jitter_sec: Random 0 to jitter_sec seconds the mock adds to the latency
+    :type jitter_sec: float
+    :param rate_limit_per_sec: API calls per second the mock allows (0 for no limit)
+    :type rate_limit_per_sec: float
+    :param error_rate: Fraction (0 to 1) of API calls the mock answers with a 500 error
+    :type error_rate: float
+    :param seed: Seed of the mock's random generator, for repeatable runs
+    :type seed: int
+    :param results_file: JSON file the results are written to (empty to not write one)
+    :type results_file: str
+    :return: Results per scenario, {'clean up (batch)': {'seconds': 1.2, 'calls': 5, 'quota_units': 311, ...}}
+    :rtype: dict
+    """
+
+    server = start_mock_drive(latency_sec=latency_sec, jitter_sec=jitter_sec, rate_limit_per_sec=rate_limit_per_sec,
+                              error_rate=error_rate, seed=seed)
+    set_drive_api_endpoint(server.url)
+    start_api_profiler()
+
+    scenarios = {
+        'validate files by ID (serial)': lambda seeded: [validate_file_exists(file_id=file_id)
+                                                         for file_id in seeded['file_ids']],
+        'validate files by ID (async)': lambda seeded: asyncio.run(validate_files_exist_async(
+            file_ids=seeded['file_ids'])),
+        'validate files by name (combined queries)': lambda seeded: validate_files_exist(
+            filenames=seeded['filenames']),
+        'clean up (batch)': lambda seeded: cleanup_test(servicename="", username="", run_id=seeded['run_id']),
+        'clean up (async)': lambda seeded: cleanup_test(servicename="", username="", run_id=seeded['run_id'],
+                                                        use_async=True),
+    }
+
+    results = {}
+    try:
+        for name, scenario in scenarios.items():
+            seeded = _seed_mock_drive(server)
+            reset_api_records()
+
+            start = time.monotonic()
+            scenario(seeded)
+            seconds = time.monotonic() - start
+
+            run = summarize_api_calls()['run']
+            results[name] = {'seconds': seconds, 'calls': run['calls'], 'quota_units': run['quota_units'],
+                             'errors': run['errors'], 'throttled': run['throttled'],
+                             'items_left': sum(item.get('appProperties', {}).get(RUN_ID_PROPERTY) == seeded['run_id']
+                                               for item in mock_drive_items(server).values())}
+            logger.info(f"{name}: {seconds:.2f} second(s), {run['calls']} call(s), ~{run['quota_units']} quota "
+                        f"unit(s), {run['errors']} error(s), {run['throttled']} throttled")
+    finally:
+        stop_api_profiler()
+        set_drive_api_endpoint("")
+        stop_mock_drive(server)
+
+    if results_file:
+        with open(results_file, "w") as file:
+            json.dump({'mock': {'latency_sec': latency_sec, 'jitter_sec': jitter_sec,
+                                'rate_limit_per_sec': rate_limit_per_sec, 'error_rate': error_rate, 'seed': seed},
+                       'results': results}, file, indent=2)
+
+    return results
+
+
+def _seed_mock_drive(server):
+    """Seeds the mock with test folders/files tagged with a new run ID, returns what the scenarios need"""
+
+    run_id = new_run_id()
+    tag = {RUN_ID_PROPERTY: run_id}
+    files = []
+
+    for fld_num in range(BENCHMARK_FOLDERS):
+        folder = mock_drive_add_item(server, name=f"Testing Folder (Selenium) - {run_id}", mime_type=MIMETYPE_FOLDER,
+                                     app_properties=tag)
+        for file_num in range(BENCHMARK_FILES_PER_FOLDER):
+            files.append(mock_drive_add_item(server, name=f"testFile-{fld_num}-{file_num}.txt",
+                                             parents=[folder['id']], app_properties=tag,
+                                             content=f"test file {fld_num}-{file_num}".encode()))
+    for file_num in range(BENCHMARK_LOOSE_FILES):
+        mock_drive_add_item(server, name=f"testFile-loose-{file_num}.txt", app_properties=tag)
+
+    validate = files[:BENCHMARK_VALIDATE_FILES]
+    return {'run_id': run_id, 'file_ids': [item['id'] for item in validate],
+            'filenames': [item['name'] for item in validate]}
+
+
+if __name__ == "__main__":
+    start_logging(filename="seleniumTestGoogleDriveUpload_benchmarkDriveAPI.log")
+    benchmark_drive_api()
@@ -0,0 +1,104 @@
+"""
+SUMMARY: Offline benchmark of the UI steps of the upload test (the '+ New' button, the new folder dialog, the file
+    upload input and the waits/validations around them), against the local Drive UI replica (see
+    Selenium_googleDriveTestUpload_MockDriveUI) and the mock Drive API, so it needs no network, no credentials and no
+    login, and every run is repeatable.  Headless Chrome (the "performance" launch profile) runs the real upload
+    scenario (run_upload_scenario) a number of times, and the latency of each step (see
+    Selenium_googleDriveTestUpload_Metrics) and the WebDriver commands each step issues (see
+    Selenium_googleDriveTestUpload_CommandProfiler) are reported.
+
+    The replica's render delays and the mock's API latency are set with the parameters, ex: to see how a slower menu
+    or dialog changes the time spent waiting.
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+import json
+import logging
+from Selenium_googleDriveTestUpload_CommandProfiler import reset_command_records, summarize_commands
+from Selenium_googleDriveTestUpload_Connection import (configure_fortesting_googledrive, connect_googledrive,
+                                                       LAUNCH_PROFILE_BLOCK_DENY)
+from Selenium_googleDriveTestUpload_DriveAPI import new_run_id, set_drive_api_endpoint
+from Selenium_googleDriveTestUpload_ExecuteTest import run_upload_scenario
+from Selenium_googleDriveTestUpload_GoogleDrive_webItems import set_drive_web_url
+from Selenium_googleDriveTestUpload_Logging import start_logging
+from Selenium_googleDriveTestUpload_Metrics import reset_metrics, summarize_spans
+from Selenium_googleDriveTestUpload_MockDrive import start_mock_drive, stop_mock_drive
+from Selenium_googleDriveTestUpload_MockDriveUI import mock_drive_add_ui
+from Selenium_googleDriveTestUpload_Waits import get_wait_timings, reset_wait_timings
+
+logger = logging.getLogger('seleniumTest.benchmarkDriveUI')  # drive UI benchmark logger
+
+# Global variables
+BENCHMARK_RUNS = 5  # upload scenarios run on the one browser
+BENCHMARK_RESULTS_FILE = "seleniumTestGoogleDriveUpload_benchmarkDriveUI.json"
+
+
+def benchmark_drive_ui(runs: int = BENCHMARK_RUNS, latency_sec: float = 0.02, delays_sec: dict = None,
+                       results_file: str = BENCHMARK_RESULTS_FILE):
+    """
+    Runs the upload scenario runs times in headless Chrome against the Drive UI replica, and reports the latency and
+    WebDriver commands of each step.
+
+    :param runs: Number of upload scenarios
+    :type runs: int
+    :param latency_sec: Latency the mock Drive API adds to every HTTP request (pages and API calls)
+    :type latency_sec: float
+    :param delays_sec: Replica render delays to change, see mock_drive_configure_ui (ex: {'menu_delay_sec': 0.5})
+    :type delays_sec: dict
+    :param results_file: JSON file the results are written to (empty to not write one)
+    :type results_file: str
+    :return: {'steps': {'create folder': {'count': 5, 'p50': 1.4, ...}}, 'waits': {'new folder dialog to close':
+        {'count': 5, 'total': 2.1, 'timed_out': 0}}, 'commands': {'create folder': {'count': 14, ...}}}
+    :rtype: dict
+    """
+
+    server = start_mock_drive(latency_sec=latency_sec)
+    mock_drive_add_ui(server, **(delays_sec or {}))
+    set_drive_api_endpoint(server.url)
+    set_drive_web_url(server.url)
+
+    reset_metrics()
+    reset_command_records()
+    waits = {}
+
+    try:
+        # the replica needs no login: the home page shows the '+ New' button, so the login is skipped
+        chrome_options = configure_fortesting_googledrive(profile="performance")
+        driver = connect_googledrive(servicename="", username="", chrome_options=chrome_options, reuse_login=True,
+                                     profile_commands=True, block_deny=LAUNCH_PROFILE_BLOCK_DENY["performance"])
+        try:
+            for run in range(1, runs + 1):
+                logger.info(f"Benchmark run {run} of {runs}")
+                run_id = new_run_id()
+                reset_wait_timings()
+                run_upload_scenario(driver=driver, fldname="Testing Folder (Selenium)", run_id=run_id)
+
+                for timing in get_wait_timings():  # grouped across the runs, without the run ID
+                    wait = waits.setdefault(timing['description'].replace(run_id, "<run ID>"),
+                                            {'count': 0, 'total': 0, 'timed_out': 0})
+                    wait['count'] += 1
+                    wait['total'] += timing['seconds']
+                    wait['timed_out'] += not timing['success']
+        finally:
+            driver.quit()
+    finally:
+        set_drive_web_url("")
+        set_drive_api_endpoint("")
+        stop_mock_drive(server)
+
+    results = {'steps': summarize_spans(), 'waits': waits, 'commands': summarize_commands()}
+    for step, stats in results['steps'].items():
+        logger.info(f"{step}: {stats['count']} call(s), p50 {stats['p50']:.3f} second(s), p95 {stats['p95']:.3f}, "
+                    f"max {stats['max']:.3f}, {stats['failures']} failure(s)")
+
+    if results_file:
+        with open(results_file, "w") as file:
+            json.dump({'runs': runs, 'mock': {'latency_sec': latency_sec, 'delays_sec': server.drive_ui['delays']},
+                       **results}, file, indent=2)
+
+    return results
+
+
+if __name__ == "__main__":
+    start_logging(filename="seleniumTestGoogleDriveUpload_benchmarkDriveUI.log")
+    benchmark_drive_ui()
@@ -0,0 +1,85 @@
+"""
+SUMMARY: Import time benchmark.  Imports each of the test's modules in a fresh interpreter with python -X importtime,
+    and checks that (1) the import takes less than the budget (IMPORT_BUDGET_MS) and (2) none of the heavy
+    dependencies (selenium, the google libraries, keyring, webdriver-manager, pyautogui, pyperclip) are loaded just by
+    importing, they should only be loaded by the functions that use them.
+
+    Execute this file to print the report, the exit code is 1 if any module is over budget or loads a heavy dependency.
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+import glob
+import json
+import os
+import subprocess
+import sys
+
+# Global variables
+IMPORT_BUDGET_MS = 250  # maximum (cumulative) import time of any one module
+HEAVY_MODULES = ["selenium", "googleapiclient", "google", "google_auth_oauthlib", "keyring", "webdriver_manager",
+                 "pyautogui", "pyperclip", "psutil"]
+MODULE_PATTERN = "Selenium_googleDriveTestUpload_*.py"
+
+# Run in the fresh interpreter: lists which heavy modules the import loaded
+CODE_REPORT_HEAVY = ("import json, sys; print(json.dumps(sorted({{name.split('.')[0] for name in sys.modules}} & "
+                     "set({heavy}))))")
+
+
+def benchmark_imports(modules: list = None, budget_ms: float = IMPORT_BUDGET_MS):
+    """
+    Measures the import time of each module (in a fresh interpreter, so nothing is already imported) and the heavy
+    dependencies it loads.
+
+    :param modules: Module names, defaults to every Selenium_googleDriveTestUpload_* module in this folder
+    :type modules: list
+    :param budget_ms: Maximum import time of any one module, in milliseconds
+    :type budget_ms: float
+    :return: Results per module, {'Selenium_googleDriveTestUpload_Files': {'ms': 45.2, 'heavy': [], 'passed': True}}
+    :rtype: dict
+    """
+
+    folder = os.path.dirname(os.path.abspath(__file__))
+    if modules is None:
+        # scripts with a '-' in the name (ex: ExecuteFULL_Test-and-Cleanup) can't be imported
+        modules = sorted(os.path.splitext(os.path.basename(path))[0]
+                         for path in glob.glob(os.path.join(folder, MODULE_PATTERN))
+                         if "-" not in os.path.basename(path))
+
+    results = {}
+    for module in modules:
+        code = f"import {module}; " + CODE_REPORT_HEAVY.format(heavy=HEAVY_MODULES)
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=folder, capture_output=True,
+                                text=True)
+        if result.returncode != 0:
+            results[module] = {'ms': None, 'heavy': [], 'passed': False,
+                               'error': result.stderr.strip().splitlines()[-1]}
+            continue
+
+        ms = _cumulative_import_ms(result.stderr, module)
+        heavy = json.loads(result.stdout.strip().splitlines()[-1])
+        results[module] = {'ms': ms, 'heavy': heavy, 'passed': ms <= budget_ms and not heavy}
+
+    return results
+
+
+def _cumulative_import_ms(importtime_output: str, module: str):
+    """Reads a module's cumulative import time (ms) from python -X importtime output (reported in microseconds)"""
+
+    for line in importtime_output.splitlines():
+        # format: "import time:  self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    return 0.0
+
+
+if __name__ == "__main__":
+    report = benchmark_imports()
+    for name, stats in report.items():
+        if stats['ms'] is None:
+            print(f"FAIL  {name}: import failed ({stats['error']})")
+            continue
+        heavy_loaded = f", loads {', '.join(stats['heavy'])}" if stats['heavy'] else ""
+        print(f"{'ok  ' if stats['passed'] else 'FAIL'}  {name}: {stats['ms']:.1f} ms{heavy_loaded}")
+    print(f"Budget: {IMPORT_BUDGET_MS} ms per module, no heavy dependencies ({', '.join(HEAVY_MODULES)})")
+    sys.exit(0 if all(stats['passed'] for stats in report.values()) else 1)
@@ -0,0 +1,163 @@
+"""
+SUMMARY: Benchmark of the Chrome launch profiles (see configure_fortesting_googledrive), ex: "default" vs
+    "performance".  For each profile, runs the upload test a number of times and measures the latency of each step
+    (launch + login, each wait of the upload scenario, and the whole scenario) and the memory used by the browser (RSS
+    of ChromeDriver, Chrome and all of Chrome's processes, measured after the scenario).  Everything a run creates is
+    cleaned up by run ID.
+
+    The first run of a profile that blocks requests (see Selenium_googleDriveTestUpload_RequestBlocking) also loads the
+    "My Drive" page with and without blocking (compare_page_bytes, before the scenario is timed), which reports the
+    MB blocking saves and records the page's baseline, so the later loads of the page log their bytes saved.
+
+    *Memory is measured with psutil (pip install psutil), if it isn't installed only the latencies are reported
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+import json
+import logging
+import statistics
+import time
+from Selenium_googleDriveTestUpload_CleanUpTest import cleanup_test
+from Selenium_googleDriveTestUpload_Connection import (configure_fortesting_googledrive, configure_keyring_googledrive,
+                                                       connect_googledrive, LAUNCH_PROFILE_BLOCK_DENY)
+from Selenium_googleDriveTestUpload_DriveAPI import new_run_id
+from Selenium_googleDriveTestUpload_ExecuteTest import run_upload_scenario
+from Selenium_googleDriveTestUpload_GoogleDrive_webItems import drive_web_url
+from Selenium_googleDriveTestUpload_Logging import start_logging
+from Selenium_googleDriveTestUpload_RequestBlocking import compare_page_bytes
+from Selenium_googleDriveTestUpload_Waits import get_wait_timings, reset_wait_timings
+
+logger = logging.getLogger('seleniumTest.benchmarkProfiles')  # launch profile benchmark logger
+
+# Global variables
+BENCHMARK_RUNS = 3  # runs per launch profile
+BENCHMARK_RESULTS_FILE = "seleniumTestGoogleDriveUpload_benchmarkProfiles.json"
+
+
+def benchmark_launch_profiles(servicename: str, username: str, fldname: str, profiles: list = None,
+                              runs: int = BENCHMARK_RUNS, results_file: str = BENCHMARK_RESULTS_FILE):
+    """
+    Runs the upload test runs times with each launch profile and summarizes the per-step latency and browser memory.
+
+    :param servicename: Name used to securely store the appropriate Google Drive credentials in the keyring
+    :type servicename: str
+    :param username: Google Drive credential's username
+    :type username: str
+    :param fldname: Name of the test folder to be created, the run ID is added to the end of the name
+    :type fldname: str
+    :param profiles: Launch profiles to compare, defaults to ["default", "performance"]
+    :type profiles: list
+    :param runs: Number of runs per profile
+    :type runs: int
+    :param results_file: JSON file the summary is written to (empty to not write one)
+    :type results_file: str
+    :return: Summary per profile and step, {'performance': {'launch + login': {'median': 4.1, 'max': 4.6, ...},
+        'rss_mb': {'median': 310.5, ...}, 'my-drive saved_mb': {'median': 0.9, ...}}}
+    :rtype: dict
+    """
+
+    profiles = profiles or ["default", "performance"]
+    configure_keyring_googledrive(servicename=servicename, username=username)
+
+    samples = {profile: {} for profile in profiles}
+    for run in range(1, runs + 1):
+        for profile in profiles:  # alternate the profiles, so a slow period doesn't only hit one of them
+            logger.info(f"Benchmark run {run} of {runs}, '{profile}' launch profile")
+            for step, value in _benchmark_run(servicename, username, fldname, profile, compare_bytes=run == 1).items():
+                samples[profile].setdefault(step, []).append(value)
+
+    summary = {profile: {step: _summarize(values) for step, values in steps.items()}
+               for profile, steps in samples.items()}
+
+    for profile, steps in summary.items():
+        for step, stats in steps.items():
+            unit = "MB" if step.endswith("_mb") else "second(s)"
+            logger.info(f"[{profile}] {step}: median {stats['median']:.2f} {unit}, max {stats['max']:.2f} {unit} "
+                        f"({stats['count']} run(s))")
+
+    if results_file:
+        with open(results_file, "w") as file:
+            json.dump(summary, file, indent=2)
+
+    return summary
+
+
+def _benchmark_run(servicename: str, username: str, fldname: str, profile: str, compare_bytes: bool = False):
+    """
+    One benchmark run with a launch profile: returns {step: seconds (or 'rss_mb'/'my-drive saved_mb': MB)}.  With
+    compare_bytes, the bytes request blocking saves on the "My Drive" page are measured first (if the profile blocks).
+    """
+
+    steps = {}
+    run_id = new_run_id()
+    reset_wait_timings()
+
+    start = time.monotonic()
+    chrome_options = configure_fortesting_googledrive(profile=profile)
+    driver = connect_googledrive(servicename=servicename, username=username, chrome_options=chrome_options,
+                                 block_deny=LAUNCH_PROFILE_BLOCK_DENY[profile])
+    steps['launch + login'] = time.monotonic() - start
+
+    try:
+        if compare_bytes and getattr(driver, "gdrive_blocked_urls", None):  # not timed, records the page's baseline
+            saved = compare_page_bytes(driver, url=drive_web_url("/drive/my-drive"), page="my-drive")['bytes_saved']
+            steps['my-drive saved_mb'] = saved / (1024 * 1024)
+
+        start = time.monotonic()
+        run_upload_scenario(driver=driver, fldname=fldname, run_id=run_id)
+        steps['upload scenario'] = time.monotonic() - start
+
+        for timing in get_wait_timings():
+            steps[f"wait: {timing['description'].replace(run_id, '<run ID>')}"] = timing['seconds']
+
+        rss_mb = _browser_rss_mb(driver)
+        if rss_mb is not None:
+            steps['rss_mb'] = rss_mb
+    finally:
+        driver.quit()
+        cleanup_test(servicename=servicename, username=username, run_id=run_id)
+
+    return steps
+
+
+def _browser_rss_mb(driver):
+    """Total RSS (MB) of ChromeDriver and every process under it (Chrome, renderers, GPU...), None without psutil"""
+
+    try:
+        import psutil  # optional, only needed for the memory numbers
+    except ImportError:
+        logger.warning("psutil is not installed, browser memory will not be measured (pip install psutil)")
+        return None
+
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (AttributeError, psutil.Error) as e:
+        logger.warning(f"Unable to find the browser's processes. Error: {e}")
+        return None
+
+    rss = 0
+    for process in processes:
+        try:
+            rss += process.memory_info().rss
+        except psutil.Error:  # process exited while measuring
+            continue
+
+    return rss / (1024 * 1024)
+
+
+def _summarize(values: list):
+    """Summary statistics of a list of samples"""
+
+    return {'count': len(values), 'median': statistics.median(values), 'mean': statistics.fmean(values),
+            'min': min(values), 'max': max(values)}
+
+
+if __name__ == "__main__":
+    # Global variables
+    servicename = "---REPLACE-VALUE---"
+    username = "---REPLACE-VALUE---"
+    fld_test = "Testing Folder (Selenium)"
+
+    start_logging(filename="seleniumTestGoogleDriveUpload_benchmarkProfiles.log")
+    benchmark_launch_profiles(servicename=servicename, username=username, fldname=fld_test)
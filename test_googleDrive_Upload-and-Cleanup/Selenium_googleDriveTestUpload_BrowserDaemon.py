@@ -0,0 +1,381 @@
+"""
+SUMMARY: Warm browser daemon.  A long-running local process that keeps a pool of Chrome sessions that are already
+    logged into Google Drive, so test scenarios don't have to pay for the ChromeDriver set up, the Chrome launch, the
+    full login and the tear down every time.  Scenarios lease a session over a local socket, attach to it (no new
+    browser is started), run, and release it.  On release the session is reset (extra tabs closed, back on the Google
+    Drive home page) instead of being relaunched; a session that no longer responds, or was logged out, is relaunched.
+
+    PROTOCOL: one JSON request per line on DAEMON_HOST:DAEMON_PORT, one JSON response per line
+        - {"command": "lease", "timeout": 60} -> {"ok": true, "lease_id": "...", "executor_url": "...",
+                                                   "session_id": "...", "capabilities": {...}}
+        - {"command": "release", "lease_id": "..."} -> {"ok": true}
+        - {"command": "status"} -> {"ok": true, "sessions": [{"num": 1, "leased": false, ...}]}
+        - {"command": "shutdown"} -> {"ok": true}
+
+    Start the daemon by executing this file (or start_browser_daemon), then in the scenarios:
+        with leased_googledrive_session() as driver:
+            run_upload_scenario(driver=driver, fldname="Testing Folder (Selenium)")
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+from contextlib import contextmanager
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from Selenium_googleDriveTestUpload_Connection import configure_keyring_googledrive
+from Selenium_googleDriveTestUpload_GoogleDrive_webItems import drive_web_url, wait_for_element_interactable
+from Selenium_googleDriveTestUpload_Logging import start_logging
+from Selenium_googleDriveTestUpload_Profiles import connect_googledrive_profile, PROFILE_ROOT
+
+logger = logging.getLogger('seleniumTest.browserDaemon')  # browser daemon logger
+
+# Global variables
+DAEMON_HOST = "127.0.0.1"  # only listen locally, the sessions are logged into the test account
+DAEMON_PORT = 47631
+DAEMON_POOL_SIZE = 2  # number of warm, logged in sessions kept by the daemon
+LEASE_TIMEOUT_SEC = 60  # how long a lease request waits for a free session
+LEASE_MAX_SEC = 1800  # a lease older than this is considered abandoned (ex: the scenario crashed) and is reclaimed
+DRIVE_HOME_PATH = "/drive/home"  # Google Drive home page, see drive_web_url
+
+_sessions = []  # [{'num': 1, 'driver': webdriver, 'lease_id': None, 'leased_at': 0, 'broken': False, 'resets': 0,
+#                    'relaunches': 0}]
+_sessions_cond = threading.Condition()  # guards _sessions, notified whenever a session becomes free
+_daemon_config = {}  # servicename/username/profile_root/launch_profile, needed to relaunch a session
+_server = None  # the running daemon server
+
+
+class _DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """Handles one client connection: reads JSON requests (one per line) and writes a JSON response for each"""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response, after = _handle_request(request)
+            except Exception as e:
+                logger.error(f"Browser daemon request failed. Error: {e}")
+                response, after = {'ok': False, 'error': str(e)}, None
+
+            self.wfile.write((json.dumps(response) + "\n").encode())
+            self.wfile.flush()
+            if after is not None:  # work done after responding (ex: reset a released session)
+                after()
+
+
+def browser_daemon_request(request: dict, host: str = DAEMON_HOST, port: int = DAEMON_PORT, timeout: float = None):
+    """
+    Sends one request to the browser daemon and returns its response.
+
+    :param request: Request, see PROTOCOL above (ex: {"command": "status"})
+    :type request: dict
+    :param host: Daemon host
+    :type host: str
+    :param port: Daemon port
+    :type port: int
+    :param timeout: Socket timeout, in seconds (None waits as long as needed)
+    :type timeout: float
+    :return: The daemon's response
+    :rtype: dict
+    """
+
+    with socket.create_connection((host, port), timeout=timeout) as conn:
+        conn.sendall((json.dumps(request) + "\n").encode())
+        with conn.makefile("r") as reader:
+            return json.loads(reader.readline())
+
+
+def browser_daemon_status(host: str = DAEMON_HOST, port: int = DAEMON_PORT):
+    """
+    :return: The status of each of the daemon's sessions, [{'num': 1, 'leased': False, 'resets': 3, ...}]
+    :rtype: list
+    """
+
+    return browser_daemon_request({'command': "status"}, host=host, port=port)['sessions']
+
+
+@contextmanager
+def leased_googledrive_session(host: str = DAEMON_HOST, port: int = DAEMON_PORT, timeout: float = LEASE_TIMEOUT_SEC):
+    """
+    Context manager: leases a logged in session from the browser daemon, yields a webdriver attached to it, and
+    releases the session (the daemon resets it) when done, even if the scenario fails.
+
+    :param host: Daemon host
+    :type host: str
+    :param port: Daemon port
+    :type port: int
+    :param timeout: How long to wait for a free session, in seconds
+    :type timeout: float
+    :return: Webdriver attached to the leased session, already logged in and on the Google Drive home page
+    :rtype: webdriver
+    """
+
+    lease = browser_daemon_request({'command': "lease", 'timeout': timeout}, host=host, port=port)
+    if not lease['ok']:
+        raise RuntimeError(f"Unable to lease a browser session: {lease['error']}")
+
+    logger.info(f"Leased browser session (lease ID '{lease['lease_id']}')")
+    try:
+        yield _attach_chrome_driver(executor_url=lease['executor_url'], session_id=lease['session_id'],
+                                    capabilities=lease['capabilities'])
+    finally:
+        browser_daemon_request({'command': "release", 'lease_id': lease['lease_id']}, host=host, port=port)
+        logger.info(f"Released browser session (lease ID '{lease['lease_id']}')")
+
+
+def start_browser_daemon(servicename: str, username: str, pool_size: int = DAEMON_POOL_SIZE,
+                         host: str = DAEMON_HOST, port: int = DAEMON_PORT, profile_root: str = PROFILE_ROOT,
+                         launch_profile: str = "default"):
+    """
+    Starts the browser daemon: launches and logs in pool_size Chrome sessions (each with its own profile directory),
+    then serves lease requests until a shutdown request is received.  Blocks until shut down, all the sessions are
+    quit on the way out.
+
+    :param servicename: Name used to securely store the appropriate Google Drive credentials in the keyring
+    :type servicename: str
+    :param username: Google Drive credential's username
+    :type username: str
+    :param pool_size: Number of warm, logged in sessions to keep
+    :type pool_size: int
+    :param host: Host to listen on, keep this local
+    :type host: str
+    :param port: Port to listen on
+    :type port: int
+    :param profile_root: Directory where each session's Chrome profile directory is created
+    :type profile_root: str
+    :param launch_profile: Chrome launch profile of the sessions, see configure_fortesting_googledrive
+    :type launch_profile: str
+    """
+
+    global _server
+
+    logger.info(f"----START: Browser daemon, {pool_size} session(s) on {host}:{port}----")
+
+    # Establish user creds (if needed), once, before the sessions log in
+    configure_keyring_googledrive(servicename=servicename, username=username)
+    _daemon_config.update(servicename=servicename, username=username, profile_root=profile_root,
+                          launch_profile=launch_profile)
+
+    with _sessions_cond:
+        for num in range(1, pool_size + 1):
+            _sessions.append({'num': num, 'driver': _launch_session(num), 'lease_id': None, 'leased_at': 0,
+                              'broken': False, 'resets': 0, 'relaunches': 0})
+
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    _server = socketserver.ThreadingTCPServer((host, port), _DaemonRequestHandler)
+    _server.daemon_threads = True
+    try:
+        _server.serve_forever()
+    finally:
+        _server.server_close()
+        with _sessions_cond:
+            for session in _sessions:
+                try:
+                    session['driver'].quit()
+                except Exception as e:
+                    logger.warning(f"Unable to quit session {session['num']}. Error: {e}")
+            _sessions.clear()
+        logger.info("----END: Browser daemon stopped----")
+
+
+def _attach_chrome_driver(executor_url: str, session_id: str, capabilities: dict):
+    """
+    Creates a Remote webdriver attached to a Chrome session that is already running (in the daemon), instead of
+    starting a new session.  Supports the Chrome DevTools (CDP) commands used by the tests.  Never quit() an attached
+    driver, that would end the daemon's session; release the lease instead.  (The driver class is defined here, on
+    first use, so importing this module doesn't load selenium.)
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+    from selenium.webdriver.chromium.webdriver import ChromiumDriver
+
+    class AttachedChromeDriver(webdriver.Remote):
+        execute_cdp_cmd = ChromiumDriver.execute_cdp_cmd
+
+        def start_session(self, capabilities_requested, *args, **kwargs):
+            self.session_id = session_id
+            self.caps = capabilities
+
+    return AttachedChromeDriver(command_executor=ChromiumRemoteConnection(remote_server_addr=executor_url,
+                                                                          vendor_prefix="goog", browser_name="chrome"),
+                                options=webdriver.ChromeOptions())
+
+
+def _handle_request(request: dict):
+    """
+    Runs one daemon request.
+
+    :return: The response, and a function to run after the response is sent (or None)
+    :rtype: tuple
+    """
+
+    command = request.get('command')
+
+    if command == "lease":
+        session = _lease_session(timeout=request.get('timeout', LEASE_TIMEOUT_SEC))
+        if session is None:
+            return {'ok': False, 'error': "No browser session became free before the timeout"}, None
+        driver = session['driver']
+        return {'ok': True, 'lease_id': session['lease_id'], 'executor_url': driver.service.service_url,
+                'session_id': driver.session_id, 'capabilities': driver.capabilities}, None
+
+    if command == "release":
+        with _sessions_cond:
+            session = next((s for s in _sessions if s['lease_id'] == request.get('lease_id')), None)
+        if session is None:
+            return {'ok': False, 'error': f"Unknown lease ID '{request.get('lease_id')}'"}, None
+        return {'ok': True}, lambda: _release_session(session)
+
+    if command == "status":
+        with _sessions_cond:
+            return {'ok': True, 'sessions': [{'num': s['num'], 'leased': s['lease_id'] is not None,
+                                              'resets': s['resets'], 'relaunches': s['relaunches']}
+                                             for s in _sessions]}, None
+
+    if command == "shutdown":
+        return {'ok': True}, lambda: threading.Thread(target=_server.shutdown, daemon=True).start()
+
+    return {'ok': False, 'error': f"Unknown command '{command}'"}, None
+
+
+def _launch_session(num: int):
+    """Launches a new Chrome session with its own clone of the logged in profile template (see Profiles)"""
+
+    logger.info(f"Launching browser session {num}")
+
+    return connect_googledrive_profile(servicename=_daemon_config['servicename'], username=_daemon_config['username'],
+                                       clone_dir=os.path.join(_daemon_config['profile_root'], f"daemon-{num}"),
+                                       launch_profile=_daemon_config['launch_profile'])
+
+
+def _lease_session(timeout: float):
+    """
+    Waits (up to timeout) for a free session, marks it as leased and returns it (None if the timeout is reached).
+    Leases older than LEASE_MAX_SEC are reclaimed (reset) while waiting.  The session is health checked before being
+    handed out, and relaunched if it doesn't respond (or is marked broken).  Like _release_session, the browser is only
+    reset/relaunched after the new lease is marked and the lock is released, so other requests aren't blocked on the
+    browser.  If the relaunch fails, the lease is cleared again (the session stays marked broken) before re-raising.
+    """
+
+    deadline = time.monotonic() + timeout
+    reclaimed = False
+
+    with _sessions_cond:
+        while True:
+            session = next((s for s in _sessions if s['lease_id'] is None), None)
+            if session is not None:
+                break
+
+            now = time.monotonic()
+            session = next((s for s in _sessions if now - s['leased_at'] > LEASE_MAX_SEC), None)
+            if session is not None:
+                logger.warning(f"Reclaiming abandoned lease on session {session['num']}")
+                reclaimed = True
+                break
+
+            if now >= deadline:
+                return None
+            _sessions_cond.wait(timeout=deadline - now)
+
+        # the new lease ID also makes a late release of the abandoned lease fail (unknown lease ID)
+        session['lease_id'] = uuid.uuid4().hex
+        session['leased_at'] = time.monotonic()
+
+    try:
+        if reclaimed:
+            _reset_session(session)  # relaunches the session if it can't be reset
+        elif session['broken']:
+            logger.warning(f"Browser session {session['num']} is marked broken, relaunching")
+            _relaunch_session(session)
+        else:
+            try:
+                session['driver'].current_url  # health check, a dead browser raises
+            except Exception as e:
+                logger.warning(f"Browser session {session['num']} is not responding, relaunching. Error: {e}")
+                _relaunch_session(session)
+    except Exception:
+        _free_session(session)
+        raise
+
+    return session
+
+
+def _free_session(session: dict):
+    """Clears a session's lease and wakes up a lease request waiting for a free session"""
+
+    with _sessions_cond:
+        session['lease_id'] = None
+        session['leased_at'] = 0
+        _sessions_cond.notify()
+
+
+def _relaunch_session(session: dict):
+    """
+    Quits (if possible) and relaunches a session that is broken or logged out.  The session stays marked broken until
+    the relaunch succeeds, so if it raises, the next lease tries again.
+    """
+
+    session['broken'] = True
+    try:
+        session['driver'].quit()
+    except Exception:
+        pass  # already gone
+    session['driver'] = _launch_session(session['num'])
+    session['broken'] = False
+    session['relaunches'] += 1
+
+
+def _release_session(session: dict):
+    """
+    Resets a released session and makes it available for the next lease.  The lease is cleared even if the session
+    can't be reset or relaunched (it's left marked broken, the next lease relaunches it), so lease requests never queue
+    behind a dead browser until LEASE_MAX_SEC.
+    """
+
+    try:
+        _reset_session(session)
+    except Exception as e:
+        logger.error(f"Unable to relaunch browser session {session['num']}, will retry on its next lease. Error: {e}")
+    finally:
+        _free_session(session)
+
+
+def _reset_session(session: dict):
+    """
+    Resets a session for the next scenario, instead of relaunching it: closes any extra tabs/windows, navigates back
+    to the Google Drive home page and waits for it to be ready.  If that fails (or the session was logged out), the
+    session is relaunched.
+    """
+    from selenium.webdriver.common.by import By
+
+    driver = session['driver']
+    try:
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        driver.get(drive_web_url(DRIVE_HOME_PATH))
+        if driver.current_url.startswith("https://accounts.google.com"):
+            raise RuntimeError("session was logged out")
+        wait_for_element_interactable(driver=driver, by=By.CSS_SELECTOR,
+                                      locator="button[guidedhelpid='new_menu_button']")
+        session['resets'] += 1
+        logger.debug(f"Browser session {session['num']} reset")
+    except Exception as e:
+        logger.warning(f"Unable to reset browser session {session['num']}, relaunching. Error: {e}")
+        _relaunch_session(session)
+
+
+if __name__ == "__main__":
+    # Global variables
+    servicename = "---REPLACE-VALUE---"
+    username = "---REPLACE-VALUE---"
+
+    start_logging(filename="seleniumTestGoogleDriveUpload_browserDaemon.log")
+    start_browser_daemon(servicename=servicename, username=username)
@@ -3,10 +3,13 @@ SUMMARY: Cleans up all actions taken in the Selenium test for Google Drive's Cre
     and Upload file feature.  This clean up allows the test to be re-run.
 
     CLEAN UP STEPS*:
-        - Determine a list of all instances of Google Drive folder "Testing Folder (Selenium)" to delete (in case
-            previous clean ups failed)
-        - Loops through list and deletes the instance(s)
-        - Validate the deletion was successful and folder(s) and file(s) no longer exist
+        - Determine a list of all instances of Google Drive folder "Testing Folder (Selenium)" and test file(s) to
+            delete (in case previous clean ups failed), in a single query
+        - Plan the clean up: anything inside a folder that is being deleted is deleted with it, so only the top-most
+            items are deleted.  The plan is logged before anything is deleted (dry run: only log the plan)
+        - Deletes the top-most instance(s), in batches of up to 100 deletes per request
+        - Log the result of each delete, as reported by the delete requests (an item that is already gone counts as
+            deleted); nothing is listed again after the deletes
         - Close test
 
 NOTES: See README.txt file for requirements to run and all sources used
@@ -14,93 +17,237 @@ NOTES: See README.txt file for requirements to run and all sources used
 VERSION INFO:
     Created by R. Reyna
     Date: 1/6/2025
-    Version: 1.0.1
+    Version: 1.1.0
 
     Updates:
         - Improving logging for beginning/end of clean up (matching to the test execution log)
+        - Folders and files are deleted in batches (Drive batch endpoint) instead of one request (plus a validation
+            request) per item
+        - Clean up is planned first (plan_cleanup), only items that aren't inside another item being deleted are
+            deleted; added dry_run
+        - Added run_id, cleans up only the items tagged by that test run, in one query
+        - googleapiclient is only imported when the clean up runs, so importing this module is fast
+        - Added use_async, deletes the items with concurrent single deletes (see DriveAsync) instead of batches
+        - Listing and deleting are timed as steps, a metrics report (JSON/CSV) is written at the end of the clean up
+        - Added profile_api, writes a report of the Drive API calls (and quota) made by the clean up
+        - Folders are found by name prefix (the test folder name ends with the run ID), not the exact name
 """
+import asyncio
 import logging
+from Selenium_googleDriveTestUpload_APIProfiler import (reset_api_records, start_api_profiler, stop_api_profiler,
+                                                        write_api_report)
 from Selenium_googleDriveTestUpload_Logging import start_logging
-from Selenium_googleDriveTestUpload_Files import (get_file_googledrive_id, delete_file_googledrive_by_id,
-                                                  validate_file_exists)
-from Selenium_googleDriveTestUpload_Folders import delete_folder_googledrive_by_id, get_folder_googledrive_id
+from Selenium_googleDriveTestUpload_DriveAPI import (delete_googledrive_items_batch, escape_query_value,
+                                                     list_googledrive_items, MIMETYPE_FOLDER, query_run_id)
+from Selenium_googleDriveTestUpload_DriveAsync import delete_googledrive_items_async
+from Selenium_googleDriveTestUpload_Metrics import reset_metrics, span, write_metrics_report
 
 logger = logging.getLogger('seleniumTest.cleanUp')  # clean up logger
 
+METRICS_REPORT_FILE = "seleniumTestGoogleDriveUpload_metrics_cleanUp.json"  # + .csv, see write_metrics_report
+API_REPORT_FILE = "seleniumTestGoogleDriveUpload_api_cleanUp.json"  # see write_api_report
 
-def cleanup_test(servicename: str, username: str, fldname: str, filename: str):
+
+def cleanup_test(servicename: str, username: str, fldname: str = "", filename: str = "", dry_run: bool = False,
+                 run_id: str = "", use_async: bool = False, deadline_sec: float = None, profile_api: bool = False):
     """
     Cleans up any files/folders that were created as part of the Selenium Google Drive Upload test.
-    Folders - deletes *ALL* folders with the specified folder name < this ensures that all test folders are cleaned up,
-        even if the previous test clean up failed
+    Folders - deletes *ALL* folders whose name starts with the specified folder name (the test adds the run ID to the
+        end of the name, ex: "Testing Folder (Selenium) - 3f9c2a7e51b0") < this ensures that all test folders are
+        cleaned up, even if the previous test clean up failed
     Files - the file should be deleted as part of the folder deletion, however, because the name of the file is unique
-        to this test, the function will also validate that after the folder deletion, if there are any files with the
-        specified name, they are --also deleted--.  This ensures that if there is an error during testing and a file
-        is incorrectly uploaded, it is still cleaned up.
+        to this test, any files with the specified name that are NOT inside one of the folders being deleted are
+        --also deleted--.  This ensures that if there is an error during testing and a file is incorrectly uploaded,
+        it is still cleaned up.
+
+    If a run ID is provided, only the items tagged with that run ID (see execute_test) are cleaned up, and fldname and
+    filename are not needed.  This leaves other runs' items alone, so tests can run in parallel on the same account.
+    Without a run ID, fldname is required (an empty name would match every folder), and stray files are only looked
+    for if filename is provided.
+
+    Folders and files are found with one (paginated) query, and then planned with plan_cleanup(): deleting a folder
+    deletes everything inside it, so only the top-most items are deleted.  The plan is logged before it is executed.
+    The items are deleted in batches, or with use_async, with concurrent single deletes (asyncio, bounded concurrency,
+    see Selenium_googleDriveTestUpload_DriveAsync), which is faster when there are many leftovers to sweep.
 
-    Clean up is done via Google API to speed things up, not Selenium
+    Clean up is done via Google API to speed things up, not Selenium.  Listing and deleting are timed, and a metrics
+    report is written at the end (METRICS_REPORT_FILE, JSON and CSV).
 
     :param servicename:
     :param username:
-    :param fldname: Name of the folder(s) to be cleaned up
+    :param fldname: Name (prefix) of the folder(s) to be cleaned up
     :type fldname: str
     :param filename: Name of the file(s) to be cleaned up
     :type filename: str
-    :return:
+    :param dry_run: Only log the clean up plan, don't delete anything
+    :type dry_run: bool
+    :param run_id: ID of the test run to be cleaned up, as passed to execute_test
+    :type run_id: str
+    :param use_async: Delete with concurrent single deletes (asyncio) instead of batches
+    :type use_async: bool
+    :param deadline_sec: With use_async, time allowed for all the deletes, the ones not started by then are cancelled
+    :type deadline_sec: float
+    :param profile_api: Record every Drive API call, a report of the calls (and estimated quota) is written at the end
+        of the clean up (API_REPORT_FILE)
+    :type profile_api: bool
+    :return: The clean up plan (see plan_cleanup), with the success value of each deletion added under 'results'
+    :rtype: dict
+    :raises ValueError: If neither a run ID nor a folder name is provided (the query would match every item)
     """
 
+    if not run_id and not fldname:
+        raise ValueError("cleanup_test needs a run_id or a fldname, will not clean up every folder in the account")
+
+    from googleapiclient.errors import HttpError
+
     # Configure logging
     start_logging(filename="seleniumTestGoogleDriveUpload_cleanUp.log")
     logger.info("----START: Beginning Selenium Google Drive Clean Up Test----")
-
-    # Get list of folder(s) to clean up & delete
-    fld_info = get_folder_googledrive_id(fldname=fldname)
-    if (fld_info is None) or len(fld_info) < 1:
-        logger.warning(f"Unable to find '{fldname}'; will not take any clean up actions.")
+    reset_metrics()
+    reset_api_records()
+    if profile_api:
+        start_api_profiler()
+
+    # Get list of folder(s) and file(s) to clean up, in a single query
+    if run_id:
+        logger.info(f"Cleaning up items tagged with run ID '{run_id}'")
+        query = query_run_id(run_id=run_id)
+        lookingfor = f"run ID '{run_id}'"
     else:
-        if len(fld_info) > 1:
-            logger.warning(f"More than one instance of '{fldname}' found, will delete ALL instances."
-                           f"\nFolder list: {fld_info}")
+        # 'contains' matches whole words of the name, the prefix itself is checked after listing
+        query = f"(mimeType = '{MIMETYPE_FOLDER}' and name contains '{escape_query_value(fldname)}')"
+        lookingfor = f"'{fldname}'"
+        if filename:
+            query += f" or (mimeType != '{MIMETYPE_FOLDER}' and name = '{escape_query_value(filename)}')"
+            lookingfor += f" or '{filename}'"
+    try:
+        with span("list items"):
+            items = list(list_googledrive_items(query=query, fields="id, name, mimeType, parents, createdTime"))
+        if not run_id:
+            items = [item for item in items
+                     if item.get('mimeType') != MIMETYPE_FOLDER or item.get('name', "").startswith(fldname)]
+    except HttpError as error:
+        logger.error(f"Unable to list the items to clean up, will not take any clean up actions. Error: {error}")
+        items = []
+
+    if not items:
+        logger.warning(f"Unable to find {lookingfor}; will not take any clean up actions.")
+
+    # Plan the clean up and log it before deleting anything
+    plan = plan_cleanup(items=items)
+    logger.info(format_cleanup_plan(plan=plan))
+
+    if dry_run:
+        logger.info("Dry run, no items deleted.")
+    elif plan['delete'] and use_async:
+        # Delete the top-most items (concurrently) and log the result of each delete
+        with span("delete items", items=len(plan['delete']), use_async=True):
+            plan['results'] = asyncio.run(delete_googledrive_items_async(items=plan['delete'],
+                                                                         deadline_sec=deadline_sec))
+        log_deletion_results(results=plan['results'], items=plan['delete'])
+    elif plan['delete']:
+        # Delete the top-most items (batched) and log the result of each delete
+        with span("delete items", items=len(plan['delete']), use_async=False):
+            plan['results'] = delete_googledrive_items_batch(item_ids=[item['id'] for item in plan['delete']])
+        log_deletion_results(results=plan['results'], items=plan['delete'])
+
+    write_metrics_report(filename=METRICS_REPORT_FILE, run_id=run_id)
+    if profile_api:
+        stop_api_profiler()
+        write_api_report(filename=API_REPORT_FILE, run_id=run_id)
+    logger.info("----END: Selenium Google Drive Test Clean Up completed.----")
+
+    return plan
+
+
+def format_cleanup_plan(plan: dict):
+    """
+    Formats a clean up plan (see plan_cleanup) as a readable, multi-line message for the log.
+
+    :param plan: Clean up plan, as returned by plan_cleanup
+    :type plan: dict
+    :return: The formatted plan
+    :rtype: str
+    """
+
+    msg = (f"Clean up plan: {len(plan['delete'])} item(s) to delete, {len(plan['skip'])} item(s) deleted with a "
+           f"parent folder")
+    for item in plan['delete']:
+        itemtype = "folder" if item.get('mimeType') == MIMETYPE_FOLDER else "file"
+        msg += f"\n    DELETE {itemtype} '{item.get('name')}' (ID '{item['id']}')"
+    for item_id, root_id in plan['skip'].items():
+        msg += f"\n    SKIP ID '{item_id}', deleted with folder ID '{root_id}'"
+
+    return msg
+
+
+def log_deletion_results(results: dict, items: list):
+    """
+    Logs the result of each deletion, as returned by delete_googledrive_items_batch
+
+    :param results: Success value for each ID, {'IDvalue': True/False}
+    :type results: dict
+    :param items: The items that were deleted, {'id': 'IDvalue', 'mimeType': 'type', 'parents': ['parentID'], ...}
+    :type items: list
+    """
+
+    for item in items:
+        itemtype = "Folder" if item.get('mimeType') == MIMETYPE_FOLDER else "File"
+        if results.get(item['id']) is True:
+            logger.debug(f"{itemtype} deletion for ID '{item['id']}' in folder ID '{item.get('parents')}': SUCCESS")
         else:
-            logger.info(f"Only one instance of '{fldname}' found, cleaning up")
-
-        # Delete folders
-        for fld in fld_info:
-            logger.debug(f"Folder deletion for ID '{fld['id']}': Attempting deletion")
-            result = delete_folder_googledrive_by_id(fld_id=fld['id'])
-
-            # Validate if deletion was successful
-            if result is True:
-                logger.debug(f"Folder deletion for ID '{fld['id']}': SUCCESS")
-            else:
-                logger.error(f"Folder deletion for ID '{fld['id']}': FAILURE")
-
-    # Validate that there are no longer any files with the name provided
-    file_exists = validate_file_exists(filename=filename)
-    if file_exists:  # files found, possibly from other tests, delete
-        logger.warning(f"Test file should have been cleaned up with folder deletion, however, copies of '{filename}'"
-                       f"were still found.  Will attempt to clean up.")
-        # Get file ID, and handle if there is more than one result
-        file_info = get_file_googledrive_id(filename=filename)
-        if (file_info is None) or len(file_info) < 1:
-            logger.error(f"ERROR: validate_file_exists states that '{filename}' exists, however, unable to get file ID "
-                          f"in order to delete. Will not take any clean up actions.")
+            logger.error(f"{itemtype} deletion for ID '{item['id']}' in folder ID '{item.get('parents')}': FAILURE")
+
+    logger.info(f"Clean up: {sum(results.values())} of {len(results)} item(s) deleted")
+
+
+def plan_cleanup(items: list):
+    """
+    Plans which items need to be deleted.  Builds the parent/child graph from the items' 'parents' fields: deleting a
+    folder also deletes everything inside it, so any item that has an ancestor in the list is skipped, and only the
+    top-most items (roots) are deleted.
+    *Only the listed items are part of the graph, an item inside a folder that isn't listed (ex: a sub-folder with a
+    different name) is treated as a root.
+
+    :param items: Items to be cleaned up, each as {'id': 'IDvalue', 'parents': ['parentID'], ...}
+    :type items: list
+    :return: The plan, in the following format:
+        {'delete': [items to delete], 'skip': {'IDvalue': 'ID of the top-most folder it will be deleted with'}}
+    :rtype: dict
+    """
+
+    items_byid = {item['id']: item for item in items}
+    plan = {'delete': [], 'skip': {}}
+
+    for item_id, item in items_byid.items():
+        root_id = find_cleanup_root(item_id=item_id, items_byid=items_byid)
+        if root_id == item_id:
+            plan['delete'].append(item)
         else:
-            if len(file_info > 1):
-                logger.warning(f"More than one extra instance of '{filename}' found, will delete ALL instances."
-                               f"\nFile list: {file_info}")
-            else:
-                logger.info(f"Only one extra instance of '{filename}' found, cleaning up.")
-
-                # Delete files
-                for file in file_info:
-                    logger.debug(f"File deletion for ID '{file['id']}' in folder ID '{file['parents']}': Attempting deletion")
-                    result = delete_file_googledrive_by_id(file_id=file['id'])
-
-                    # Validate if deletion was successful
-                    if result is True:
-                        logger.debug(f"File deletion for ID '{file['id']}' in folder ID '{file['parents']}': SUCCESS")
-                    else:
-                        logger.error(f"File deletion for ID '{file['id']}' in folder ID '{file['parents']}': FAILURE")
+            plan['skip'][item_id] = root_id
 
-    logger.info("----END: Selenium Google Drive Test Clean Up completed.----")
+    return plan
+
+
+def find_cleanup_root(item_id: str, items_byid: dict):
+    """
+    Walks up an item's parents (only through the listed items) and returns the top-most listed ancestor.
+
+    :param item_id: Google ID of the item
+    :type item_id: str
+    :param items_byid: Listed items, {'IDvalue': {'id': 'IDvalue', 'parents': ['parentID'], ...}}
+    :type items_byid: dict
+    :return: Google ID of the top-most listed ancestor, or item_id if none of its parents are listed
+    :rtype: str
+    """
+
+    root_id = item_id
+    visited = {item_id}
+
+    while True:
+        parents = [parent for parent in items_byid[root_id].get('parents', [])
+                   if parent in items_byid and parent not in visited]
+        if not parents:
+            return root_id
+        root_id = parents[0]
+        visited.add(root_id)
@@ -0,0 +1,171 @@
+"""
+SUMMARY: WebDriver command profiler.  Every find_element, click, send_keys, get, execute_script... is an HTTP round
+    trip to ChromeDriver.  profile_driver_commands hooks the driver's command executor, so every command is recorded
+    with its latency and the test step it was issued in (the innermost span open, see
+    Selenium_googleDriveTestUpload_Metrics).  The report gives, per step, how many commands it issued (by command) and
+    a latency histogram, which shows where batching commands (ex: one execute_script instead of several finds) would
+    pay off.
+
+    Opt-in: connect_googledrive(profile_commands=True), or call profile_driver_commands on any driver.
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+import functools
+import json
+import logging
+import threading
+import time
+from Selenium_googleDriveTestUpload_Metrics import current_span_name, percentile
+
+logger = logging.getLogger('seleniumTest.commandProfiler')  # WebDriver command profiler logger
+
+# Global variables
+COMMAND_HISTOGRAM_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500]  # upper bound of each latency bucket
+COMMAND_NO_STEP = "(no step)"  # step name of the commands issued outside of any span
+
+_command_records = []  # [{'command': str, 'step': str, 'started': float, 'seconds': float, 'success': bool}]
+_command_records_lock = threading.Lock()
+
+
+def command_histogram(seconds: list):
+    """
+    Counts latencies per bucket (COMMAND_HISTOGRAM_BUCKETS_MS), ex: {'<=5ms': 3, '<=10ms': 0, ..., '>2500ms': 1}.
+
+    :param seconds: Latencies, in seconds
+    :type seconds: list
+    :return: Number of latencies in each bucket, in bucket order
+    :rtype: dict
+    """
+
+    histogram = {f"<={bucket}ms": 0 for bucket in COMMAND_HISTOGRAM_BUCKETS_MS}
+    histogram[f">{COMMAND_HISTOGRAM_BUCKETS_MS[-1]}ms"] = 0
+
+    for value in seconds:
+        ms = value * 1000
+        bucket = next((bucket for bucket in COMMAND_HISTOGRAM_BUCKETS_MS if ms <= bucket), None)
+        histogram[f"<={bucket}ms" if bucket is not None else f">{COMMAND_HISTOGRAM_BUCKETS_MS[-1]}ms"] += 1
+
+    return histogram
+
+
+def get_command_records():
+    """
+    Gets the WebDriver commands recorded so far, in the order they finished.
+
+    :return: List of commands, {'command': 'findElement', 'step': 'create folder', 'started': 1697000000.0,
+        'seconds': 0.012, 'success': True}
+    :rtype: list
+    """
+
+    with _command_records_lock:
+        return list(_command_records)
+
+
+def profile_driver_commands(driver):
+    """
+    Records every command the driver sends to ChromeDriver from now on (see get_command_records).  Does nothing if the
+    driver is already profiled.
+
+    :param driver: Selenium webdriver
+    :type driver: webdriver
+    :return: The same driver
+    :rtype: webdriver
+    """
+
+    executor = driver.command_executor
+    if getattr(executor, "gdrive_profiled", False):
+        return driver
+
+    execute = executor.execute
+
+    @functools.wraps(execute)
+    def execute_profiled(command, params):
+        step = current_span_name() or COMMAND_NO_STEP
+        started = time.time()
+        start = time.monotonic()
+        success = False
+        try:
+            response = execute(command, params)
+            success = True
+            return response
+        finally:
+            with _command_records_lock:
+                _command_records.append({'command': command, 'step': step, 'started': started,
+                                         'seconds': time.monotonic() - start, 'success': success})
+
+    executor.execute = execute_profiled
+    executor.gdrive_profiled = True
+    logger.debug("Profiling the driver's WebDriver commands")
+
+    return driver
+
+
+def reset_command_records():
+    """
+    Clears the recorded WebDriver commands (ex: at the start of a test run).
+    """
+
+    with _command_records_lock:
+        _command_records.clear()
+
+
+def summarize_commands(records: list = None):
+    """
+    Summarizes the WebDriver commands per step: count, count per command, total/p50/p95/max latency and a latency
+    histogram.
+
+    :param records: Commands to summarize, defaults to every command recorded so far
+    :type records: list
+    :return: Summary per step, most commands first, {'create folder': {'count': 14, 'commands': {'findElement': 6,
+        'clickElement': 4, ...}, 'total': 0.42, 'p50': 0.021, 'p95': 0.08, 'max': 0.11, 'failures': 0,
+        'histogram': {'<=5ms': 2, '<=10ms': 5, ...}}}
+    :rtype: dict
+    """
+
+    records = get_command_records() if records is None else records
+
+    steps = {}
+    for record in records:
+        steps.setdefault(record['step'], []).append(record)
+
+    summary = {}
+    for step, step_records in sorted(steps.items(), key=lambda item: len(item[1]), reverse=True):
+        seconds = [record['seconds'] for record in step_records]
+        commands = {}
+        for record in step_records:
+            commands[record['command']] = commands.get(record['command'], 0) + 1
+        summary[step] = {'count': len(step_records),
+                         'commands': dict(sorted(commands.items(), key=lambda item: item[1], reverse=True)),
+                         'total': sum(seconds), 'p50': percentile(seconds, 50), 'p95': percentile(seconds, 95),
+                         'max': max(seconds), 'failures': sum(not record['success'] for record in step_records),
+                         'histogram': command_histogram(seconds)}
+
+    return summary
+
+
+def write_command_report(filename: str, records: list = None):
+    """
+    Writes the WebDriver command report (JSON): the summary per step (see summarize_commands) and every command.  The
+    summary is also logged.
+
+    :param filename: JSON report file (ex: "seleniumTestGoogleDriveUpload_commands.json")
+    :type filename: str
+    :param records: Commands to report, defaults to every command recorded so far
+    :type records: list
+    :return: The summary per step
+    :rtype: dict
+    """
+
+    records = get_command_records() if records is None else records
+    summary = summarize_commands(records=records)
+
+    with open(filename, "w") as file:
+        json.dump({'summary': summary, 'commands': records}, file, indent=2)
+
+    for step, stats in summary.items():
+        top = ", ".join(f"{command} x{count}" for command, count in list(stats['commands'].items())[:5])
+        logger.info(f"Step '{step}': {stats['count']} WebDriver command(s) ({top}), total {stats['total']:.2f} "
+                    f"second(s), p50 {stats['p50'] * 1000:.0f} ms, p95 {stats['p95'] * 1000:.0f} ms")
+    logger.info(f"WebDriver command report written to '{filename}'")
+
+    return summary
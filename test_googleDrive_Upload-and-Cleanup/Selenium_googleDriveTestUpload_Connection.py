@@ -7,23 +7,44 @@ NOTES: See README.txt file for requirements to run and all sources used
 VERSION INFO:
     Created by R. Reyna
     Date: 8/21/2024
-    Version: 1.0.0
+    Version: 1.0.1
+
+    Updates:
+        - Google API creds are cached in memory and only refreshed when close to expiring (with a background refresh
+            ahead of the expiry); token.json is written atomically
+        - Login steps wait on the page (wait_for_element_interactable) instead of implicitly_wait
+        - configure_fortesting_googledrive accepts a Chrome profile directory (user_data_dir)
+        - Login steps moved to login_googledrive; connect_googledrive can reuse an already logged in profile
+            (reuse_login, checked with is_logged_in_googledrive)
+        - ChromeDriver is resolved from a local, checksum verified cache (resolve_chromedriver) instead of calling
+            ChromeDriverManager().install() on every launch
+        - configure_fortesting_googledrive accepts a launch profile, "performance" is a lean headless profile
+        - Importing the module no longer launches Chrome/logs in (removed the module level test code); selenium,
+            keyring and the google libraries are only imported by the functions that use them
+        - connect_googledrive and login_googledrive are timed as steps (see Selenium_googleDriveTestUpload_Metrics)
+        - connect_googledrive can profile the driver's WebDriver commands (profile_commands)
+        - The Google Drive home page is opened from drive_web_url (the address can be changed, ex: to a local replica
+            of Google Drive)
 """
-import google.auth.exceptions
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-import keyring  # must install: pip install keyring
+from __future__ import annotations
+import datetime
 import logging
 import os.path
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as ec
+import tempfile
+import threading
+from typing import TYPE_CHECKING
+from Selenium_googleDriveTestUpload_CommandProfiler import profile_driver_commands
+from Selenium_googleDriveTestUpload_DriverCache import resolve_chromedriver
+from Selenium_googleDriveTestUpload_GoogleDrive_webItems import drive_web_url, wait_for_element_interactable
 from Selenium_googleDriveTestUpload_Logging import start_logging
-from webdriver_manager.chrome import ChromeDriverManager
+from Selenium_googleDriveTestUpload_Metrics import timed
+from Selenium_googleDriveTestUpload_RequestBlocking import set_request_blocking
+from Selenium_googleDriveTestUpload_Waits import wait_until
+
+if TYPE_CHECKING:  # only needed for the type hints, not loaded at run time
+    from google.oauth2.credentials import Credentials
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
 
 
 # Global variables
@@ -32,18 +53,55 @@ SCOPES = ["https://www.googleapis.com/auth/drive.metadata.readonly",  # permissi
 # ***the cred_file is created when you configure OAuth connection via Google API, replace the file path below
 cred_file = "---REPLACE-VALUE---"  # absolute file path
 #cred_file = "C:/credentials_test.json"  # Window machines make sure to use front slashes
+DRIVE_HOME_PATH = "/drive/home"  # Google Drive home page, see drive_web_url
+LAUNCH_PROFILES = ["default", "performance"]  # see configure_fortesting_googledrive
+LOGIN_TIMEOUT_SEC = 15  # how long to wait for the google sign in to complete
+PERFORMANCE_WINDOW_SIZE = "1280,800"  # fixed window size of the performance profile (instead of maximizing)
+PERFORMANCE_RENDERER_LIMIT = 2  # maximum number of renderer processes per browser in the performance profile
+PERFORMANCE_ARGUMENTS = ["--headless=new", f"--window-size={PERFORMANCE_WINDOW_SIZE}",
+                         f"--renderer-process-limit={PERFORMANCE_RENDERER_LIMIT}", "--disable-gpu",
+                         "--disable-extensions", "--disable-background-networking", "--disable-component-update",
+                         "--disable-default-apps", "--disable-sync", "--no-first-run", "--mute-audio",
+                         "--autoplay-policy=user-gesture-required", "--blink-settings=imagesEnabled=false",
+                         "--disable-features=Translate,MediaRouter,OptimizationHints"]
+PERFORMANCE_PREFS = {"profile.managed_default_content_settings.images": 2}  # 2 = blocked
+PERFORMANCE_BLOCK_DENY = ["analytics", "fonts", "media"]  # request blocking categories, see RequestBlocking
+LAUNCH_PROFILE_BLOCK_DENY = {"default": [], "performance": PERFORMANCE_BLOCK_DENY}  # connect_googledrive's block_deny
+TOKEN_FILE = "token.json"  # stores the user's access and refresh tokens
+TOKEN_REFRESH_MARGIN_SEC = 300  # refresh the access token when it expires within this many seconds
 logger = logging.getLogger('seleniumTest.connection')  # connection logger
 
+_creds = None  # process-wide cache of the Google API creds, see get_credentials_googledrive()
+_creds_lock = threading.RLock()  # guards _creds, the background refresh runs on its own thread
+_refresh_timer = None  # background refresh timer for _creds
+
 
-def configure_fortesting_googledrive():
+def configure_fortesting_googledrive(user_data_dir: str = "", profile: str = "default"):
     """
     Configure Google account to allow automation tester to connect
     !--WARNING: This can make your account MORE VULNERABLE TO HACKING, ONLY PERFORM THIS WITH A TEST ACCOUNT--!
 
+    Launch profiles:
+        - "default": a normal, visible Chrome window (maximized once connected)
+        - "performance": lean headless Chrome tuned for running many browsers per host: headless=new, eager page loads,
+            no images/fonts/media, no background networking/extensions/GPU, a fixed small window and a bounded number
+            of renderer processes (see PERFORMANCE_ARGUMENTS).  Fonts/media are blocked over CDP once the browser is
+            launched, pass block_deny=LAUNCH_PROFILE_BLOCK_DENY[profile] to connect_googledrive
+
+    :param user_data_dir: Chrome profile directory to use (ex: one per parallel worker, so browsers running at the same
+        time don't share cookies/cache), if not provided Chrome creates a temporary profile
+    :type user_data_dir: str
+    :param profile: Launch profile, "default" or "performance"
+    :type profile: str
     :return: A configuration of the chrome options needed for testing
     :rtype: Options
     """
-    logger.info("Configuring google drive for testing")
+    from selenium.webdriver.chrome.options import Options
+
+    logger.info(f"Configuring google drive for testing ('{profile}' launch profile)")
+
+    if profile not in LAUNCH_PROFILES:
+        raise ValueError(f"Unknown launch profile '{profile}', available: {LAUNCH_PROFILES}")
 
     chrome_options = Options()
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")
@@ -52,6 +110,14 @@ def configure_fortesting_googledrive():
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_experimental_option("useAutomationExtension", False)
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    if user_data_dir:
+        chrome_options.add_argument(f"--user-data-dir={user_data_dir}")
+
+    if profile == "performance":
+        for argument in PERFORMANCE_ARGUMENTS:
+            chrome_options.add_argument(argument)
+        chrome_options.add_experimental_option("prefs", PERFORMANCE_PREFS)
+        chrome_options.page_load_strategy = "eager"  # continue once the DOM is ready, don't wait for every resource
 
     return chrome_options
 
@@ -67,6 +133,8 @@ def configure_keyring_googledrive(servicename: str, username: str):
     :param username: Cred's username
     :type username: str
     """
+    import keyring  # must install: pip install keyring
+
     logger.info("Configuring keyring for google drive creds")
 
     if not (keyring.get_credential(servicename, username)):
@@ -77,7 +145,9 @@ def configure_keyring_googledrive(servicename: str, username: str):
         logger.info("Keyring already exists, no action needed")
 
 
-def connect_googledrive(servicename: str, username: str, chrome_options: Options()):
+@timed("connect")
+def connect_googledrive(servicename: str, username: str, chrome_options: Options, reuse_login: bool = False,
+                        profile_commands: bool = False, block_deny: list = None):
     """
     Connects to Google Drive via Selenium and a web browser
 
@@ -87,113 +157,311 @@ def connect_googledrive(servicename: str, username: str, chrome_options: Options
     :type username:
     :param chrome_options: Google Chrome configuration options
     :type chrome_options: Options
+    :param reuse_login: The Chrome profile (user_data_dir) may already be logged in (ex: a clone of a logged in profile
+        template, see Selenium_googleDriveTestUpload_Profiles), only log in if its session has expired.  The driver's
+        gdrive_reused_login attribute is set to True if the login was skipped
+    :type reuse_login: bool
+    :param profile_commands: Record every WebDriver command with its latency and test step, from the launch on (see
+        Selenium_googleDriveTestUpload_CommandProfiler)
+    :type profile_commands: bool
+    :param block_deny: Request blocking categories/patterns set once the browser is launched (see
+        Selenium_googleDriveTestUpload_RequestBlocking), ex: LAUNCH_PROFILE_BLOCK_DENY[profile]; nothing is blocked if
+        not provided
+    :type block_deny: list
 
     :return: webdriver connection to chrome
     :rtype: webdriver
     """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.common.by import By
 
     logger.info("Beginning connection to google")
 
-    # Set the driver
+    # Set the driver (cached per Chrome version, only downloaded on a cache miss)
     logger.debug("Setting the chrome driver")
-    webdriver_service = Service(ChromeDriverManager().install())
+    webdriver_service = Service(resolve_chromedriver())
     driver = webdriver.Chrome(service=webdriver_service, options=chrome_options)
+    if profile_commands:
+        profile_driver_commands(driver=driver)
+
+    # Block the requests the launch profile doesn't need (Chrome has no command line switch for these)
+    if block_deny:
+        set_request_blocking(driver=driver, deny=block_deny)
+
+    # Maximize screen, unless the launch profile uses a fixed window size
+    if not any(argument.startswith("--window-size") for argument in chrome_options.arguments):
+        logger.debug("Maximize browser window size")
+        driver.maximize_window()
+
+    driver.gdrive_reused_login = reuse_login and is_logged_in_googledrive(driver)
+    if driver.gdrive_reused_login:
+        logger.info("Profile is already logged in, skipping the login")
+        return driver
+
+    try:
+        login_googledrive(driver=driver, servicename=servicename, username=username)
+    except Exception:
+        driver.quit()  # the caller never gets the driver, so don't leave the browser running
+        raise
+
+    # Now logged in, navigate to google drive, ready once the '+ New' button can be clicked
+    logger.debug("Navigate to google drive's home page")
+    driver.get(drive_web_url(DRIVE_HOME_PATH))
+    wait_for_element_interactable(driver=driver, by=By.CSS_SELECTOR, locator="button[guidedhelpid='new_menu_button']")
+
+    return driver
+
+
+def disconnect_googledrive(driver: webdriver):
+    """
+    Closes the connection to the test driver
+
+    :param driver: The webdriver to be closed
+    :driver type: webdriver
+    """
+    logger.info("Closing connection to google chrome driver")
+
+    driver.close()
+
 
-    # Open google website
-    logger.debug("Open web browser")
-    driver.get('https://www.google.com')
+def get_credentials_googledrive(force_refresh: bool = False):
+    """
+    Configures user's credentials to connect to Google Drive via API.
+
+    The creds are cached in memory for the whole process, so token.json is only read (and the token only refreshed)
+    when needed: the cached creds are returned as-is while the access token is still valid, and are only refreshed
+    when the token is within TOKEN_REFRESH_MARGIN_SEC of expiring.  Every time the creds are refreshed, a background
+    refresh is scheduled ahead of the next expiry so API calls don't have to wait on it.
+
+    :param force_refresh: Refresh the creds even if the cached access token is still valid
+    :type force_refresh: bool
+    :return: Google Drive credentials
+    :rtype: Credentials
+    """
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    import google.auth.exceptions
+
+    global _creds
+
+    with _creds_lock:
+        if _creds is not None and not force_refresh and not _creds_need_refresh(_creds):
+            return _creds
+
+        logger.info("Getting google drive login creds for Google's Drive API")
+
+        creds = _creds
+        # The file token.json stores the user's access and refresh tokens and is created automatically when the
+        # authorization flow completes for the first time
+        if creds is None and os.path.exists(TOKEN_FILE):
+            creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+
+        # only refresh if the token is (close to) expiring, or if requested
+        if creds and creds.refresh_token and (force_refresh or _creds_need_refresh(creds)):
+            # attempt to refresh the creds, sometimes this fails so might need to reset them
+            try:
+                creds.refresh(Request())
+                _save_token_googledrive(creds)
+            except google.auth.exceptions.RefreshError as error:
+                # if refresh token fails, reset creds to none, will recreate below
+                creds = None
+                logger.warning(f"Unable to refresh OAuth creds required for Google API calls, resetting. "
+                               f"Error: {error}")
+                logger.error(error)
+
+        # if there are no (valid) creds available, let the user log in
+        if not creds or not creds.valid:
+            flow = InstalledAppFlow.from_client_secrets_file(cred_file, SCOPES)
+            creds = flow.run_local_server(port=0)
+            # save the creds for the next run
+            _save_token_googledrive(creds)
+
+        _creds = creds
+        _schedule_credentials_refresh(creds)
+
+        return creds
 
-    # Maximize screen
-    logger.debug("Maximize browser window size")
-    driver.maximize_window()
+
+def is_logged_in_googledrive(driver: webdriver):
+    """
+    Checks if the browser is logged into Google Drive: opens the Google Drive home page, which redirects to the sign in
+    page if the session has expired (or never existed).
+
+    :param driver: Selenium webdriver
+    :type driver: webdriver
+    :return: True if logged in (and on the Google Drive home page, ready to use), False if not
+    :rtype: bool
+    """
+    from selenium.webdriver.common.by import By
+
+    logger.debug("Checking if the browser is already logged into google drive")
+
+    driver.get(drive_web_url(DRIVE_HOME_PATH))
+    if driver.current_url.startswith("https://accounts.google.com"):
+        logger.info("Browser is not logged into google drive (session expired or not logged in yet)")
+        return False
+
+    try:
+        wait_for_element_interactable(driver=driver, by=By.CSS_SELECTOR,
+                                      locator="button[guidedhelpid='new_menu_button']")
+    except Exception as e:
+        logger.info(f"Google drive home page did not load as logged in. Error: {e}")
+        return False
+
+    return True
+
+
+@timed("login")
+def login_googledrive(driver: webdriver, servicename: str, username: str):
+    """
+    Logs into the Google account through Google's sign in page, with the creds saved in the keyring.
+
+    :param driver: Selenium webdriver
+    :type driver: webdriver
+    :param servicename: Name of the service for which the creds are used, as saved in the keyring.
+    :type servicename: str
+    :param username: Cred's username, as saved in the keyring.
+    :type username: str
+    :raises RuntimeError: If the sign in doesn't complete (still on Google's sign in page) within LOGIN_TIMEOUT_SEC
+    """
+    from selenium.webdriver.common.by import By
+    import keyring  # must install: pip install keyring
+
+    logger.info("Logging into google")
 
     # Navigate to login Gmail
     logger.debug("Navigate to Google's login page")
-    driver.get(
-        "https://accounts.google.com/v3/signin/identifier?continue=https%3A%2F%2Fmail.google.com%2Fmail%2F&hl=en&service=mail&flowName=GlifWebSignIn&flowEntry=AddSession")
+    driver.get("https://accounts.google.com/v3/signin/identifier?continue=https%3A%2F%2Fmail.google.com%2Fmail%2F"
+               "&hl=en&service=mail&flowName=GlifWebSignIn&flowEntry=AddSession")
 
     # Login - pass through test email
     logger.debug("Login process (email) - enter test email")
-    driver.find_element(By.ID, "identifierId").send_keys(keyring.get_credential(servicename, username).username)
+    input_email = wait_for_element_interactable(driver=driver, by=By.CSS_SELECTOR, locator="#identifierId")
+    input_email.send_keys(keyring.get_credential(servicename, username).username)
 
-    # Login - click on 'Next' button and wait
+    # Login - click on 'Next' button
     logger.debug("Login process (email) - click 'next' button")
     driver.find_element(By.XPATH, "//span[text()='Next']").click()
-    driver.implicitly_wait(5)
 
-    # Input password and click on 'Next'
+    # Input password (as soon as the password page is ready) and click on 'Next'
     logger.debug("Login process (password) - enter password")
-    input_pass = WebDriverWait(driver, 5).until(
-        ec.element_to_be_clickable((By.XPATH, '//input[@name="Passwd"]')))
+    input_pass = wait_for_element_interactable(driver=driver, by=By.XPATH, locator='//input[@name="Passwd"]')
     input_pass.send_keys(keyring.get_password(servicename, username))
-    driver.implicitly_wait(3)
     logger.debug("Login process (password) - click 'next' button")
-    button_pass_next = WebDriverWait(driver, 5).until(
-        ec.element_to_be_clickable((By.XPATH, "//span[text()='Next']")))
+    button_pass_next = wait_for_element_interactable(driver=driver, by=By.XPATH, locator="//span[text()='Next']")
     button_pass_next.click()
-    driver.implicitly_wait(3)
-    # Now logged in, navigate to google drive
-    logger.debug("Navigate to google drive's home page")
-    driver.get("https://drive.google.com/drive/home")
-    driver.implicitly_wait(3)
+    # wait for the sign in to finish (google redirects away from the sign in page) before leaving the page
+    if not wait_until(lambda: not driver.current_url.startswith("https://accounts.google.com"),
+                      description="google sign in to complete", timeout=LOGIN_TIMEOUT_SEC):
+        raise RuntimeError("google sign in did not complete")
 
-    return driver
 
-
-def disconnect_googledrive(driver: webdriver):
+def _creds_need_refresh(creds: Credentials):
     """
-    Closes the connection to the test driver
+    Checks if the creds are invalid or the access token expires within TOKEN_REFRESH_MARGIN_SEC.
 
-    :param driver: The webdriver to be closed
-    :driver type: webdriver
+    :param creds: Google Drive credentials
+    :type creds: Credentials
+    :return: If the creds should be refreshed before being used
+    :rtype: bool
     """
-    logger.info("Closing connection to google chrome driver")
 
-    driver.close()
+    if not creds.valid:
+        return True
+    if creds.expiry is None:  # no expiry provided, nothing to refresh ahead of
+        return False
+
+    return _creds_seconds_to_expiry(creds) <= TOKEN_REFRESH_MARGIN_SEC
 
 
-def get_credentials_googledrive():
+def _creds_seconds_to_expiry(creds: Credentials):
     """
-    Configures user's credentials to connect to Google Drive via API
+    Seconds until the creds' access token expires (negative if it already has), compared in UTC.  google-auth stores
+    the expiry as a naive UTC datetime, it is made timezone aware before comparing (datetime.utcnow() is deprecated).
 
-    :return: Google Drive credentials
-    :rtype: Credentials
+    :param creds: Google Drive credentials, with an expiry
+    :type creds: Credentials
+    :return: Seconds until the access token expires
+    :rtype: float
     """
 
-    logger.info("Getting google drive login creds for Google's Drive API")
+    expiry = creds.expiry
+    if expiry.tzinfo is None:
+        expiry = expiry.replace(tzinfo=datetime.timezone.utc)
+
+    return (expiry - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
 
-    creds = None
-    # The file token.json stores the user's access and refresh tokens and is created automatically when the
-    # authorization flow completes for the first time
 
-    if os.path.exists("token.json"):
-        creds = Credentials.from_authorized_user_file("token.json", SCOPES)
-        # attempt to refresh the creds, sometimes this fails so might need to reset them
+def _refresh_credentials_background():
+    """
+    Runs on the background refresh timer: refreshes the cached creds ahead of the access token expiring.  Errors are
+    only logged, the next call to get_credentials_googledrive() will try again (or start the login flow, which is
+    never started from the background).
+    """
+    from google.auth.transport.requests import Request
+
+    logger.debug("Background refresh of google drive API creds")
+
+    with _creds_lock:
+        if _creds is None or not _creds.refresh_token:
+            return
+
         try:
-            creds.refresh(Request())
-        except google.auth.exceptions.RefreshError as error:
-            # if refresh token fails, reset creds to none, will recreate below
-            creds = None
-            logger.warning(f"Unable to refresh OAuth creds required for Google API calls, resetting. Error: {error}")
-            logger.error(error)
-
-    # if there are no (valid) creds available, let the user log in
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(cred_file, SCOPES)
-            creds = flow.run_local_server(port=0)
-            # save the creds for the next run
-            with open("token.json", "w") as token:
-                token.write(creds.to_json())
+            _creds.refresh(Request())
+            _save_token_googledrive(_creds)
+        except Exception as e:
+            logger.warning(f"Background refresh of google drive API creds failed, will retry on next use. Error: {e}")
+            return
+
+        _schedule_credentials_refresh(_creds)
+
+
+def _save_token_googledrive(creds: Credentials):
+    """
+    Saves the creds to token.json for the next run.  The creds are written to a temporary file first and then moved
+    into place, so another process reading token.json never sees a partially written file.
+
+    :param creds: Google Drive credentials
+    :type creds: Credentials
+    """
+
+    logger.debug(f"Saving google drive API creds to '{TOKEN_FILE}'")
+
+    fd, path_tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(TOKEN_FILE)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as token:
+            token.write(creds.to_json())
+        os.replace(path_tmp, TOKEN_FILE)
+    except Exception:
+        if os.path.exists(path_tmp):
+            os.remove(path_tmp)
+        raise
+
+
+def _schedule_credentials_refresh(creds: Credentials):
+    """
+    (Re)schedules the background refresh of the cached creds, TOKEN_REFRESH_MARGIN_SEC before the access token
+    expires.  The timer is a daemon thread, so it never keeps the test from exiting.
+
+    :param creds: Google Drive credentials
+    :type creds: Credentials
+    """
+
+    global _refresh_timer
+
+    if _refresh_timer is not None:
+        _refresh_timer.cancel()
+        _refresh_timer = None
 
-    return creds
+    if creds.expiry is None or not creds.refresh_token:  # nothing to refresh ahead of
+        return
 
-#----------------------
-servicename = "Google Drive Test Account"
-username = "testrreyna@gmail.com"
-fld_test = "Testing Folder (Selenium)"
+    delay = _creds_seconds_to_expiry(creds) - TOKEN_REFRESH_MARGIN_SEC
+    delay = max(delay, 0)
+    logger.debug(f"Scheduling background refresh of google drive API creds in {delay:.0f} second(s)")
 
-chrome_options = configure_fortesting_googledrive()  # !--WARNING, SHOULD ONLY RUN THIS WITH A TEST ACCOUNT
-driver_chrome = connect_googledrive(servicename=servicename, username=username, chrome_options=chrome_options)
+    _refresh_timer = threading.Timer(delay, _refresh_credentials_background)
+    _refresh_timer.daemon = True
+    _refresh_timer.start()
@@ -0,0 +1,428 @@
+"""
+SUMMARY: Shared Google Drive API (v3) helpers used by the folder, file and clean up modules.  Holds a single,
+    long-lived Drive service object for the session so the discovery document is only loaded and parsed once and the
+    same transport is reused by every API call, instead of calling build() inside every helper.
+
+    The service's transport is a pooled, thread-safe HTTP session (requests/urllib3, authorized with the session's
+    creds) instead of googleapiclient's default httplib2 transport, which is not thread-safe and opens a new TLS
+    connection per client.  Connections are kept alive and reused, so API calls can be fanned out across threads
+    without a TLS handshake per call.  Pool size, gzip and the timeout are set with configure_transport_googledrive,
+    and per-request timing hooks can be added with add_transport_hook.
+
+    The API calls can be pointed at another server with set_drive_api_endpoint (ex: the local mock Drive API, see
+    Selenium_googleDriveTestUpload_MockDrive), which also replaces the OAuth creds with anonymous creds.
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+import logging
+import threading
+import time
+import uuid
+from Selenium_googleDriveTestUpload_Connection import get_credentials_googledrive
+
+logger = logging.getLogger('seleniumTest.driveAPI')  # drive API logger
+
+# Global variables
+MIMETYPE_FOLDER = "application/vnd.google-apps.folder"
+DEFAULT_PAGE_SIZE = 100  # files.list page size, Drive allows up to 1000
+BATCH_LIMIT = 100  # maximum number of calls the Drive API accepts in one batch request
+RUN_ID_PROPERTY = "seleniumRunId"  # appProperties key used to tag the items created by a test run
+MAX_QUERY_LENGTH = 2000  # keep queries that are built from many values under this length (split into several queries)
+TRANSPORT_POOL_SIZE = 20  # keep-alive connections kept per host, should be >= the number of threads making API calls
+TRANSPORT_GZIP = True  # ask for gzip compressed responses
+TRANSPORT_TIMEOUT_SEC = 60  # timeout of each HTTP request
+DRIVE_API_ROOT = "https://www.googleapis.com"  # root of every Drive API URL (files, upload and batch)
+
+_service = None  # shared Drive service, created on first use by get_service_googledrive()
+_service_creds = None  # the creds _service was built with
+_service_lock = threading.Lock()  # guards _service, so threads don't build it at the same time
+_transport_config = {'pool_size': TRANSPORT_POOL_SIZE, 'gzip': TRANSPORT_GZIP, 'timeout': TRANSPORT_TIMEOUT_SEC}
+_transport_hooks = []  # functions called with a record of every HTTP request, see add_transport_hook
+_api_endpoint = ""  # replaces DRIVE_API_ROOT when set, see set_drive_api_endpoint
+_endpoint_creds = None  # creds used with _api_endpoint
+
+
+class _PooledHttp:
+    """
+    httplib2.Http compatible transport (what googleapiclient calls) on top of a pooled, authorized requests session.
+    requests/urllib3 connection pools are thread-safe, so one instance is shared by every thread.
+    """
+
+    def __init__(self, creds, pool_size: int, gzip: bool, timeout: float, endpoint: str = ""):
+        import requests
+        from google.auth.transport.requests import AuthorizedSession
+
+        self.credentials = creds  # googleapiclient applies these to each part of a batch request
+        self.gzip = gzip
+        self.timeout = timeout
+        self.endpoint = endpoint
+        self.session = AuthorizedSession(creds)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+        import httplib2  # installed with google-api-python-client, only its Response class is used
+
+        if self.endpoint and uri.startswith(DRIVE_API_ROOT):
+            uri = self.endpoint + uri[len(DRIVE_API_ROOT):]
+
+        headers = dict(headers or {})
+        if self.gzip:  # Google only compresses the response if the user agent also asks for it
+            headers['accept-encoding'] = "gzip"
+            headers['user-agent'] = f"{headers.get('user-agent') or 'google-api-python-client'} (gzip)"
+        else:
+            headers['accept-encoding'] = "identity"
+
+        start = time.monotonic()
+        resp = self.session.request(method, uri, data=body, headers=headers, timeout=self.timeout,
+                                    allow_redirects=redirections > 0)
+        seconds = time.monotonic() - start
+
+        hooks = list(_transport_hooks)
+        if hooks:  # the record (and the bodies it holds on to) is only built when something reads it
+            # bytes_received is the size on the wire (compressed with gzip), resp.content is already decompressed
+            wire_bytes = resp.raw.tell() if hasattr(resp.raw, "tell") else len(resp.content)
+            record = {'method': method, 'uri': uri, 'status': resp.status_code, 'seconds': seconds,
+                      'bytes_sent': len(body) if body else 0, 'bytes_received': wire_bytes,
+                      'bytes_decompressed': len(resp.content), 'request_body': body, 'response_body': resp.content,
+                      'started': start}
+            for hook in hooks:
+                try:
+                    hook(record)
+                except Exception as e:  # a broken hook must never break the API call
+                    logger.warning(f"Transport hook {hook} failed. Error: {e}")
+
+        # httplib2 style response: a dict of the (lower case) headers with status and reason attributes
+        response = httplib2.Response({'status': resp.status_code, **resp.headers})
+        response.reason = resp.reason
+        # content is already decompressed, don't let googleapiclient try again
+        response.pop('content-encoding', None)
+
+        return response, resp.content
+
+    def close(self):
+        self.session.close()
+
+
+def add_transport_hook(hook):
+    """
+    Adds a function that is called after every Drive API HTTP request (including batch requests), with a record of the
+    request: {'method': 'GET', 'uri': '...', 'status': 200, 'seconds': 0.12, 'bytes_sent': 0,
+    'bytes_received': 1520 (on the wire, gzip compressed), 'bytes_decompressed': 6130, 'request_body': None,
+    'response_body': b'...' (decompressed), 'started': monotonic start time}.  The record is only built while at
+    least one hook is added.  Hooks run on the thread that made the request and must be quick (ex: append to a list);
+    keeping the bodies keeps every response in memory.
+
+    :param hook: Function with one parameter, the request record
+    :type hook: function
+    """
+
+    _transport_hooks.append(hook)
+
+
+def configure_transport_googledrive(pool_size: int = TRANSPORT_POOL_SIZE, gzip: bool = TRANSPORT_GZIP,
+                                    timeout: float = TRANSPORT_TIMEOUT_SEC):
+    """
+    Configures the pooled HTTP transport used by the shared Drive service, the service is rebuilt on next use.
+
+    :param pool_size: Keep-alive connections kept per host, should be >= the number of threads making API calls
+    :type pool_size: int
+    :param gzip: Ask for gzip compressed responses
+    :type gzip: bool
+    :param timeout: Timeout of each HTTP request, in seconds
+    :type timeout: float
+    """
+
+    logger.info(f"Configuring Drive API transport: pool size {pool_size}, gzip {gzip}, timeout {timeout} second(s)")
+    _transport_config.update(pool_size=pool_size, gzip=gzip, timeout=timeout)
+    reset_service_googledrive()
+
+
+def remove_transport_hook(hook):
+    """
+    Removes a function added with add_transport_hook (if it was added).
+
+    :param hook: Function added with add_transport_hook
+    :type hook: function
+    """
+
+    if hook in _transport_hooks:
+        _transport_hooks.remove(hook)
+
+
+def get_service_googledrive():
+    """
+    Gets the session's shared Google Drive API (v3) service, building it the first time it is requested.
+
+    The discovery document is loaded from the copy packaged with google-api-python-client (static discovery), so
+    building the service does not make a network call, and it is only built once per session.  The cached creds are
+    refreshed in place (see get_credentials_googledrive), so the service is only rebuilt if the creds are replaced.
+    The service (and its pooled transport) is safe to share across threads.
+
+    :return: Google Drive API service
+    :rtype: Resource
+    """
+    from googleapiclient.discovery import build
+
+    global _service, _service_creds
+
+    creds = _endpoint_creds if _api_endpoint else get_credentials_googledrive()
+    with _service_lock:
+        if _service is None or creds is not _service_creds:
+            logger.debug("Building the shared Google Drive API service")
+            if _service is not None:
+                _service._http.close()
+            http = _PooledHttp(creds=creds, endpoint=_api_endpoint, **_transport_config)
+            _service = build("drive", "v3", http=http, static_discovery=True, cache_discovery=False)
+            _service_creds = creds
+
+        return _service
+
+
+def reset_service_googledrive():
+    """
+    Discards the shared Google Drive API service, the next call to get_service_googledrive() will build a new one.
+    (ex: after the OAuth creds have been reset)
+    """
+
+    global _service, _service_creds
+
+    logger.debug("Resetting the shared Google Drive API service")
+    with _service_lock:
+        if _service is not None:
+            _service._http.close()
+        _service = None
+        _service_creds = None
+
+
+def set_drive_api_endpoint(url: str = "", creds=None):
+    """
+    Points every Drive API call at another server (ex: the local mock Drive API), instead of
+    https://www.googleapis.com.  The shared service is rebuilt on next use.
+
+    :param url: Root of the server (ex: "http://127.0.0.1:50123"), empty to go back to the real Drive API
+    :type url: str
+    :param creds: Creds sent to the server, defaults to anonymous creds (no OAuth token needed)
+    :type creds: Credentials
+    """
+
+    global _api_endpoint, _endpoint_creds
+
+    if url and creds is None:
+        from google.auth.credentials import AnonymousCredentials
+        creds = AnonymousCredentials()
+
+    logger.info(f"Drive API endpoint set to '{url or DRIVE_API_ROOT}'")
+    _api_endpoint = url.rstrip("/")
+    _endpoint_creds = creds if url else None
+    reset_service_googledrive()
+
+
+def build_name_queries(names: list, query_base: str = "", max_length: int = MAX_QUERY_LENGTH):
+    """
+    Builds the Drive API queries to find items by any of the provided names, OR-combining the names into as few queries
+    as possible while keeping each query under max_length (ex: "(name = 'a.txt' or name = 'b.txt') and trashed=false").
+    A name that doesn't fit in a query on its own still gets its own query.
+
+    :param names: Names of the items
+    :type names: list
+    :param query_base: Query every returned query must also match, combined with 'and' (ex: "trashed=false")
+    :type query_base: str
+    :param max_length: Maximum length of each query
+    :type max_length: int
+    :return: List of queries that together cover all the names
+    :rtype: list
+    """
+
+    suffix = f" and {query_base}" if query_base else ""
+    queries = []
+    clauses = []
+
+    for name in dict.fromkeys(names):  # remove duplicates, keeping the order
+        clause = f"name = '{escape_query_value(name)}'"
+        if clauses and len(f"({' or '.join(clauses + [clause])}){suffix}") > max_length:
+            queries.append(f"({' or '.join(clauses)}){suffix}")
+            clauses = []
+        clauses.append(clause)
+
+    if clauses:
+        queries.append(f"({' or '.join(clauses)}){suffix}")
+
+    return queries
+
+
+def delete_googledrive_item(item_id: str):
+    """
+    Using Google API, deletes a Google Drive item (file or folder) by ID, one request.  Same result as each delete of
+    delete_googledrive_items_batch: an item that is already gone (404) is counted as deleted.
+
+    :param item_id: Google ID of the item to be deleted
+    :type item_id: str
+    :return: Success value - True if the item was deleted (or already gone), False if not
+    :rtype: bool
+    """
+    from googleapiclient.errors import HttpError
+
+    try:
+        get_service_googledrive().files().delete(fileId=item_id).execute()
+        logger.debug(f"Item ID '{item_id}' successfully deleted.")
+        return True
+    except HttpError as error:
+        if error.resp.status == 404:
+            logger.info(f"Item ID '{item_id}' not found, already deleted.")
+            return True
+        logger.error(f"Failed to delete item ID '{item_id}'. Error: {error}")
+        return False
+
+
+def delete_googledrive_items_batch(item_ids: list, batch_size: int = BATCH_LIMIT):
+    """
+    Using Google API, deletes Google Drive items (files or folders) by ID, grouping up to batch_size deletes into each
+    HTTP request via the Drive batch endpoint.  The items are not validated before deleting: an item that is already
+    gone (404) is counted as deleted.
+
+    :param item_ids: Google IDs of the items to be deleted
+    :type item_ids: list
+    :param batch_size: Maximum number of deletes per batch request (Drive allows up to BATCH_LIMIT)
+    :type batch_size: int
+    :return: Success value for each ID, {'IDvalue': True} if the item was deleted (or already gone), False if not
+    :rtype: dict
+    """
+    from googleapiclient.errors import HttpError
+
+    item_ids = list(dict.fromkeys(item_ids))  # remove duplicates, the ID is used as the batch request ID
+    results = {}
+
+    logger.info(f"Deleting {len(item_ids)} item(s) in batches of up to {batch_size}...")
+
+    def callback(request_id, response, exception):
+        if exception is None:
+            logger.debug(f"Item ID '{request_id}' successfully deleted.")
+            results[request_id] = True
+        elif isinstance(exception, HttpError) and exception.resp.status == 404:
+            logger.info(f"Item ID '{request_id}' not found, already deleted.")
+            results[request_id] = True
+        else:
+            logger.error(f"Failed to delete item ID '{request_id}'. Error: {exception}")
+            results[request_id] = False
+
+    service = get_service_googledrive()
+    for i in range(0, len(item_ids), batch_size):
+        batch_ids = item_ids[i:i + batch_size]
+        batch = service.new_batch_http_request(callback=callback)
+        for item_id in batch_ids:
+            batch.add(service.files().delete(fileId=item_id), request_id=item_id)
+
+        try:
+            batch.execute()
+        except HttpError as error:  # the whole batch request failed
+            logger.error(f"Batch delete of {len(batch_ids)} item(s) failed. Error: {error}")
+            for item_id in batch_ids:
+                results.setdefault(item_id, False)
+
+    return results
+
+
+def escape_query_value(value: str):
+    """
+    Escapes a value so it can be used inside single quotes in a Drive API query (ex: name = '<value>').
+
+    :param value: Value to be escaped
+    :type value: str
+    :return: The value with any backslashes and single quotes escaped
+    :rtype: str
+    """
+
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+
+def list_googledrive_items(query: str, fields: str = "id", page_size: int = DEFAULT_PAGE_SIZE):
+    """
+    Lazily lists the Google Drive items matching a query, following nextPageToken until every page has been read.
+    Items are yielded one at a time as each page comes back, so callers can stop early (ex: existence checks only need
+    the first item) or go through every result (ex: clean up) without holding all the results in memory.
+
+    :param query: Drive API query (ex: "name = 'testFile-1.txt' and trashed=false")
+    :type query: str
+    :param fields: Fields to return for each item, keep this to what the caller needs (ex: "id, createdTime, parents")
+    :type fields: str
+    :param page_size: Maximum number of items per page (files.list call)
+    :type page_size: int
+    :return: Generator of items, each a dictionary of the requested fields
+    :rtype: generator
+    """
+
+    service = get_service_googledrive()
+    page_token = None
+
+    while True:
+        # Call the Drive v3 API
+        results = (
+            service.files()
+            .list(q=query,
+                  spaces="drive",
+                  fields=f"nextPageToken, files({fields})",
+                  pageSize=page_size,
+                  pageToken=page_token)
+            .execute()
+        )
+
+        for item in results.get("files", []):
+            yield item
+
+        page_token = results.get("nextPageToken")
+        if page_token is None:
+            break
+
+
+def new_run_id():
+    """
+    Creates a new, unique ID for a test run.  Used to tag (and name) everything the run creates, so concurrent runs on
+    the same account can each clean up only their own items.
+
+    :return: Run ID (ex: '3f9c2a7e51b0')
+    :rtype: str
+    """
+
+    return uuid.uuid4().hex[:12]
+
+
+def query_run_id(run_id: str):
+    """
+    Builds the Drive API query for all items tagged with a run ID (see tag_googledrive_item).  appProperties are
+    indexed by Drive, so this is a single query no matter how many items are in the account.
+
+    :param run_id: ID of the test run
+    :type run_id: str
+    :return: Drive API query
+    :rtype: str
+    """
+
+    return f"appProperties has {{ key='{RUN_ID_PROPERTY}' and value='{escape_query_value(run_id)}' }}"
+
+
+def tag_googledrive_item(item_id: str, run_id: str):
+    """
+    Using Google API, tags a Google Drive item (file or folder) with the ID of the test run that created it, as a
+    private app property (only visible to this app).
+
+    :param item_id: Google ID of the item to be tagged
+    :type item_id: str
+    :param run_id: ID of the test run
+    :type run_id: str
+    :return: Success value - returns True if the item was tagged, False if not
+    :rtype: bool
+    """
+    from googleapiclient.errors import HttpError
+
+    logger.debug(f"Tagging item ID '{item_id}' with run ID '{run_id}'")
+
+    try:
+        (get_service_googledrive().files()
+         .update(fileId=item_id, body={"appProperties": {RUN_ID_PROPERTY: run_id}}, fields="id")
+         .execute())
+        return True
+    except HttpError as error:
+        logger.error(f"Unable to tag item ID '{item_id}' with run ID '{run_id}'. Error: {error}")
+        return False
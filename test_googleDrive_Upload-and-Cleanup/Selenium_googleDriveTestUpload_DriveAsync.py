@@ -0,0 +1,223 @@
+"""
+SUMMARY: asyncio versions of the Google Drive API helpers (get_folder_googledrive_id, validate_file_exists,
+    delete_file_googledrive_by_id, ...), so independent API calls (ex: deleting thousands of leftover test items, or
+    validating every uploaded file) run concurrently instead of one after the other.
+
+    These are wrappers, not an asyncio-native HTTP client: each call runs the regular (blocking) helper on a shared
+    thread pool (the Drive service's pooled transport is thread-safe, see Selenium_googleDriveTestUpload_DriveAPI),
+    with:
+        - Bounded concurrency: at most ASYNC_CONCURRENCY calls in flight, the rest wait their turn (semaphore).  A call
+            keeps its slot until its thread is done, even if it timed out or was cancelled
+        - Deadlines: each call has a timeout, and the many-item helpers also take a deadline for the whole operation
+        - Cooperative cancellation: cancelling (or reaching the deadline) stops every call that hasn't started yet;
+            calls already in flight finish (an HTTP request can't be interrupted) but their results are not waited for.
+            A call whose thread had already finished when it was cancelled (or timed out) keeps its result
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+import asyncio
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from Selenium_googleDriveTestUpload_DriveAPI import delete_googledrive_item
+from Selenium_googleDriveTestUpload_Files import (delete_file_googledrive_by_id, get_file_googledrive_id,
+                                                  validate_file_exists)
+from Selenium_googleDriveTestUpload_Folders import (delete_folder_googledrive_by_id, get_folder_googledrive_id,
+                                                    validate_folder_exists)
+
+logger = logging.getLogger('seleniumTest.driveAsync')  # async drive API logger
+
+# Global variables
+ASYNC_CONCURRENCY = 20  # API calls in flight at once, keep <= the transport's pool size (TRANSPORT_POOL_SIZE)
+ASYNC_CALL_TIMEOUT_SEC = 120  # timeout of each API call
+
+_executor = None  # shared thread pool the API calls run on, created on first use
+_semaphores = {}  # {event loop: semaphore}, a semaphore can only be used by the loop it was first used in
+
+
+def configure_async_googledrive(concurrency: int = ASYNC_CONCURRENCY):
+    """
+    Sets how many API calls can be in flight at once (takes effect for the next event loop, ex: next asyncio.run).
+
+    :param concurrency: API calls in flight at once, keep <= the transport's pool size (configure_transport_googledrive)
+    :type concurrency: int
+    """
+
+    global ASYNC_CONCURRENCY, _executor
+
+    logger.info(f"Async Drive API concurrency set to {concurrency}")
+    ASYNC_CONCURRENCY = concurrency
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+    _semaphores.clear()
+
+
+async def delete_file_googledrive_by_id_async(file_id: str, timeout: float = ASYNC_CALL_TIMEOUT_SEC):
+    """Async version of delete_file_googledrive_by_id: True if the file was deleted (or already gone), else False"""
+
+    return await _run_limited(delete_file_googledrive_by_id, timeout, file_id=file_id)
+
+
+async def delete_folder_googledrive_by_id_async(fld_id: str, timeout: float = ASYNC_CALL_TIMEOUT_SEC):
+    """Async version of delete_folder_googledrive_by_id: True if the folder was deleted (or already gone), else False"""
+
+    return await _run_limited(delete_folder_googledrive_by_id, timeout, fld_id=fld_id)
+
+
+async def delete_googledrive_items_async(items: list, deadline_sec: float = None,
+                                         timeout: float = ASYNC_CALL_TIMEOUT_SEC):
+    """
+    Deletes many folders/files concurrently (bounded by ASYNC_CONCURRENCY), one delete request per item.  Like the
+    batched deletes (delete_googledrive_items_batch), an item that is already gone (404) is counted as deleted (ex: an
+    item inside a folder deleted in the same sweep, or deleted by another run).
+
+    :param items: Items to delete, each as {'id': 'IDvalue', 'mimeType': 'type', ...} (ex: plan_cleanup's 'delete')
+    :type items: list
+    :param deadline_sec: Time allowed for all the deletes, the ones not started by then are cancelled (None: no limit)
+    :type deadline_sec: float
+    :param timeout: Timeout of each delete
+    :type timeout: float
+    :return: Success value for each ID, {'IDvalue': True/False}; cancelled, timed out or failed deletes are False
+    :rtype: dict
+    """
+
+    results = await _gather_with_deadline(
+        {item['id']: _run_limited(delete_googledrive_item, timeout, item_id=item['id']) for item in items},
+        deadline_sec=deadline_sec)
+    return {item_id: result is True for item_id, result in results.items()}
+
+
+async def get_file_googledrive_id_async(filename: str, timeout: float = ASYNC_CALL_TIMEOUT_SEC):
+    """Async version of get_file_googledrive_id: list of {'id', 'createdTime', 'parents'}, None if not found"""
+
+    return await _run_limited(get_file_googledrive_id, timeout, filename=filename)
+
+
+async def get_folder_googledrive_id_async(fldname: str, timeout: float = ASYNC_CALL_TIMEOUT_SEC):
+    """Async version of get_folder_googledrive_id: list of {'id', 'createdTime', 'parents'}, None if not found"""
+
+    return await _run_limited(get_folder_googledrive_id, timeout, fldname=fldname)
+
+
+async def validate_file_exists_async(filename: str = "", file_id: str = "", fld_id: str = "",
+                                     timeout: float = ASYNC_CALL_TIMEOUT_SEC):
+    """Async version of validate_file_exists: True if the file exists"""
+
+    return await _run_limited(validate_file_exists, timeout, filename=filename, file_id=file_id, fld_id=fld_id)
+
+
+async def validate_files_exist_async(file_ids: list, fld_id: str = "", deadline_sec: float = None,
+                                     timeout: float = ASYNC_CALL_TIMEOUT_SEC):
+    """
+    Validates many files concurrently by ID (bounded by ASYNC_CONCURRENCY), with (optionally) folder location.
+    *To validate by name, validate_files_exist already combines the names into as few queries as possible.
+
+    :param file_ids: Google IDs of the files to be validated
+    :type file_ids: list
+    :param fld_id: Google ID of the folder where the files should be located (optional)
+    :type fld_id: str
+    :param deadline_sec: Time allowed for all the validations, the ones not started by then are cancelled
+    :type deadline_sec: float
+    :param timeout: Timeout of each validation
+    :type timeout: float
+    :return: If each file exists, {'IDvalue': True/False}; cancelled, timed out or failed validations are False
+    :rtype: dict
+    """
+
+    results = await _gather_with_deadline(
+        {file_id: validate_file_exists_async(file_id=file_id, fld_id=fld_id, timeout=timeout) for file_id in file_ids},
+        deadline_sec=deadline_sec)
+    return {file_id: result is True for file_id, result in results.items()}
+
+
+async def validate_folder_exists_async(fldname: str = "", fld_id: str = "", timeout: float = ASYNC_CALL_TIMEOUT_SEC):
+    """Async version of validate_folder_exists: True if the folder exists"""
+
+    return await _run_limited(validate_folder_exists, timeout, fldname=fldname, fld_id=fld_id)
+
+
+async def _gather_with_deadline(calls: dict, deadline_sec: float = None):
+    """
+    Runs {key: coroutine} concurrently and returns {key: result}.  Calls that fail, time out or are cancelled (by the
+    deadline or by cancelling the caller) get their exception as the result.
+    """
+
+    if not calls:
+        return {}
+
+    start = time.monotonic()
+    tasks = {key: asyncio.ensure_future(call) for key, call in calls.items()}
+    try:
+        await asyncio.wait(tasks.values(), timeout=deadline_sec)
+    finally:
+        pending = [task for task in tasks.values() if not task.done()]
+        for task in pending:  # caller cancelled or deadline reached: calls not started yet will never start
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)  # let the cancelled calls finish (keeping a result that came in)
+
+    results = {}
+    for key, task in tasks.items():
+        if task.cancelled():
+            results[key] = asyncio.CancelledError()
+        elif task.exception() is not None:
+            results[key] = task.exception()
+            logger.error(f"Async Drive API call for '{key}' failed. Error: {results[key]!r}")
+        else:
+            results[key] = task.result()
+
+    cancelled = sum(isinstance(result, asyncio.CancelledError) for result in results.values())
+    if cancelled:
+        logger.warning(f"{cancelled} of {len(results)} async Drive API call(s) cancelled, deadline of {deadline_sec} "
+                       f"second(s) reached")
+    logger.info(f"{len(results)} async Drive API call(s) finished in {time.monotonic() - start:.2f} second(s)")
+
+    return results
+
+
+def _get_executor():
+    """Shared thread pool the API calls run on, created on first use"""
+
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=ASYNC_CONCURRENCY, thread_name_prefix="driveAsync")
+    return _executor
+
+
+def _get_semaphore():
+    """Semaphore limiting the calls in flight, one per event loop"""
+
+    loop = asyncio.get_running_loop()
+    for other in [other for other in _semaphores if other.is_closed()]:  # drop finished loops (ex: earlier runs)
+        del _semaphores[other]
+    if loop not in _semaphores:
+        _semaphores[loop] = asyncio.Semaphore(ASYNC_CONCURRENCY)
+    return _semaphores[loop]
+
+
+async def _run_limited(function, timeout: float, **kwargs):
+    """
+    Runs a (blocking) Drive API helper on the thread pool, once a slot is free, with a timeout.  The slot is only
+    released when the thread is done: a timeout or cancellation stops the waiting, not the HTTP call.  The helper runs
+    in a copy of the caller's context, so its API calls are attributed to the step (span) open in the caller.
+    """
+
+    semaphore = _get_semaphore()
+    await semaphore.acquire()
+    try:
+        work = _get_executor().submit(contextvars.copy_context().run, function, **kwargs)
+    except BaseException:
+        semaphore.release()
+        raise
+    call = asyncio.wrap_future(work)
+    call.add_done_callback(lambda _: semaphore.release())
+
+    try:
+        return await asyncio.wait_for(asyncio.shield(call), timeout=timeout)
+    except (asyncio.CancelledError, asyncio.TimeoutError):
+        if work.done() and not work.cancelled() and work.exception() is None:
+            return work.result()  # finished as it was cancelled/timed out, keep its result
+        raise
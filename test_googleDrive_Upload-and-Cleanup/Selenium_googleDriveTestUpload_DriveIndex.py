@@ -0,0 +1,218 @@
+"""
+SUMMARY: Optional local index of the Google Drive account's file/folder metadata.  The index is seeded once with a
+    full listing, and then kept current with Drive's Changes API (changes.getStartPageToken/changes.list), so existence
+    checks and ID look ups in the folder and file modules can be answered from memory instead of with a files.list
+    query each time.
+
+    The index is synced (only the changes since the last sync are read) whenever it is used and the last sync is older
+    than the freshness bound (max_staleness_sec).  If a look up doesn't find anything, the index is synced and checked
+    once more, so items that were just created (ex: by Selenium) are still found.  These re-syncs are made at most once
+    per min_recheck_sec, so a caller polling for an item (ex: wait_until) doesn't send a changes.list call per poll.
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+import logging
+import threading
+import time
+from Selenium_googleDriveTestUpload_DriveAPI import get_service_googledrive, list_googledrive_items, MIMETYPE_FOLDER
+
+logger = logging.getLogger('seleniumTest.driveIndex')  # drive index logger
+
+# Global variables
+INDEX_FIELDS = "id, name, mimeType, parents, createdTime, md5Checksum, size, trashed"  # metadata kept in the index
+INDEX_MAX_STALENESS_SEC = 5  # default freshness bound, index is synced before use if the last sync is older
+INDEX_MIN_RECHECK_SEC = 0.5  # default minimum time between the syncs made because a look up found nothing
+
+_index = None  # the index, created by enable_index_googledrive()
+_index_lock = threading.RLock()  # guards _index
+
+
+def disable_index_googledrive():
+    """
+    Disables (and discards) the local index, the folder and file modules go back to querying the Drive API.
+    """
+
+    global _index
+
+    logger.info("Disabling local google drive index")
+
+    with _index_lock:
+        _index = None
+
+
+def enable_index_googledrive(max_staleness_sec: float = INDEX_MAX_STALENESS_SEC,
+                             min_recheck_sec: float = INDEX_MIN_RECHECK_SEC):
+    """
+    Enables the local index: seeds it with the metadata of every (non trashed) item in the account and saves the
+    Changes API start token, so later syncs only read what changed.  The start token is requested before the seed
+    listing, so nothing that changes while seeding is missed.
+
+    :param max_staleness_sec: Freshness bound, the index is synced before being used if the last sync is older
+    :type max_staleness_sec: float
+    :param min_recheck_sec: Minimum time between the syncs made because a look up found nothing (see index_find_items)
+    :type min_recheck_sec: float
+    """
+
+    global _index
+
+    logger.info("Enabling local google drive index, seeding from a full listing")
+
+    start_page_token = get_service_googledrive().changes().getStartPageToken().execute()["startPageToken"]
+
+    index = {'items': {}, 'byname': {}, 'byparent': {}, 'page_token': start_page_token,
+             'max_staleness_sec': max_staleness_sec, 'min_recheck_sec': min_recheck_sec, 'synced': time.monotonic()}
+    for item in list_googledrive_items(query="trashed=false", fields=INDEX_FIELDS, page_size=1000):
+        _index_add_item(index=index, item=item)
+
+    logger.info(f"Local google drive index seeded with {len(index['items'])} item(s)")
+
+    with _index_lock:
+        _index = index
+
+
+def index_enabled():
+    """
+    :return: If the local index is enabled
+    :rtype: bool
+    """
+
+    return _index is not None
+
+
+def index_find_items(name: str = "", is_folder: bool = None, parent: str = "", item_id: str = "",
+                     recheck_missing: bool = True):
+    """
+    Finds items in the local index, syncing it first if it is stale.  If nothing is found, the index is synced and
+    checked once more (in case the item was just created), unless it was synced within the last min_recheck_sec.  At
+    least one of name, parent or item_id is required.
+
+    :param name: Name of the item(s)
+    :type name: str
+    :param is_folder: True to only return folders, False to only return files, None for both
+    :type is_folder: bool
+    :param parent: Google ID of the folder the item(s) must be in
+    :type parent: str
+    :param item_id: Google ID of the item
+    :type item_id: str
+    :param recheck_missing: If nothing is found, sync and check again (pass False if the index was just synced)
+    :type recheck_missing: bool
+    :return: Copies of the matching items, each as {'id': 'IDvalue', 'name': 'name', 'parents': ['parentID'], ...}
+    :rtype: list
+    """
+
+    with _index_lock:
+        sync_index_googledrive()
+        items = _index_match(name=name, is_folder=is_folder, parent=parent, item_id=item_id)
+
+        # double check against the latest changes before reporting as missing
+        if not items and recheck_missing and recheck_index_googledrive():
+            items = _index_match(name=name, is_folder=is_folder, parent=parent, item_id=item_id)
+
+        return [dict(item) for item in items]
+
+
+def recheck_index_googledrive():
+    """
+    Syncs the index because a look up found nothing (in case the item was just created), unless it was already synced
+    within the last min_recheck_sec.
+
+    :return: If the index was synced
+    :rtype: bool
+    """
+
+    with _index_lock:
+        if _index is None or time.monotonic() - _index['synced'] < _index['min_recheck_sec']:
+            return False
+        sync_index_googledrive(force=True)
+
+        return True
+
+
+def sync_index_googledrive(force: bool = False):
+    """
+    Applies the changes made in the account since the last sync (changes.list) to the local index.  Skipped if the last
+    sync is within the freshness bound, unless forced.
+
+    :param force: Sync even if the index is still within the freshness bound
+    :type force: bool
+    """
+
+    with _index_lock:
+        if _index is None:
+            return
+        if not force and time.monotonic() - _index['synced'] < _index['max_staleness_sec']:
+            return
+
+        service = get_service_googledrive()
+        page_token = _index['page_token']
+        count = 0
+
+        while page_token is not None:
+            results = (
+                service.changes()
+                .list(pageToken=page_token,
+                      spaces="drive",
+                      pageSize=1000,
+                      fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({INDEX_FIELDS}))")
+                .execute()
+            )
+
+            for change in results.get("changes", []):
+                count += 1
+                _index_remove_item(index=_index, item_id=change['fileId'])
+                if not change.get('removed') and not change.get('file', {}).get('trashed', False):
+                    _index_add_item(index=_index, item=change['file'])
+
+            if "newStartPageToken" in results:  # last page, save the token for the next sync
+                _index['page_token'] = results["newStartPageToken"]
+            page_token = results.get("nextPageToken")
+
+        _index['synced'] = time.monotonic()
+        logger.debug(f"Local google drive index synced, {count} change(s) applied")
+
+
+def _index_add_item(index: dict, item: dict):
+    """Adds an item to the index and its name/parent look ups"""
+
+    index['items'][item['id']] = item
+    index['byname'].setdefault(item.get('name'), set()).add(item['id'])
+    for parent in item.get('parents', []):
+        index['byparent'].setdefault(parent, set()).add(item['id'])
+
+
+def _index_match(name: str, is_folder: bool, parent: str, item_id: str):
+    """Finds the items in the index matching all the provided values, see index_find_items"""
+
+    if item_id:
+        ids = {item_id} if item_id in _index['items'] else set()
+    elif name:
+        ids = _index['byname'].get(name, set())
+    elif parent:
+        ids = _index['byparent'].get(parent, set())
+    else:
+        raise ValueError("index_find_items requires a name, parent or item ID")
+
+    items = []
+    for found_id in ids:
+        item = _index['items'][found_id]
+        if name and item.get('name') != name:
+            continue
+        if parent and parent not in item.get('parents', []):
+            continue
+        if is_folder is not None and (item.get('mimeType') == MIMETYPE_FOLDER) is not is_folder:
+            continue
+        items.append(item)
+
+    return items
+
+
+def _index_remove_item(index: dict, item_id: str):
+    """Removes an item (if it exists) from the index and its name/parent look ups"""
+
+    item = index['items'].pop(item_id, None)
+    if item is None:
+        return
+
+    index['byname'].get(item.get('name'), set()).discard(item_id)
+    for parent in item.get('parents', []):
+        index['byparent'].get(parent, set()).discard(item_id)
@@ -0,0 +1,236 @@
+"""
+SUMMARY: Offline, cached ChromeDriver resolution.  Instead of calling ChromeDriverManager().install() on every browser
+    launch (a network version look up before Chrome can even start), the ChromeDriver binary is cached per installed
+    Chrome major version in a local cache directory, with a manifest holding each binary's sha256 checksum.  A cached
+    driver is verified against its checksum and used without touching the network; webdriver-manager is only used (to
+    download the driver) on a cache miss or a failed checksum.
+
+    The Chrome major version is read from the installed browser (no network).  It can also be pinned (CHROME_MAJOR_PIN,
+    or the SELENIUM_CHROME_MAJOR environment variable), ex: on air-gapped runners where the cache is pre-populated.  A
+    downloaded driver is only cached if its own major version matches the Chrome major version it is cached for.
+
+    Several processes (ex: parallel test runs) can share the cache: the manifest is re-read and rewritten under a
+    cross-process file lock (DRIVER_MANIFEST_LOCK), so entries added by other processes are kept.
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+from contextlib import contextmanager
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger('seleniumTest.driverCache')  # driver cache logger
+
+# Global variables
+DRIVER_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "seleniumTestGoogleDriveUpload", "chromedriver")
+DRIVER_MANIFEST = "manifest.json"  # {'<major>': {'file': '<major>/chromedriver', 'sha256': '...', 'resolved': ...}}
+DRIVER_MANIFEST_LOCK = "manifest.lock"  # lock file, held (across processes) while the manifest is updated
+CHROME_MAJOR_PIN = ""  # pin the Chrome major version (ex: "129"), instead of reading it from the installed browser
+CHROME_MAJOR_ENV = "SELENIUM_CHROME_MAJOR"  # environment variable that can also pin the Chrome major version
+CHROME_BINARIES = {  # where to look for the installed Chrome, per OS
+    'linux': ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"],
+    'darwin': ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"],
+}
+
+_resolve_lock = threading.Lock()  # one resolution (and download) at a time per process
+_resolved = {}  # {'<major>': driver path} already resolved and verified in this process
+
+
+def get_chrome_major_version():
+    """
+    Gets the major version of the installed Chrome browser, without using the network.  Uses the pinned version if
+    one is set.
+
+    :return: Chrome major version (ex: "129"), empty if it couldn't be found
+    :rtype: str
+    """
+
+    pinned = CHROME_MAJOR_PIN or os.environ.get(CHROME_MAJOR_ENV, "")
+    if pinned:
+        return pinned.split(".")[0]
+
+    version = ""
+    if sys.platform.startswith("win"):
+        import winreg  # windows only
+        try:
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Google\Chrome\BLBeacon") as key:
+                version = winreg.QueryValueEx(key, "version")[0]
+        except OSError as e:
+            logger.debug(f"Chrome version not found in the registry. Error: {e}")
+    else:
+        for binary in CHROME_BINARIES.get("darwin" if sys.platform == "darwin" else "linux", []):
+            try:
+                version = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=10).stdout
+            except (OSError, subprocess.SubprocessError):
+                continue
+            if version:
+                break
+
+    match = re.search(r"(\d+)\.\d+\.\d+", version)
+    return match.group(1) if match else ""
+
+
+def resolve_chromedriver(cache_dir: str = DRIVER_CACHE_DIR, chrome_major: str = ""):
+    """
+    Gets the path of the ChromeDriver binary for the installed (or pinned) Chrome major version: from the cache,
+    verified with its sha256 checksum, or, on a miss (or failed checksum), downloaded with webdriver-manager and added
+    to the cache.  If the Chrome version can't be found, the most recently cached driver is used.
+
+    :param cache_dir: ChromeDriver cache directory
+    :type cache_dir: str
+    :param chrome_major: Chrome major version to resolve the driver for, defaults to the installed (or pinned) version
+    :type chrome_major: str
+    :return: Path of the ChromeDriver binary
+    :rtype: str
+    """
+
+    with _resolve_lock:
+        start = time.monotonic()
+        chrome_major = chrome_major or get_chrome_major_version()
+        manifest = _read_manifest(cache_dir)
+
+        if not chrome_major and manifest:
+            chrome_major = max(manifest, key=lambda major: manifest[major]['resolved'])
+            logger.warning(f"Chrome version not found, using the most recently cached driver (Chrome {chrome_major})")
+
+        if chrome_major in _resolved:  # already verified in this process
+            return _resolved[chrome_major]
+
+        entry = manifest.get(chrome_major)
+        if entry is not None:
+            path = os.path.join(cache_dir, entry['file'])
+            if os.path.isfile(path) and _sha256(path) == entry['sha256']:
+                logger.debug(f"ChromeDriver for Chrome {chrome_major} found in the cache "
+                             f"({time.monotonic() - start:.3f} second(s))")
+                _resolved[chrome_major] = path
+                return path
+            logger.warning(f"Cached ChromeDriver for Chrome {chrome_major} is missing or failed its checksum, "
+                           f"downloading it again")
+
+        path = _download_chromedriver(cache_dir=cache_dir, chrome_major=chrome_major)
+        logger.info(f"ChromeDriver for Chrome {chrome_major or '(unknown)'} downloaded and cached "
+                    f"({time.monotonic() - start:.1f} second(s))")
+        _resolved[chrome_major] = path
+        return path
+
+
+def _add_to_cache(cache_dir: str, chrome_major: str, downloaded: str):
+    """Copies a driver into the cache and records it in the manifest (keeping the other processes' entries)"""
+
+    file = os.path.join(chrome_major, os.path.basename(downloaded))
+    path = os.path.join(cache_dir, file)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    path_tmp = f"{path}.{os.getpid()}.tmp"  # copied next to the cache entry, then moved into place (atomic)
+    shutil.copy2(downloaded, path_tmp)
+    os.chmod(path_tmp, os.stat(path_tmp).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+    with _manifest_lock(cache_dir):
+        os.replace(path_tmp, path)
+        manifest = _read_manifest(cache_dir)  # re-read, other processes may have added entries since
+        manifest[chrome_major] = {'file': file, 'sha256': _sha256(path), 'resolved': time.time()}
+        _write_manifest(cache_dir, manifest)
+
+    return path
+
+
+def _download_chromedriver(cache_dir: str, chrome_major: str):
+    """
+    Downloads the driver with webdriver-manager, checks it is for the Chrome major version, copies it into the cache
+    and records it in the manifest
+
+    :raises RuntimeError: If the downloaded driver is for another Chrome major version (ex: the pinned version isn't
+        the installed one, webdriver-manager downloads the driver for the installed Chrome)
+    """
+
+    from webdriver_manager.chrome import ChromeDriverManager  # only needed (and only uses the network) on a miss
+
+    downloaded = ChromeDriverManager().install()
+    driver_major = _driver_major_version(downloaded)
+    if not chrome_major:  # browser version unknown, key the cache by the driver's own version
+        chrome_major = driver_major or "unknown"
+    elif driver_major != chrome_major:
+        raise RuntimeError(f"Downloaded ChromeDriver '{downloaded}' is for Chrome {driver_major or '(unknown)'}, not "
+                           f"Chrome {chrome_major}; it was not cached")
+
+    return _add_to_cache(cache_dir=cache_dir, chrome_major=chrome_major, downloaded=downloaded)
+
+
+def _driver_major_version(path: str):
+    """Major version of a ChromeDriver binary (from its --version), empty if it can't be read"""
+
+    try:
+        version = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"Unable to read the version of ChromeDriver '{path}'. Error: {e}")
+        return ""
+
+    match = re.search(r"(\d+)\.\d+\.\d+", version)
+    return match.group(1) if match else ""
+
+
+@contextmanager
+def _manifest_lock(cache_dir: str):
+    """Holds the cache's lock file (exclusive, across processes) while the manifest is read and rewritten"""
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, DRIVER_MANIFEST_LOCK), "a+") as lock_file:
+        if sys.platform.startswith("win"):
+            import msvcrt  # windows only
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)  # retries for 10 seconds, then raises OSError
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl  # not on windows
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _read_manifest(cache_dir: str):
+    """Reads the cache manifest, empty if there is no (readable) manifest yet"""
+
+    try:
+        with open(os.path.join(cache_dir, DRIVER_MANIFEST)) as manifest:
+            return json.load(manifest)
+    except (OSError, ValueError):
+        return {}
+
+
+def _sha256(path: str):
+    """sha256 checksum of a file"""
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_manifest(cache_dir: str, manifest: dict):
+    """Writes the cache manifest atomically (temporary file, then moved into place), shared by concurrent runs"""
+
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, path_tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(path_tmp, os.path.join(cache_dir, DRIVER_MANIFEST))
+    except Exception:
+        if os.path.exists(path_tmp):
+            os.remove(path_tmp)
+        raise
@@ -13,7 +13,7 @@ SUMMARY: Executes the test for Google Drive's Create folder and Upload file feat
         - Close test
 
     CLEAN UP STEPS: (done with Google API)
-        - Find and delete Google Drive folder "Testing Folder (Selenium)" and all contents (file created)
+        - Find and delete the Google Drive folder and all contents (file created) tagged with this test run's ID
         - Validate the folder and file no longer exist
         - Close test
 
@@ -29,8 +29,12 @@ NOTES:
 VERSION INFO:
     Created by R. Reyna
     Date: 8/27/2024
-    Version: 1.0.0
+    Version: 1.0.1
+
+    Updates:
+        - Test and clean up share a run ID, clean up only removes this run's folder/files (in a single call)
 """
+from Selenium_googleDriveTestUpload_DriveAPI import new_run_id
 from Selenium_googleDriveTestUpload_ExecuteTest import execute_test
 from Selenium_googleDriveTestUpload_CleanUpTest import cleanup_test
 
@@ -38,12 +42,12 @@ from Selenium_googleDriveTestUpload_CleanUpTest import cleanup_test
 servicename = "---REPLACE-VALUE---"
 username = "---REPLACE-VALUE---"
 fld_test = "Testing Folder (Selenium)"
+run_id = new_run_id()  # tags everything this run creates, so clean up doesn't touch other runs
 
-dict_file_created = execute_test(servicename=servicename, username=username, fldname=fld_test)
+dict_file_created = execute_test(servicename=servicename, username=username, fldname=fld_test, run_id=run_id)
 
 if len(dict_file_created) > 0:  # only cleanup if the test successful; allows for troubleshooting w/items created
     print("SUCCESS: Test was a success, beginning cleanup")
-    for key, value in dict_file_created.items():
-        cleanup_test(servicename=servicename, username=username, fldname=fld_test, filename=key)
+    cleanup_test(servicename=servicename, username=username, run_id=run_id)
 else:
     print("WARNING: test was not successful, not executing clean up steps")
@@ -17,21 +17,55 @@ NOTES: See README.txt file for requirements to run and all sources used
 VERSION INFO:
     Created by R. Reyna
     Date: 8/21/2024
-    Version: 1.0.0
+    Version: 1.0.1
+
+    Updates:
+        - Test folder name includes a run ID, and the folder and files are tagged with it (see cleanup_test's run_id)
+        - Added use_index, answers the Google API look ups from a local index
+        - Uploaded files are validated together, in one query
+        - Folder validation polls (wait_until) until the folder shows up; wait timings are logged at the end
+        - Files are uploaded together through the file upload input (create_files_fileinput)
+        - Test steps after the login moved to run_upload_scenario, so they can run on an existing driver
+        - run_upload_scenario accepts a request blocking deny/allow list (request_blocking)
+        - Each step is timed (see Selenium_googleDriveTestUpload_Metrics), a metrics report (JSON/CSV) is written at the
+            end of the run
+        - Added profile_commands, writes a report of the WebDriver commands issued by each step
+        - Added profile_api, writes a report of the Drive API calls (and quota) made by each step
+        - If the scenario fails before the test folder is tagged, the folder is still tagged with the run ID
 """
+from __future__ import annotations
 import sys
 import logging
+from typing import TYPE_CHECKING
+from Selenium_googleDriveTestUpload_APIProfiler import (reset_api_records, start_api_profiler, stop_api_profiler,
+                                                        write_api_report)
+from Selenium_googleDriveTestUpload_CommandProfiler import reset_command_records, write_command_report
 from Selenium_googleDriveTestUpload_Connection import (configure_keyring_googledrive, connect_googledrive,
                                                        configure_fortesting_googledrive, disconnect_googledrive)
-from Selenium_googleDriveTestUpload_Files import create_file_newbutton, find_testfiles, validate_file_exists
+from Selenium_googleDriveTestUpload_DriveAPI import (escape_query_value, list_googledrive_items, MIMETYPE_FOLDER,
+                                                     new_run_id, tag_googledrive_item)
+from Selenium_googleDriveTestUpload_DriveIndex import enable_index_googledrive
+from Selenium_googleDriveTestUpload_Files import create_files_fileinput, find_testfiles
 from Selenium_googleDriveTestUpload_Folders import (create_folder_newbutton, get_folder_googledrive_id,
                                                     validate_folder_exists)
 from Selenium_googleDriveTestUpload_Logging import start_logging
+from Selenium_googleDriveTestUpload_Metrics import reset_metrics, span, write_metrics_report
+from Selenium_googleDriveTestUpload_RequestBlocking import set_request_blocking
+from Selenium_googleDriveTestUpload_Waits import get_wait_timings, reset_wait_timings, wait_until
+
+if TYPE_CHECKING:  # only needed for the type hints, not loaded at run time
+    from selenium import webdriver
 
 logger = logging.getLogger('seleniumTest.mainTest')  # main test logger
 
+FOLDER_VALIDATE_TIMEOUT_SEC = 10  # how long to wait for the new folder to show up in the Google API
+METRICS_REPORT_FILE = "seleniumTestGoogleDriveUpload_metrics_mainTest.json"  # + .csv, see write_metrics_report
+COMMAND_REPORT_FILE = "seleniumTestGoogleDriveUpload_commands_mainTest.json"  # see write_command_report
+API_REPORT_FILE = "seleniumTestGoogleDriveUpload_api_mainTest.json"  # see write_api_report
+
 
-def execute_test(servicename: str, username: str, fldname: str):
+def execute_test(servicename: str, username: str, fldname: str, run_id: str = "", use_index: bool = False,
+                 profile_commands: bool = False, profile_api: bool = False):
     """
     Executes the following test steps*:
         - Open/log into Google Account
@@ -44,88 +78,187 @@ def execute_test(servicename: str, username: str, fldname: str):
         - Close test
     *Clean up/resetting test will be run in a separate file
 
+    Everything the test creates is tagged with the run ID (as a Drive app property) and the folder name ends with the
+    run ID, (ex: "Testing Folder (Selenium) - 3f9c2a7e51b0") so concurrent runs on the same account don't pick up or
+    clean up each other's folders.  Pass the same run ID to cleanup_test to clean up only this run.
+
+    Each step is timed, and a metrics report with the durations, counts and percentiles of each step is written at the
+    end of the run (METRICS_REPORT_FILE, JSON and CSV).
+
     :param servicename: Name used to securely store the appropriate Google Drive credentials in the keyring
     :type servicename: str
     :param username: Google Drive credential's username
     :type username: str
-    :param fldname: Name of the test folder to be created
+    :param fldname: Name of the test folder to be created, the run ID is added to the end of the name
     :type fldname: str
+    :param run_id: ID of this test run, if not provided a new one is created (see new_run_id)
+    :type run_id: str
+    :param use_index: Answer the Google API validations/look ups from a local index of the account, kept current with
+        the Changes API (see Selenium_googleDriveTestUpload_DriveIndex)
+    :type use_index: bool
+    :param profile_commands: Record every WebDriver command with its latency and test step, a report of the commands
+        issued by each step is written at the end of the run (COMMAND_REPORT_FILE)
+    :type profile_commands: bool
+    :param profile_api: Record every Drive API call with its latency, size, status and step, a report of the calls
+        (and estimated quota) of each step is written at the end of the run (API_REPORT_FILE)
+    :type profile_api: bool
     :return: A dictionary containing the {filename: folderID} if a success, if a failure, returns an empty dictionary
     :rtype: dict
     """
-    continue_bool = ""
     dict_file = {}
 
     # Configure logging
     start_logging(filename="seleniumTestGoogleDriveUpload_mainTest.log")
     logger.info("----START: Beginning Selenium Google Drive Upload Test----")
+    reset_wait_timings()
+    reset_metrics()
+    reset_command_records()
+    reset_api_records()
+    if profile_api:
+        start_api_profiler()
+    if not run_id:
+        run_id = new_run_id()
+
+    if use_index:
+        enable_index_googledrive()
 
     # Establish user creds (if needed)
     configure_keyring_googledrive(servicename=servicename, username=username)
 
     # Login to Google using creds
     chrome_options = configure_fortesting_googledrive()  # !--WARNING, SHOULD ONLY RUN THIS WITH A TEST ACCOUNT
-    driver_chrome = connect_googledrive(servicename=servicename, username=username, chrome_options=chrome_options)
+    driver_chrome = connect_googledrive(servicename=servicename, username=username, chrome_options=chrome_options,
+                                        profile_commands=profile_commands)
 
-    # Create Google Drive folder
-    create_folder_newbutton(fldname=fldname, driver=driver_chrome, navigate_to_googledrive=True)
+    try:
+        with span("run upload scenario"):
+            dict_file = run_upload_scenario(driver=driver_chrome, fldname=fldname, run_id=run_id)
+    finally:
+        # Close test/driver
+        disconnect_googledrive(driver_chrome)
+        write_metrics_report(filename=METRICS_REPORT_FILE, run_id=run_id)
+        if profile_commands:
+            write_command_report(filename=COMMAND_REPORT_FILE)
+        if profile_api:
+            stop_api_profiler()
+            write_api_report(filename=API_REPORT_FILE, run_id=run_id)
 
-    # Validate (with Google API) that the folder was created
-    result_fld = validate_folder_exists(fldname=fldname)
+    for timing in get_wait_timings():
+        logger.info(f"Waited {timing['seconds']:.2f} second(s) for {timing['description']} "
+                    f"({'ready' if timing['success'] else 'TIMED OUT'})")
 
-    if result_fld is False:  # folder not created, stop test with failure
-        logger.error(f"Folder '{fldname}' failed to be created in Google Drive.")
-        continue_bool = False
+    logger.info("----END: Selenium Google Drive Test Upload completed.----")
+
+    return dict_file
 
-    if continue_bool is not False:
-        # Get folder ID (needed to navigate), and handle if there is more than one result
-        fld_info = get_folder_googledrive_id(fldname=fldname)
-        if (fld_info is None) or len(fld_info) < 1:
-            logger.error(f"ERROR: Folder '{fldname}' does not exist, failed to be created.")
+
+def run_upload_scenario(driver: webdriver, fldname: str, run_id: str = "", request_blocking: dict = None):
+    """
+    !!---Makes the assumption that you are already logged into Google Drive---!!
+    Runs the test steps of the upload test on an already logged in driver (see execute_test for the full test,
+    including the login):
+        - Get test text file from the local ./testFiles folder
+        - Create Google Drive folder "Testing Folder (Selenium) - <run ID>"
+        - Validate the folder was created successfully (via Google API)
+        - Upload file(s) to the new Google Drive folder
+        - Validate the file(s) were uploaded successfully and return results to user
+
+    :param driver: A logged in Selenium webdriver used to automate web clicks
+    :type driver: webdriver
+    :param fldname: Name of the test folder to be created, the run ID is added to the end of the name
+    :type fldname: str
+    :param run_id: ID of this test run, if not provided a new one is created (see new_run_id)
+    :type run_id: str
+    :param request_blocking: Requests to block for this scenario, as set_request_blocking's deny/allow lists (ex:
+        {'deny': ["analytics", "fonts", "images"], 'allow': ["*.svg"]}), if not provided the driver's setting is kept
+    :type request_blocking: dict
+    :return: A dictionary containing the {filename: folderID} if a success, if a failure, returns an empty dictionary
+    :rtype: dict
+    """
+    continue_bool = ""
+    dict_file = {}
+
+    if not run_id:
+        run_id = new_run_id()
+    fldname = f"{fldname} - {run_id}"
+    logger.info(f"Run ID '{run_id}', test folder '{fldname}'")
+
+    if request_blocking is not None:
+        set_request_blocking(driver=driver, **request_blocking)
+
+    fld_tagged = False
+    try:
+        # Create Google Drive folder
+        create_folder_newbutton(fldname=fldname, driver=driver, navigate_to_googledrive=True)
+
+        # Validate (with Google API) that the folder was created
+        result_fld = wait_until(lambda: validate_folder_exists(fldname=fldname), description=f"folder '{fldname}'",
+                                timeout=FOLDER_VALIDATE_TIMEOUT_SEC)
+
+        if not result_fld:  # folder not created, stop test with failure
+            logger.error(f"Folder '{fldname}' failed to be created in Google Drive.")
             continue_bool = False
-        elif len(fld_info) > 1:
-            logger.warning(f"More than one folder named '{fldname}' has been found. **Will use the most recent folder.**"
-                           f"\nFolder list: {fld_info}")
-
-            # Calc the newest folder and set fld_id to the id value for that record
-            # {'id': 'IDvalue', 'createdTime': 'datetime', 'parents': 'parentID'}
-            for fld in fld_info:
-                if 'fld_id' not in locals():  # first time looping through, assign values
-                    fld_id = fld['id']
-                    fld_created = fld['createdTime']
-                else:  # not first loop, compare to get most recent
-                    if fld_created < fld['createdTime']:  # current record is older, assign newer values
-                        fld_id = fld['id']
-                        fld_created = fld['createdTime']
-        else:  # only one result, set fld_id to the id value
-            fld_id = fld_info[0]['id']
-            fld_created = fld_info[0]['createdTime']
 
         if continue_bool is not False:
-            logger.info(f"Folder info being used: folder ID '{fld_id}' and created time '{fld_created}'")
+            # Get folder ID (needed to navigate), and handle if there is more than one result
+            fld_info = get_folder_googledrive_id(fldname=fldname)
+            if (fld_info is None) or len(fld_info) < 1:
+                logger.error(f"ERROR: Folder '{fldname}' does not exist, failed to be created.")
+                continue_bool = False
+            elif len(fld_info) > 1:
+                logger.warning(f"More than one folder named '{fldname}' has been found. **Will use the most recent "
+                               f"folder.**\nFolder list: {fld_info}")
 
-            # Get list of file(s) (.txt) to upload from local ./testFiles folder
-            filetype = "txt"
-            dict_test = find_testfiles(filetype=filetype)
+                # Calc the newest folder and set fld_id to the id value for that record
+                # {'id': 'IDvalue', 'createdTime': 'datetime', 'parents': 'parentID'}
+                for fld in fld_info:
+                    if 'fld_id' not in locals():  # first time looping through, assign values
+                        fld_id = fld['id']
+                        fld_created = fld['createdTime']
+                    else:  # not first loop, compare to get most recent
+                        if fld_created < fld['createdTime']:  # current record is older, assign newer values
+                            fld_id = fld['id']
+                            fld_created = fld['createdTime']
+            else:  # only one result, set fld_id to the id value
+                fld_id = fld_info[0]['id']
+                fld_created = fld_info[0]['createdTime']
 
-            if not dict_test:  # no test files found
-                logger.error(f"No files of type '.{filetype}' found, unable to test upload")
-                continue_bool = False
-            else:  # loop through and upload the files
-                for key, value in dict_test.items():
-                    create_file_newbutton(filename=key, filepath_abs=value, fld_uploadto_id=fld_id, driver=driver_chrome)
-                    # validate that they were actually created
-                    file_exists = validate_file_exists(filename=key, fld_id=fld_id)
-                    if file_exists is True:
-                        logger.info(f"SUCCESS: created file '{key}' in folder '{fld_id}'.")
-                        dict_file[key] = fld_id  # add to the dict
-                    else:
-                        logger.error(
-                            f"ERROR: Attempted to create file '{key}' in folder '{fld_id}', but unable to validate.")
-
-    # Close test/driver
-    disconnect_googledrive(driver_chrome)
+            if continue_bool is not False:
+                logger.info(f"Folder info being used: folder ID '{fld_id}' and created time '{fld_created}'")
+                fld_tagged = tag_googledrive_item(item_id=fld_id, run_id=run_id)
 
-    logger.info("----END: Selenium Google Drive Test Upload completed.----")
+                # Get list of file(s) (.txt) to upload from local ./testFiles folder
+                filetype = "txt"
+                dict_test = find_testfiles(filetype=filetype)
+
+                if not dict_test:  # no test files found
+                    logger.error(f"No files of type '.{filetype}' found, unable to test upload")
+                    continue_bool = False
+                else:  # upload all the files at once, and validate that they were actually created
+                    files_exist = create_files_fileinput(dict_files=dict_test, fld_uploadto_id=fld_id,
+                                                         driver=driver)
+                    for key, result in files_exist.items():
+                        if result['found'] is True:
+                            logger.info(f"SUCCESS: created file '{key}' in folder '{fld_id}' "
+                                        f"(md5 '{result['md5Checksum']}', size '{result['size']}').")
+                            dict_file[key] = fld_id  # add to the dict
+                            tag_googledrive_item(item_id=result['id'], run_id=run_id)
+                        else:
+                            logger.error(f"ERROR: Attempted to create file '{key}' in folder '{fld_id}', but unable "
+                                         f"to validate.")
+    finally:
+        if not fld_tagged:  # failed before the folder was tagged, tag it so cleanup_test(run_id=...) still finds it
+            _tag_run_folders(fldname=fldname, run_id=run_id)
 
     return dict_file
+
+
+def _tag_run_folders(fldname: str, run_id: str):
+    """Tags every folder named fldname (the name includes the run ID) with the run ID, never raises"""
+
+    try:
+        for fld in list_googledrive_items(query=f"mimeType = '{MIMETYPE_FOLDER}' and name = "
+                                                f"'{escape_query_value(fldname)}'", fields="id"):
+            tag_googledrive_item(item_id=fld['id'], run_id=run_id)
+    except Exception as e:  # already on a failure path, the name sweep (cleanup_test's fldname) is the fallback
+        logger.error(f"Unable to tag folder '{fldname}' with run ID '{run_id}'. Error: {e}")
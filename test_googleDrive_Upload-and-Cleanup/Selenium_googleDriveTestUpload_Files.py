@@ -10,31 +10,52 @@ VERSION INFO:
     Date: 1/6/2025
     Version: 1.0.1
 
-    Updates: Fixed typo in gdrive_click_button_plus_new(), had added new parameter 'driver' but had typo in calling it
+    Updates:
+        - Fixed typo in gdrive_click_button_plus_new(), had added new parameter 'driver' but had typo in calling it
+        - API calls use the shared Drive service (Selenium_googleDriveTestUpload_DriveAPI) instead of calling build()
+            on every call
+        - File look ups read every page of results (previously only the first page was checked); validating by ID is
+            a single files.get call (and no longer exits when only file_id is provided)
+        - File look ups are answered from the local index (Selenium_googleDriveTestUpload_DriveIndex) when enabled
+        - Added validate_files_exist, validates a set of files by name with one (OR-combined) query
+        - create_file_newbutton waits until the Drive API sees the upload (wait_until) instead of sleeping 5 seconds,
+            and waits for the 'Open File' window to open/close (page focus) instead of sleeping 3 and 1 seconds
+        - 'File upload' menu item is waited on with wait_for_element_interactable (MutationObserver)
+        - Added create_files_fileinput, uploads several files at once through the file upload input (no clipboard,
+            keyboard or display needed); pyautogui/pyperclip are only imported by create_file_newbutton
+        - selenium and googleapiclient are only imported by the functions that use them, so importing this module is
+            fast and needs neither
+        - Uploads, look ups, validations and deletions are timed as steps (see Selenium_googleDriveTestUpload_Metrics)
+        - delete_file_googledrive_by_id calls delete_googledrive_item, a file that is already gone counts as deleted
 """
+from __future__ import annotations
 
 import glob
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 import logging
 import os
-import pyautogui
-import pyperclip
 import sys
-from Selenium_googleDriveTestUpload_GoogleDrive_webItems import gdrive_click_button_plus_new
+from typing import TYPE_CHECKING
+from Selenium_googleDriveTestUpload_GoogleDrive_webItems import (gdrive_click_button_plus_new,
+                                                                 wait_for_element_interactable,
+                                                                 wait_for_element_present)
 from Selenium_googleDriveTestUpload_Folders import navigate_to_folder_by_calc_url
-from Selenium_googleDriveTestUpload_Connection import get_credentials_googledrive
-from selenium import webdriver
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support import expected_conditions as ec
-from selenium.webdriver.support.ui import WebDriverWait
-import time  # driver implicit waits don't always seem to work
+from Selenium_googleDriveTestUpload_Metrics import timed
+from Selenium_googleDriveTestUpload_Waits import wait_until
+from Selenium_googleDriveTestUpload_DriveIndex import index_enabled, index_find_items, recheck_index_googledrive
+from Selenium_googleDriveTestUpload_DriveAPI import (build_name_queries, delete_googledrive_item, escape_query_value,
+                                                     get_service_googledrive, list_googledrive_items, MIMETYPE_FOLDER)
+
+if TYPE_CHECKING:  # only needed for the type hints, not loaded at run time
+    from selenium import webdriver
 
 logger = logging.getLogger('seleniumTest.files')  # file logger
 
+UPLOAD_TIMEOUT_SEC = 60  # how long to wait for an uploaded file to show up in Google Drive
+FILE_DIALOG_TIMEOUT_SEC = 10  # how long to wait for the native 'Open File' window to open/close
+JS_PAGE_HAS_FOCUS = "return document.hasFocus();"  # False while the native 'Open File' window has the focus
+
 
+@timed("upload file")
 def create_file_newbutton(filename: str, filepath_abs: str, fld_uploadto_id: str, driver: webdriver
                           , navigate_to_googledrive: bool = False):
     """
@@ -55,6 +76,12 @@ def create_file_newbutton(filename: str, filepath_abs: str, fld_uploadto_id: str
         If not, pass in True - the function will then navigate to google drive first and then begin the click process.
     :type navigate_to_googledrive: bool
     """
+    from selenium.webdriver.common.action_chains import ActionChains
+    from selenium.webdriver.common.by import By
+
+    # only this (native dialog) upload needs the clipboard/keyboard, which also need a display
+    import pyautogui
+    import pyperclip
 
     # Check if front slashes (/) were provided, if so, convert to backslashes, or this won't work (on Windows)
     filepath_abs = replace_frontslash(string=filepath_abs)
@@ -72,16 +99,20 @@ def create_file_newbutton(filename: str, filepath_abs: str, fld_uploadto_id: str
     try:
         act = ActionChains(driver)
         # identify sub-menu element
-        menuitem_newfile = WebDriverWait(driver, 5).until(
-            ec.element_to_be_clickable((By.CSS_SELECTOR, "[aria-label='File upload Alt+C then U']")))
+        menuitem_newfile = wait_for_element_interactable(driver=driver, by=By.CSS_SELECTOR,
+                                                         locator="[aria-label='File upload Alt+C then U']", timeout=5)
         # define the action (click) and perform
         act.click(menuitem_newfile).perform()
         logger.info("Successfully (navigated to and) clicked sub-menu option 'File upload'")
-        time.sleep(3)  # give file selection sub-menu time to appear; otherwise won't work
     except Exception as e:
         logger.error("Could not click on sub-menu option 'File upload'")
         logger.error(e)
 
+    # the native window takes the focus from the page once it is open (and ready for the paste)
+    if not wait_until(lambda: not driver.execute_script(JS_PAGE_HAS_FOCUS), description="'Open File' window to open",
+                      timeout=FILE_DIALOG_TIMEOUT_SEC):
+        logger.error("'Open File' window did not open, the file path will not be pasted into it")
+
     # Copy and paste in the absolute file path
     """ 
     **This is a windows explorer box so unable to interact with Selenium, but the windows explorer text box already 
@@ -92,48 +123,105 @@ def create_file_newbutton(filename: str, filepath_abs: str, fld_uploadto_id: str
     logger.debug(f"Pasting into 'Open File' sub-window value {filepath_abs}")
     pyautogui.hotkey('ctrl', 'v')  # click ctrl+v; pyperclip.paste() didn't work
 
-    time.sleep(1)  # give it time to paste
     logger.debug("Pressing enter for file upload")
-    pyautogui.press('enter')
-    sleep_sec = 5
-    logger.debug(f"Sleeping for {sleep_sec} second(s) to allow the file to upload")
-    time.sleep(sleep_sec)  # give it time to upload the file
+    pyautogui.press('enter')  # keystrokes are queued in order, the enter is handled after the paste
+    if not wait_until(lambda: driver.execute_script(JS_PAGE_HAS_FOCUS), description="'Open File' window to close",
+                      timeout=FILE_DIALOG_TIMEOUT_SEC):
+        logger.error("'Open File' window did not close after pressing enter")
+
+    # wait until the Drive API can see the uploaded file, instead of sleeping a fixed time (quiet, untimed checks)
+    logger.debug(f"Waiting (up to {UPLOAD_TIMEOUT_SEC} second(s)) for the file to upload")
+    if wait_until(lambda: _file_exists_by_name(filename=filename, fld_id=fld_uploadto_id),
+                  description=f"upload of '{filename}'", timeout=UPLOAD_TIMEOUT_SEC):
+        logger.info(f"File '{filename}' in folder '{fld_uploadto_id}' uploaded.")
+    else:
+        logger.error(f"File '{filename}' did not show up in folder '{fld_uploadto_id}' after {UPLOAD_TIMEOUT_SEC} "
+                     f"second(s)")
 
 
-def delete_file_googledrive_by_id(file_id: str):
+@timed("upload files")
+def create_files_fileinput(dict_files: dict, fld_uploadto_id: str, driver: webdriver):
     """
-    Using Google API, deletes a Google Drive file by the folder's ID
+    !!---Makes the assumption that you are already logged into Google Drive---!!
+    Uploads one or more files to Google Drive in a single selection, by sending the file paths straight to Google
+    Drive's (hidden) file upload input, instead of pasting the path into the native 'Open File' window.  Doesn't use
+    the clipboard or keyboard, so it works headless and several browsers can upload at the same time on one machine.
 
-    :param file_id:  Google ID of the file to be deleted
-    :type file_id: str
-    :return: Success value - returns True if file successfully deleted, False if not
-    :rtype: bool
-    """
+    The native 'Open File' window is never opened: Chrome is told (via DevTools) to intercept it, then the
+    '+ New' > 'File upload' clicks are made so Google Drive adds its file upload input to the page.
 
-    logger.info(f"Deleting file ID '{file_id}'...")
+    :param dict_files: Files to be uploaded, {file name: absolute file path} (ex: as returned by find_testfiles)
+    :type dict_files: dict
+    :param fld_uploadto_id: The Google ID of the folder where the files should be uploaded
+    :type fld_uploadto_id: str
+    :param driver: A Selenium webdriver used to automate web clicks
+    :type driver: webdriver
+    :return: Validation results by file name, see validate_files_exist
+    :rtype: dict
+    """
+    from selenium.webdriver.common.action_chains import ActionChains
+    from selenium.webdriver.common.by import By
 
-    # Validate if the file exists
-    logger.debug("First validating if the file exists")
-    exists = validate_file_exists(file_id=file_id)
+    logger.info(f"Attempting to upload {len(dict_files)} file(s) to folder ID '{fld_uploadto_id}' via the file input")
 
-    service = build("drive", "v3", credentials=get_credentials_googledrive())
+    # Navigate to the folder (in order to upload file, need to be in folder)
+    navigate_to_folder_by_calc_url(fld_id=fld_uploadto_id, driver=driver)
 
-    if exists is True:  # folder exists, delete
-        response = service.files().delete(fileId=file_id).execute()
+    # Don't let the native 'Open File' window open when 'File upload' is clicked
+    driver.execute_cdp_cmd("Page.setInterceptFileChooserDialog", {"enabled": True})
+    try:
+        # Click on '+ New' > 'File upload', which adds Google Drive's file upload input to the page
+        gdrive_click_button_plus_new(driver=driver)
+        logger.debug("Selecting 'File upload' from the '+ New' sub menu")
+        try:
+            menuitem_newfile = wait_for_element_interactable(driver=driver, by=By.CSS_SELECTOR,
+                                                             locator="[aria-label='File upload Alt+C then U']",
+                                                             timeout=5)
+            ActionChains(driver).click(menuitem_newfile).perform()
+            logger.info("Successfully (navigated to and) clicked sub-menu option 'File upload'")
+        except Exception as e:
+            logger.error("Could not click on sub-menu option 'File upload', no file(s) uploaded")
+            logger.error(e)
+            return {filename: {'found': False, 'id': None, 'md5Checksum': None, 'size': None}
+                    for filename in dict_files}
+
+        # Send all the file paths to the file input at once (one path per line)
+        filepaths = "\n".join(os.path.abspath(os.path.normpath(filepath)) for filepath in dict_files.values())
+        logger.debug(f"Sending file path(s) to the file upload input: {filepaths}")
+        input_file = wait_for_element_present(driver=driver, by=By.CSS_SELECTOR, locator="input[type='file']")
+        input_file.send_keys(filepaths)
+
+        # wait until the Drive API can see all the uploaded files
+        logger.debug(f"Waiting (up to {UPLOAD_TIMEOUT_SEC} second(s)) for the file(s) to upload")
+        results = {}
+
+        def all_uploaded():
+            results.update(validate_files_exist(filenames=list(dict_files), fld_id=fld_uploadto_id))
+            return all(result['found'] for result in results.values())
+
+        wait_until(all_uploaded, description=f"upload of {len(dict_files)} file(s)", timeout=UPLOAD_TIMEOUT_SEC)
+    finally:
+        # turned back off even if the upload failed, so later clicks on the page can open the native window again
+        driver.execute_cdp_cmd("Page.setInterceptFileChooserDialog", {"enabled": False})
+
+    return results
+
+
+@timed("delete file")
+def delete_file_googledrive_by_id(file_id: str):
+    """
+    Using Google API, deletes a Google Drive file by the file's ID (see delete_googledrive_item).  A file that is
+    already gone (404) is counted as deleted.
 
-        # Validate if folder was deleted; if successful, the 'response' body contains an empty instance
-        if not response:
-            logger.info(f"File ID '{file_id}' successfully deleted.")
-            result = True
-        else:
-            logger.error(f"Failed to delete file ID '{file_id}'")
-            result = False
+    :param file_id: Google ID of the file to be deleted
+    :type file_id: str
+    :return: Success value - returns True if file successfully deleted (or already gone), False if not
+    :rtype: bool
+    """
 
-    else:  # file does not exist
-        logger.warning(f"Unable to find and delete file ID '{file_id}'")
-        result = False
+    logger.info(f"Deleting file ID '{file_id}'...")
 
-    return result
+    return delete_googledrive_item(item_id=file_id)
 
 
 def find_testfiles(filetype: str = ""):
@@ -179,6 +267,7 @@ def find_testfiles(filetype: str = ""):
     return dict_files
 
 
+@timed("get file ID")
 def get_file_googledrive_id(filename: str):
     """
     Using Google API, gets a file's Google Drive ID. Also includes the createdTime and parents fields to help
@@ -190,32 +279,23 @@ def get_file_googledrive_id(filename: str):
         * If there are no results, will return None
     :rtype: dict
     """
+    from googleapiclient.errors import HttpError
 
     logger.info(f"Getting file ID (via Google API) for '{filename}'")
 
     try:
-        service = build("drive", "v3", credentials=get_credentials_googledrive())
-        page_token = None
-
-        while True:
-            # Call the Drive v3 API
-            results = (
-                service.files()
-                .list(q=f"mimeType != 'application/vnd.google-apps.folder' and name = '{filename}'",
-                      spaces="drive",
-                      fields="nextPageToken, files(id, createdTime, parents)",
-                      # + ID for parent in case multiple results
-                      pageToken=page_token)
-                .execute()
-            )
-            items = results.get("files", [])
-            if items:
-                return items
-            else:
-                return None
-
-            if page_token is None:
-                break
+        if index_enabled():  # answer from the local index
+            items = [{'id': item['id'], 'createdTime': item.get('createdTime'), 'parents': item.get('parents', [])}
+                     for item in index_find_items(name=filename, is_folder=False)]
+        else:
+            # + ID for parent in case multiple results; reads every page of results
+            items = list(list_googledrive_items(
+                query=f"mimeType != '{MIMETYPE_FOLDER}' and name = '{escape_query_value(filename)}'",
+                fields="id, createdTime, parents"))
+        if items:
+            return items
+        else:
+            return None
     except HttpError as error:
         logger.error(f"An error occurred: {error}")
 
@@ -257,6 +337,7 @@ def replace_frontslash(string: str):
     return string
 
 
+@timed("validate file")
 def validate_file_exists(filename: str = "", file_id: str = "", fld_id: str = ""):
     """
     Validates that a file exists, by either file name or file ID, with (optionally) folder location, using Google's API
@@ -276,64 +357,138 @@ def validate_file_exists(filename: str = "", file_id: str = "", fld_id: str = ""
     if filename:
         validateby = filename
         msg = f"Attempting to validate (via Google API) existence of file BY NAME '{filename}'"
-    elif fld_id:
+    elif file_id:
         validateby = file_id
         msg = f"Attempting to validate (via Google API) existence of file BY ID '{file_id}'"
     else:
         logger.error("ERROR: validate_file_exists requires either a name or ID, neither were provided")
         sys.exit()
 
-    # Determine query
-    query = ("mimeType != 'application/vnd.google-apps.folder' "  # .file too specific (ex: text/plain)
-             "and trashed=false")
-
-    if validateby == filename:
-        query += f" and name = '{filename}'"
-    elif validateby == file_id:
-        query += f" and id = '{file_id}'"
-
     if fld_id == "":  # folder ID not provided
         msg += " ONLY; folder ID not provided."
         logger.info(msg)
     else:
         msg += f" in folder ID '{fld_id}'."
         logger.info(msg)
-        query += f" and parents = '{fld_id}'"
 
     # Validate
+    from googleapiclient.errors import HttpError
+
     try:
-        service = build("drive", "v3", credentials=get_credentials_googledrive())
-        page_token = None
-
-        while True:
-            # Call the Drive v3 API
-            results = (
-                service.files()
-                .list(q=query,
-                      spaces="drive",
-                      fields="nextPageToken, files(id, name, parents)",
-                      pageToken=page_token)
-                .execute()
-            )
-
-            items = results.get("files", [])
-
-            # return results to user and log
-            msg = f"File '{validateby}'"
-            if fld_id != "":
-                msg += f" in folder '{fld_id}'"
+        if validateby == filename:
+            exists = _file_exists_by_name(filename=filename, fld_id=fld_id)
+        elif index_enabled():  # answer from the local index
+            exists = len(index_find_items(item_id=file_id, is_folder=False, parent=fld_id)) > 0
+        else:
+            try:
+                result_byid = (
+                    get_service_googledrive().files()
+                    .get(fileId=file_id, fields="id, mimeType, parents, trashed").execute()
+                )
+                exists = (result_byid["mimeType"] != MIMETYPE_FOLDER and not result_byid["trashed"]
+                          and (fld_id == "" or fld_id in result_byid.get("parents", [])))
+            except HttpError as error:
+                if error.resp.status != 404:
+                    raise
+                exists = False  # file ID does not exist (or user doesn't have access)
+
+        # return results to user and log
+        msg = f"File '{validateby}'"
+        if fld_id != "":
+            msg += f" in folder '{fld_id}'"
+
+        if exists:  # file found
+            msg += " validated."
+            logger.info(msg)
+
+            return True
+        else:
+            msg += " could not be validated."
+            logger.info(msg)
+
+            return False
+    except HttpError as error:
+        logger.error(f"An error occurred: {error}")
+
+
+@timed("validate files")
+def validate_files_exist(filenames: list, fld_id: str = ""):
+    """
+    Validates that several files exist, by file name, with (optionally) folder location, using Google's API.  The names
+    are OR-combined into as few queries as possible (split to stay under the query length limit, see
+    build_name_queries), so validating a whole set of files usually costs a single round trip.
+        *if user does not have access to the file, it will show as not existing.
 
-            if items:  # file found
-                msg += " validated."
-                logger.info(msg)
+    :param filenames: Names of the files, as they were uploaded, to be validated (ex: ["testFile-1.csv"])
+    :type filenames: list
+    :param fld_id: Google ID of the folder where the files should be located (optional)
+    :type fld_id: str
+    :return: Results by file name, in the following format:
+        {'filename': {'found': True, 'id': 'IDvalue', 'md5Checksum': 'md5', 'size': 'bytes'}}
+        * If there are multiple files with the same name, the first one found is returned
+        * If the file wasn't found, {'found': False, 'id': None, 'md5Checksum': None, 'size': None}
+    :rtype: dict
+    """
+    from googleapiclient.errors import HttpError
 
-                return True
-            else:
-                msg += " could not be validated."
-                logger.info(msg)
+    msg = f"Attempting to validate (via Google API) existence of {len(filenames)} file(s) BY NAME"
+    if fld_id == "":  # folder ID not provided
+        msg += " ONLY; folder ID not provided."
+    else:
+        msg += f" in folder ID '{fld_id}'."
+    logger.info(msg)
 
-                return False
-            if page_token is None:
-                break
+    results = {filename: {'found': False, 'id': None, 'md5Checksum': None, 'size': None} for filename in filenames}
+
+    def add_result(item: dict):
+        if item.get('name') in results and results[item['name']]['found'] is False:
+            results[item['name']] = {'found': True, 'id': item['id'], 'md5Checksum': item.get('md5Checksum'),
+                                     'size': item.get('size')}
+
+    try:
+        if index_enabled():  # answer from the local index
+            def find_missing():
+                for filename, result in results.items():
+                    if not result['found']:
+                        for item in index_find_items(name=filename, is_folder=False, parent=fld_id,
+                                                     recheck_missing=False):
+                            add_result(item=item)
+
+            find_missing()  # syncs first if the index is stale
+            # one recheck for all the missing names, at most once per min_recheck_sec (ex: polled by wait_until)
+            if not all(result['found'] for result in results.values()) and recheck_index_googledrive():
+                find_missing()
+        else:
+            query_base = f"mimeType != '{MIMETYPE_FOLDER}' and trashed=false"
+            if fld_id != "":
+                query_base += f" and '{fld_id}' in parents"
+
+            for query in build_name_queries(names=list(results), query_base=query_base):
+                for item in list_googledrive_items(query=query, fields="id, name, md5Checksum, size", page_size=1000):
+                    add_result(item=item)
     except HttpError as error:
         logger.error(f"An error occurred: {error}")
+
+    for filename, result in results.items():
+        logger.info(f"File '{filename}' {'validated' if result['found'] else 'could not be validated'}.")
+
+    return results
+
+
+def _file_exists_by_name(filename: str, fld_id: str = ""):
+    """
+    If a file with the name exists (optionally in the folder), from the local index when enabled, otherwise with a
+    single query.  Doesn't log or time anything, so it can be polled (ex: by wait_until); see validate_file_exists.
+    """
+
+    if index_enabled():  # answer from the local index
+        return len(index_find_items(name=filename, is_folder=False, parent=fld_id)) > 0
+
+    query = (f"mimeType != '{MIMETYPE_FOLDER}' "  # .file too specific (ex: text/plain)
+             f"and trashed=false and name = '{escape_query_value(filename)}'")
+    if fld_id != "":
+        query += f" and '{fld_id}' in parents"
+
+    # only need to know if there is at least one result, so stop after the first item
+    items = list_googledrive_items(query=query, fields="id", page_size=1)
+    return next(items, None) is not None
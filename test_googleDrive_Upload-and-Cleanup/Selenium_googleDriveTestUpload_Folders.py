@@ -6,26 +6,50 @@ NOTES: See README.txt file for requirements to run and all sources used
 VERSION INFO:
     Created by R. Reyna
     Date: 8/27/2024
-    Version: 1.0.0
+    Version: 1.0.1
+
+    Updates:
+        - API calls use the shared Drive service (Selenium_googleDriveTestUpload_DriveAPI) instead of calling build()
+            on every call
+        - Folder look ups read every page of results (previously only the first page was checked), validating by ID
+            is a single files.get call
+        - Folder look ups are answered from the local index (Selenium_googleDriveTestUpload_DriveIndex) when enabled
+        - create_folder_newbutton waits on the dialog (wait_until) instead of sleeping 2 seconds twice
+        - Menu items/buttons are waited on with wait_for_element_interactable (MutationObserver) instead of
+            WebDriverWait/implicitly_wait
+        - navigate_to_folder_by_calc_url waits for the folder page to be ready ('+ New' button), then logs the page's
+            transfer size (and bytes saved) when request blocking is on
+        - selenium and googleapiclient are only imported by the functions that use them, so importing this module is
+            fast and needs neither
+        - Folder creation, look ups, validations and deletions are timed as steps (see
+            Selenium_googleDriveTestUpload_Metrics)
+        - navigate_to_folder_by_calc_url opens the folder from drive_web_url (the address can be changed, ex: to a
+            local replica of Google Drive)
+        - delete_folder_googledrive_by_id calls delete_googledrive_item, a folder that is already gone counts as deleted
 """
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+from __future__ import annotations
 import logging
-from selenium import webdriver
-from Selenium_googleDriveTestUpload_Connection import get_credentials_googledrive
-from Selenium_googleDriveTestUpload_GoogleDrive_webItems import gdrive_click_button_plus_new
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as ec
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.common.action_chains import ActionChains
+from typing import TYPE_CHECKING
+from Selenium_googleDriveTestUpload_DriveIndex import index_enabled, index_find_items
+from Selenium_googleDriveTestUpload_DriveAPI import (delete_googledrive_item, escape_query_value,
+                                                     get_service_googledrive, list_googledrive_items, MIMETYPE_FOLDER)
+from Selenium_googleDriveTestUpload_GoogleDrive_webItems import (drive_web_url, gdrive_click_button_plus_new,
+                                                                 wait_for_element_interactable)
+from Selenium_googleDriveTestUpload_Metrics import timed
+from Selenium_googleDriveTestUpload_RequestBlocking import log_page_transfer
+from Selenium_googleDriveTestUpload_Waits import wait_until
 import sys
-import time  # driver implicit waits don't always seem to work
-from webdriver_manager.chrome import ChromeDriverManager
+
+if TYPE_CHECKING:  # only needed for the type hints, not loaded at run time
+    from selenium import webdriver
 
 logger = logging.getLogger('seleniumTest.folder')  # folder logger
 
+FOLDER_DIALOG_TIMEOUT_SEC = 10  # how long to wait on the new folder dialog
+XPATH_INPUT_UNTITLED_FOLDER = '//input[@value="Untitled folder"]'  # folder name input in the new folder dialog
+
 
+@timed("create folder")
 def create_folder_newbutton(fldname: str, driver: webdriver, navigate_to_googledrive: bool = False):
     """
     !!---Makes the assumption that you are already logged into Google Drive---!!
@@ -40,6 +64,8 @@ def create_folder_newbutton(fldname: str, driver: webdriver, navigate_to_googled
         If not, pass in True - the function will then navigate to google drive first and then begin the click process.
     :type navigate_to_googledrive: bool
     """
+    from selenium.webdriver.common.action_chains import ActionChains
+    from selenium.webdriver.common.by import By
 
     logger.info(f"Attempting to create new folder '{fldname}'")
 
@@ -51,8 +77,8 @@ def create_folder_newbutton(fldname: str, driver: webdriver, navigate_to_googled
     try:
         act = ActionChains(driver)
         # identify sub-menu element
-        menuitem_newfld = WebDriverWait(driver, 5).until(
-            ec.element_to_be_clickable((By.CSS_SELECTOR, "[aria-label='New folder Alt+C then F']")))
+        menuitem_newfld = wait_for_element_interactable(driver=driver, by=By.CSS_SELECTOR,
+                                                        locator="[aria-label='New folder Alt+C then F']", timeout=5)
         """
         # move to element and click
         act.move_to_element(menuitem_newfld).click().perform()  # might not need to move to, might be able to just click
@@ -65,61 +91,48 @@ def create_folder_newbutton(fldname: str, driver: webdriver, navigate_to_googled
         logger.error(e)
 
     # Paste in new folder name
-    time.sleep(2)  # if paste in too quickly, the default text "Untitled folder" won't be highlighted and overwritten
+    # if paste in too quickly, the default text "Untitled folder" won't be highlighted and overwritten, so wait for it
+    input_fldname = wait_for_element_interactable(driver=driver, by=By.XPATH, locator=XPATH_INPUT_UNTITLED_FOLDER,
+                                                  timeout=FOLDER_DIALOG_TIMEOUT_SEC)
+    wait_until(lambda: input_text_selected(driver=driver, xpath=XPATH_INPUT_UNTITLED_FOLDER),
+               description="'Untitled folder' text to be highlighted", timeout=FOLDER_DIALOG_TIMEOUT_SEC)
     logger.debug(f"Pasting in the requested folder name, '{fldname}'")
-    driver.find_element(By.XPATH, '//input[@value="Untitled folder"]').send_keys(fldname)
-    driver.implicitly_wait(1)
+    input_fldname.send_keys(fldname)
 
     # Click on "create" button
     logger.debug("Clicking on the 'create' button")
     try:
-        button_newfld_create = WebDriverWait(driver, 5).until(
-            ec.element_to_be_clickable((By.XPATH, "//span[text()='Create']")))
+        button_newfld_create = wait_for_element_interactable(driver=driver, by=By.XPATH,
+                                                             locator="//span[text()='Create']", timeout=5)
         # define the action (click) and perform
         act.click(button_newfld_create).perform()
-        time.sleep(2)  # give google time to create the folder; driver.implicitly_wait() didn't work here
+        # give google time to create the folder, the dialog closes once it has been created
+        wait_until(lambda: not driver.find_elements(By.XPATH, XPATH_INPUT_UNTITLED_FOLDER),
+                   description="new folder dialog to close", timeout=FOLDER_DIALOG_TIMEOUT_SEC)
         logger.info("Successfully clicked on 'Create' button.")
     except Exception as e:
         logger.error("Could not click on 'Create' button.")
         logger.error(e)
 
 
+@timed("delete folder")
 def delete_folder_googledrive_by_id(fld_id: str):
     """
-    Using Google API, deletes a Google Drive folder by the folder's ID
+    Using Google API, deletes a Google Drive folder by the folder's ID (see delete_googledrive_item).  A folder that is
+    already gone (404) is counted as deleted.
 
     :param fld_id: Google ID of the folder to be deleted
     :type fld_id: str
-    :return: Success value - returns True if folder successfully deleted, False if not
+    :return: Success value - returns True if folder successfully deleted (or already gone), False if not
     :rtype: bool
     """
 
     logger.info(f"Deleting folder ID '{fld_id}'...")
 
-    # Validate if the folder exists
-    logger.debug("First validating if the folder exists")
-    exists = validate_folder_exists(fld_id=fld_id)
-
-    service = build("drive", "v3", credentials=get_credentials_googledrive())
-
-    if exists is True:  # folder exists, delete
-        response = service.files().delete(fileId=fld_id).execute()
-
-        # Validate if folder was deleted; if successful, the 'response' body contains an empty instance
-        if not response:
-            logger.info(f"Folder ID '{fld_id}' successfully deleted.")
-            result = True
-        else:
-            logger.error(f"Failed to delete folder ID '{fld_id}'")
-            result = False
-
-    else:  # folder does not exist
-        logger.warning(f"Unable to find and delete folder ID '{fld_id}'")
-        result = False
-
-    return result
+    return delete_googledrive_item(item_id=fld_id)
 
 
+@timed("get folder ID")
 def get_folder_googledrive_id(fldname: str):
     """
     Using Google API, gets a folder's Google Drive ID (can be used to calculate the URL to navigate to the folder).
@@ -132,35 +145,48 @@ def get_folder_googledrive_id(fldname: str):
         * If there are no results, will return None
     :rtype: dict
     """
+    from googleapiclient.errors import HttpError
 
     logger.info(f"Getting folder ID (via Google API) for '{fldname}'")
 
     try:
-        service = build("drive", "v3", credentials=get_credentials_googledrive())
-        page_token = None
-
-        while True:
-            # Call the Drive v3 API
-            results = (
-                service.files()
-                .list(q=f"mimeType = 'application/vnd.google-apps.folder' and name = '{fldname}'",
-                      spaces="drive",
-                      fields="nextPageToken, files(id, createdTime, parents)",  # + ID for parent in case multiple results
-                      pageToken=page_token)
-                .execute()
-            )
-            items = results.get("files", [])
-            if items:
-                return items
-            else:
-                return None
-
-            if page_token is None:
-                break
+        if index_enabled():  # answer from the local index
+            items = [{'id': item['id'], 'createdTime': item.get('createdTime'), 'parents': item.get('parents', [])}
+                     for item in index_find_items(name=fldname, is_folder=True)]
+        else:
+            # + ID for parent in case multiple results; reads every page of results
+            items = list(list_googledrive_items(
+                query=f"mimeType = '{MIMETYPE_FOLDER}' and name = '{escape_query_value(fldname)}'",
+                fields="id, createdTime, parents"))
+        if items:
+            return items
+        else:
+            return None
     except HttpError as error:
         logger.error(f"An error occurred: {error}")
 
 
+def input_text_selected(driver: webdriver, xpath: str):
+    """
+    Checks if a text input has the focus and all of its text highlighted (so typing replaces the default text).
+
+    :param driver: A Selenium webdriver
+    :type driver: webdriver
+    :param xpath: XPath of the text input
+    :type xpath: str
+    :return: If the input has the focus and all of its text is highlighted
+    :rtype: bool
+    """
+    from selenium.webdriver.common.by import By
+
+    element = driver.find_element(By.XPATH, xpath)
+
+    return driver.execute_script("const e = arguments[0];"
+                                 "return e === document.activeElement && e.selectionStart === 0 "
+                                 "&& e.selectionEnd === e.value.length;", element)
+
+
+@timed("navigate to folder")
 def navigate_to_folder_by_calc_url(fld_id: str, driver: webdriver):
     """Navigates to the provided folder URL by ID, if it exists, in Google Drive by calculating URL via Google API*
     and Selenium.  Will throw error if folder doesn't exist.
@@ -170,7 +196,10 @@ def navigate_to_folder_by_calc_url(fld_id: str, driver: webdriver):
 
     *Since the purpose of this overall test is to specifically create a new folder and upload a file, using Google API
     for the folder nav. Function named appropriately where we can create a navigate_to_folder_via_user_clicks later
-    if we do want to test out the user clicks to get there"""
+    if we do want to test out the user clicks to get there
+
+    Returns once the folder page is ready (the '+ New' button can be clicked)"""
+    from selenium.webdriver.common.by import By
 
     logger.info(f"Beginning process to navigate to requested folder '{fld_id}'")
 
@@ -183,12 +212,14 @@ def navigate_to_folder_by_calc_url(fld_id: str, driver: webdriver):
     # navigate to the URL using drive and folder ID
     # (ex: https://drive.google.com/drive/folders/11vRRYUOe2ogahi8AivTAgz4Ck8PcHvpy)
     logger.info("Navigating to the requested URL, using folder's google drive ID")
-    url = f"https://drive.google.com/drive/folders/{fld_id}"
+    url = drive_web_url(f"/drive/folders/{fld_id}")
     logger.info(f"URL: {url}")
     driver.get(url)
-    driver.implicitly_wait(5)
+    wait_for_element_interactable(driver=driver, by=By.CSS_SELECTOR, locator="button[guidedhelpid='new_menu_button']")
+    log_page_transfer(driver=driver, page="folder")
 
 
+@timed("validate folder")
 def validate_folder_exists(fldname: str = "", fld_id: str = ""):
     """Validate that a folder exists, by either name or ID (at least one is required), using Google's API
     *if user does not have access to the folder, it will show as not existing.
@@ -207,45 +238,37 @@ def validate_folder_exists(fldname: str = "", fld_id: str = ""):
         logger.error("ERROR: validate_folder_exists requires either a name or ID, neither were provided")
         sys.exit()
 
-    try:
-        service = build("drive", "v3", credentials=get_credentials_googledrive())
-        page_token = None
+    from googleapiclient.errors import HttpError
 
-        while True:
-            # Call the Drive v3 API
+    try:
+        if index_enabled():  # answer from the local index
             if fldname:
-                results = (
-                    service.files()
-                    .list(q=f"mimeType = 'application/vnd.google-apps.folder' and name = '{fldname}' and trashed=false",
-                          spaces="drive",
-                          fields="nextPageToken, files(id, name)",
-                          pageToken=page_token)
-                    .execute()
-                )
-            elif fld_id:
-                result_step1_byid = (
-                    service.files()
-                    .get(fileId=fld_id).execute()
-                )
-                results = (
-                    service.files()
-                    .list(q=f"name='{result_step1_byid['name']}' and mimeType = 'application/vnd.google-apps.folder' "
-                            f"and trashed=false",
-                          spaces="drive",
-                          fields="nextPageToken, files(id, name)",
-                          pageToken=page_token)
-                    .execute()
-                )
-
-            items = results.get("files", [])
-            if items:
-                logger.info(f"Folder '{validateby}' validated")
-                return True
+                exists = len(index_find_items(name=fldname, is_folder=True)) > 0
             else:
-                logger.warning(f"Folder '{validateby}' could not be validated.")
-                return False
-
-            if page_token is None:
-                break
+                exists = len(index_find_items(item_id=fld_id, is_folder=True)) > 0
+        elif fldname:
+            # only need to know if there is at least one result, so stop after the first item
+            items = list_googledrive_items(
+                query=f"mimeType = '{MIMETYPE_FOLDER}' and name = '{escape_query_value(fldname)}' and trashed=false",
+                fields="id", page_size=1)
+            exists = next(items, None) is not None
+        else:
+            try:
+                result_byid = (
+                    get_service_googledrive().files()
+                    .get(fileId=fld_id, fields="id, mimeType, trashed").execute()
+                )
+                exists = result_byid["mimeType"] == MIMETYPE_FOLDER and not result_byid["trashed"]
+            except HttpError as error:
+                if error.resp.status != 404:
+                    raise
+                exists = False  # folder ID does not exist (or user doesn't have access)
+
+        if exists:
+            logger.info(f"Folder '{validateby}' validated")
+            return True
+        else:
+            logger.warning(f"Folder '{validateby}' could not be validated.")
+            return False
     except HttpError as error:
         logger.error(f"An error occurred: {error}")
@@ -7,16 +7,82 @@ NOTES: See README.txt file for requirements to run and all sources used
 VERSION INFO:
     Created by R. Reyna
     Date: 9/9/2024
-    Version: 1.0.0
+    Version: 1.0.1
+
+    Updates:
+        - Added wait_for_element_interactable, an event driven (MutationObserver) wait used for every click step in
+            place of implicitly_wait/WebDriverWait
+        - Added wait_for_element_present, same wait for elements that aren't visible (ex: file upload input)
+        - Page loads log their transfer size (and bytes saved) when request blocking is on, once the page is ready
+        - selenium is only imported by the functions that use it, so importing this module is fast
+        - The Google Drive web address can be changed with set_drive_web_url (ex: the local Drive UI replica, see
+            Selenium_googleDriveTestUpload_MockDriveUI), every page is opened through drive_web_url
 """
+from __future__ import annotations
 import logging
-from selenium import webdriver
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as ec
+from typing import TYPE_CHECKING
+from Selenium_googleDriveTestUpload_RequestBlocking import log_page_transfer
+
+if TYPE_CHECKING:  # only needed for the type hints, not loaded at run time
+    from selenium import webdriver
 
 logger = logging.getLogger('seleniumTest.googleDriveObjects')  # google drive objects logger
 
+ELEMENT_WAIT_TIMEOUT_SEC = 10  # default time to wait for an element to become interactable
+DRIVE_WEB_ROOT = "https://drive.google.com"  # root of every Google Drive page the test opens
+
+_drive_web_url = ""  # replaces DRIVE_WEB_ROOT when set, see set_drive_web_url
+
+# Resolves (calls done) with the element as soon as it is interactable: on the page, visible and not disabled (or only
+# on the page, if visibleOnly is false, ex: hidden file inputs).  Checks right away, then again on every DOM change
+# (MutationObserver) and at the end of every CSS transition/animation, resolves with null once the timeout is reached.
+JS_WAIT_FOR_ELEMENT = """
+const [using, locator, timeoutMs, visibleOnly, done] = arguments;
+function find() {
+    const el = using === 'xpath'
+        ? document.evaluate(locator, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+        : document.querySelector(locator);
+    if (!el || !visibleOnly) return el;
+    const rect = el.getBoundingClientRect();
+    const style = window.getComputedStyle(el);
+    if (rect.width === 0 || rect.height === 0 || style.visibility === 'hidden' || style.display === 'none') return null;
+    if (el.disabled || el.getAttribute('aria-disabled') === 'true') return null;
+    return el;
+}
+let finished = false;
+function check() {
+    const el = find();
+    if (el && !finished) { finish(el); }
+}
+function finish(result) {
+    finished = true;
+    observer.disconnect();
+    document.removeEventListener('transitionend', check, true);
+    document.removeEventListener('animationend', check, true);
+    clearTimeout(timer);
+    done(result);
+}
+const observer = new MutationObserver(check);
+observer.observe(document, {childList: true, subtree: true, attributes: true});
+document.addEventListener('transitionend', check, true);
+document.addEventListener('animationend', check, true);
+const timer = setTimeout(() => { if (!finished) { finish(null); } }, timeoutMs);
+check();
+"""
+
+
+def drive_web_url(path: str = ""):
+    """
+    Gets the address of a Google Drive page, on the real Google Drive or the address set with set_drive_web_url.
+
+    :param path: Page path (ex: "/drive/my-drive")
+    :type path: str
+    :return: Page URL (ex: "https://drive.google.com/drive/my-drive")
+    :rtype: str
+    """
+
+    return f"{_drive_web_url or DRIVE_WEB_ROOT}{path}"
+
 
 def gdrive_click_button_plus_new(driver: webdriver, navigate_to_googledrive: bool = False):
     """
@@ -34,19 +100,22 @@ def gdrive_click_button_plus_new(driver: webdriver, navigate_to_googledrive: boo
         If not, pass in True - the function will then navigate to google drive first and then begin the click process.
     :type navigate_to_googledrive: bool
     """
+    from selenium.webdriver.common.by import By
+
     logger.info("Clicking on Google Drive's '+ New' button in left-hand sidebar.")
 
     if navigate_to_googledrive is True:  # then need to navigate to a google drive page
         # Navigate to Google Drive 'My Drive' page
         logger.debug("Navigating to the 'My Drive' page")
-        driver.get("https://drive.google.com/drive/my-drive")
-        driver.implicitly_wait(5)
+        driver.get(drive_web_url("/drive/my-drive"))
 
-    # Click on "+ New" button
+    # Click on "+ New" button, as soon as it can be clicked
     logger.debug("Clicking on the '+ New' button")
     try:
-        button_plusnew = WebDriverWait(driver, 10).until(
-            ec.element_to_be_clickable((By.CSS_SELECTOR, "button[guidedhelpid='new_menu_button']")))
+        button_plusnew = wait_for_element_interactable(driver=driver, by=By.CSS_SELECTOR,
+                                                       locator="button[guidedhelpid='new_menu_button']")
+        if navigate_to_googledrive is True:  # page is ready, measure what it transferred
+            log_page_transfer(driver=driver, page="my-drive")
         button_plusnew.click()
         # button_plusnew.click()  # when started testing, bug that required two clicks, seems to be fixed
         logger.info("Clicked on '+ New' button.")
@@ -54,4 +123,86 @@ def gdrive_click_button_plus_new(driver: webdriver, navigate_to_googledrive: boo
         logger.error("Could not click on '+ New' button.")
         logger.error(e)
 
-    driver.implicitly_wait(1)
+
+def set_drive_web_url(url: str = ""):
+    """
+    Opens the Google Drive pages from another address (ex: the local Drive UI replica, "http://127.0.0.1:50123"),
+    instead of https://drive.google.com.
+
+    :param url: Address the page paths are added to, empty to go back to the real Google Drive
+    :type url: str
+    """
+    global _drive_web_url
+
+    _drive_web_url = url.rstrip("/")
+    logger.info(f"Google Drive pages are opened from {_drive_web_url or DRIVE_WEB_ROOT}")
+
+
+def wait_for_element_interactable(driver: webdriver, by: str, locator: str, timeout: float = ELEMENT_WAIT_TIMEOUT_SEC):
+    """
+    Waits for an element to be interactable (on the page, visible and not disabled) and returns it.  Instead of
+    polling from python (WebDriverWait checks every 500 ms, one WebDriver command per check), a MutationObserver is
+    injected into the page with execute_async_script, which resolves as soon as the DOM changes make the element
+    interactable.  The whole wait is a single WebDriver command.
+
+    :param driver: Selenium webdriver used to automate web clicks
+    :type driver: webdriver
+    :param by: How to find the element, By.CSS_SELECTOR or By.XPATH
+    :type by: str
+    :param locator: CSS selector or XPath of the element (ex: "button[guidedhelpid='new_menu_button']")
+    :type locator: str
+    :param timeout: How long to wait, in seconds
+    :type timeout: float
+    :return: The element
+    :rtype: WebElement
+    :raises TimeoutException: if the element isn't interactable within the timeout
+    """
+
+    logger.debug(f"Waiting (up to {timeout} second(s)) for element '{locator}' to be interactable")
+    return _wait_for_element(driver=driver, by=by, locator=locator, timeout=timeout, visible_only=True)
+
+
+def wait_for_element_present(driver: webdriver, by: str, locator: str, timeout: float = ELEMENT_WAIT_TIMEOUT_SEC):
+    """
+    Waits for an element to be on the page, visible or not (ex: Google Drive's hidden file upload input), and returns
+    it.  Same event driven (MutationObserver) wait as wait_for_element_interactable.
+
+    :param driver: Selenium webdriver used to automate web clicks
+    :type driver: webdriver
+    :param by: How to find the element, By.CSS_SELECTOR or By.XPATH
+    :type by: str
+    :param locator: CSS selector or XPath of the element (ex: "input[type='file']")
+    :type locator: str
+    :param timeout: How long to wait, in seconds
+    :type timeout: float
+    :return: The element
+    :rtype: WebElement
+    :raises TimeoutException: if the element isn't on the page within the timeout
+    """
+
+    logger.debug(f"Waiting (up to {timeout} second(s)) for element '{locator}' to be on the page")
+    return _wait_for_element(driver=driver, by=by, locator=locator, timeout=timeout, visible_only=False)
+
+
+def _wait_for_element(driver: webdriver, by: str, locator: str, timeout: float, visible_only: bool):
+    """Runs JS_WAIT_FOR_ELEMENT, see wait_for_element_interactable"""
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+
+    if by == By.CSS_SELECTOR:
+        using = "css"
+    elif by == By.XPATH:
+        using = "xpath"
+    else:
+        raise ValueError(f"Element waits support By.CSS_SELECTOR and By.XPATH, not '{by}'")
+
+    # the script timeout must be longer than the wait, only needs to be set once per driver
+    if getattr(driver, "gdrive_script_timeout", 0) < timeout + 5:
+        driver.set_script_timeout(timeout + 5)
+        driver.gdrive_script_timeout = timeout + 5
+
+    element = driver.execute_async_script(JS_WAIT_FOR_ELEMENT, using, locator, int(timeout * 1000), visible_only)
+    if element is None:
+        raise TimeoutException(f"Element '{locator}' was not ready after {timeout} second(s)")
+
+    return element
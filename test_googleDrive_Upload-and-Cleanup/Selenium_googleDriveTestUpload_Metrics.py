@@ -0,0 +1,228 @@
+"""
+SUMMARY: Step level timing for the test.  Each step (login, folder creation, each upload, each validation, each
+    deletion...) is timed as a span, with the span context manager or the timed decorator, and the spans are kept in
+    memory for the run.  At the end of a run, write_metrics_report writes a machine-readable report (JSON and CSV) with
+    the duration, count, failures and percentiles of each step.
+
+    Spans can be nested (ex: "upload files" inside "run upload scenario"), each span records its parent, and
+    current_span_name tells which step is running in the current context (ex: to attribute browser/API calls to a
+    step).  The open spans are kept in a context variable, so asyncio tasks see the spans open where they were created,
+    and so do calls run on a thread pool with the caller's context (see Selenium_googleDriveTestUpload_DriveAsync).
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+import contextlib
+import contextvars
+import csv
+import functools
+import json
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger('seleniumTest.metrics')  # metrics logger
+
+# Global variables
+METRICS_PERCENTILES = [50, 90, 95, 99]  # percentiles reported for each step
+METRICS_CSV_FIELDS = ["name", "count", "failures", "total", "mean", "min", "max"] + [f"p{pct}" for pct in
+                                                                                    METRICS_PERCENTILES]
+
+_spans = []  # [{'name': str, 'parent': str, 'started': float, 'seconds': float, 'success': bool, 'attributes': {}}]
+_spans_lock = threading.Lock()
+_span_stack = contextvars.ContextVar("span_stack", default=())  # names of the spans open, innermost last
+
+
+def current_span_name():
+    """
+    Gets the name of the innermost span open in the current context (thread or asyncio task).
+
+    :return: Span name, empty if no span is open
+    :rtype: str
+    """
+
+    stack = _span_stack.get()
+    return stack[-1] if stack else ""
+
+
+def get_spans():
+    """
+    Gets the spans recorded so far, in the order they finished.
+
+    :return: List of spans, {'name': 'login', 'parent': 'connect', 'started': 1697000000.0, 'seconds': 3.2,
+        'success': True, 'attributes': {}}
+    :rtype: list
+    """
+
+    with _spans_lock:
+        return list(_spans)
+
+
+def percentile(values: list, pct: float):
+    """
+    Percentile of a list of values, linearly interpolated between the closest ranks (same as numpy's default).
+
+    :param values: Values (don't need to be sorted)
+    :type values: list
+    :param pct: Percentile, from 0 to 100
+    :type pct: float
+    :return: The percentile, None if there are no values
+    :rtype: float
+    """
+
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def record_span(name: str, seconds: float, success: bool = True, started: float = None, **attributes):
+    """
+    Records a step that was timed elsewhere (ex: by wait_until), the same as a span that just finished.
+
+    :param name: Step name, spans with the same name are summarized together
+    :type name: str
+    :param seconds: How long the step took
+    :type seconds: float
+    :param success: If the step succeeded
+    :type success: bool
+    :param started: When the step started (time.time()), defaults to now - seconds
+    :type started: float
+    :param attributes: Extra details saved with the span (ex: description="folder 'Testing Folder'")
+    """
+
+    with _spans_lock:
+        _spans.append({'name': name, 'parent': current_span_name(),
+                       'started': time.time() - seconds if started is None else started, 'seconds': seconds,
+                       'success': success, 'attributes': attributes})
+
+
+def reset_metrics():
+    """
+    Clears the recorded spans (ex: at the start of a test run).
+    """
+
+    with _spans_lock:
+        _spans.clear()
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """
+    Times the code inside the with block as a step.  The span fails if the block raises an exception (the exception
+    is not caught).
+
+    ex: with span("upload files", files=3):
+
+    :param name: Step name, spans with the same name are summarized together
+    :type name: str
+    :param attributes: Extra details saved with the span
+    """
+
+    stack = _span_stack.get()
+    parent = stack[-1] if stack else ""
+    token = _span_stack.set(stack + (name,))
+    started = time.time()
+    start = time.monotonic()
+    success = False
+    try:
+        yield
+        success = True
+    finally:
+        seconds = time.monotonic() - start
+        _span_stack.reset(token)
+        with _spans_lock:
+            _spans.append({'name': name, 'parent': parent, 'started': started, 'seconds': seconds,
+                           'success': success, 'attributes': attributes})
+        logger.debug(f"Step '{name}' took {seconds:.3f} second(s){'' if success else ' (FAILED)'}")
+
+
+def summarize_spans(spans: list = None):
+    """
+    Summarizes the spans by step name: count, failures, total/mean/min/max duration and percentiles.
+
+    :param spans: Spans to summarize, defaults to every span recorded so far
+    :type spans: list
+    :return: Summary per step name, in the order the steps first finished, {'login': {'count': 1, 'failures': 0,
+        'total': 3.2, 'mean': 3.2, 'min': 3.2, 'max': 3.2, 'p50': 3.2, 'p90': 3.2, ...}}
+    :rtype: dict
+    """
+
+    spans = get_spans() if spans is None else spans
+
+    durations = {}
+    failures = {}
+    for record in spans:
+        durations.setdefault(record['name'], []).append(record['seconds'])
+        failures[record['name']] = failures.get(record['name'], 0) + (not record['success'])
+
+    summary = {}
+    for name, values in durations.items():
+        summary[name] = {'count': len(values), 'failures': failures[name], 'total': sum(values),
+                         'mean': sum(values) / len(values), 'min': min(values), 'max': max(values)}
+        for pct in METRICS_PERCENTILES:
+            summary[name][f"p{pct}"] = percentile(values, pct)
+
+    return summary
+
+
+def timed(name: str = ""):
+    """
+    Decorator, times every call of the function as a span.
+
+    ex: @timed("login")
+
+    :param name: Step name, defaults to the function's name
+    :type name: str
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name or function.__name__):
+                return function(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def write_metrics_report(filename: str, run_id: str = "", spans: list = None):
+    """
+    Writes the metrics report of a run: a JSON file with the summary per step and every span, and a CSV file (same
+    name, .csv) with the summary per step.  The summary is also logged.
+
+    :param filename: JSON report file (ex: "seleniumTestGoogleDriveUpload_metrics.json")
+    :type filename: str
+    :param run_id: ID of the test run, saved in the report
+    :type run_id: str
+    :param spans: Spans to report, defaults to every span recorded so far
+    :type spans: list
+    :return: The summary per step, see summarize_spans
+    :rtype: dict
+    """
+
+    spans = get_spans() if spans is None else spans
+    summary = summarize_spans(spans=spans)
+
+    with open(filename, "w") as file:
+        json.dump({'run_id': run_id, 'created': time.time(), 'summary': summary, 'spans': spans}, file, indent=2,
+                  default=str)
+
+    filename_csv = f"{filename.rsplit('.', 1)[0] if filename.endswith('.json') else filename}.csv"
+    with open(filename_csv, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=METRICS_CSV_FIELDS)
+        writer.writeheader()
+        for name, stats in summary.items():
+            writer.writerow({'name': name, **stats})
+
+    for name, stats in summary.items():
+        logger.info(f"Step '{name}': {stats['count']} call(s), {stats['failures']} failure(s), "
+                    f"total {stats['total']:.2f} second(s), p50 {stats['p50']:.2f}, max {stats['max']:.2f}")
+    logger.info(f"Metrics report written to '{filename}' and '{filename_csv}'")
+
+    return summary
@@ -0,0 +1,621 @@
+"""
+SUMMARY: Local mock of the Google Drive API (v3) endpoints the test uses, so the API paths (folder/file look ups,
+    validations, clean up, the local index) can be benchmarked and load tested deterministically, with no network and
+    no credentials.  The mock is an HTTP server on localhost (run in a background thread), holding the Drive items in
+    memory:
+        - files.list, with the subset of the query (q) syntax the test issues: name/mimeType/trashed/createdTime
+            comparisons (=, !=, <, >, <=, >=, contains), 'ID' in parents, appProperties has { key='k' and value='v' },
+            and/or/not and parentheses; paginated (pageSize, pageToken)
+        - files.get, files.update (PATCH: name, trashed, appProperties, addParents/removeParents), files.delete
+            (deletes everything inside a folder too), files.create (metadata only, or a multipart upload)
+        - batch requests (/batch/drive/v3), each request in the batch is answered separately
+        - changes.getStartPageToken and changes.list
+        - the fields parameter (ex: "nextPageToken, files(id, name)")
+        - HTML pages can be added (mock_drive_add_page), ex: the Drive UI replica (see
+            Selenium_googleDriveTestUpload_MockDriveUI), so the pages and the API calls they make share one address
+
+    Latency, rate limiting (403 userRateLimitExceeded, like Drive) and errors (500) can be injected, with a seeded
+    random generator so runs are repeatable.  Point the test at the mock with set_drive_api_endpoint (see
+    Selenium_googleDriveTestUpload_DriveAPI), ex:
+        server = start_mock_drive(latency_sec=0.05)
+        set_drive_api_endpoint(server.url)
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+import collections
+import datetime
+import email.parser
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from Selenium_googleDriveTestUpload_DriveAPI import MIMETYPE_FOLDER
+
+logger = logging.getLogger('seleniumTest.mockDrive')  # mock drive API logger
+
+# Global variables
+MOCK_DRIVE_HOST = "127.0.0.1"
+MOCK_DRIVE_PORT = 0  # 0: any free port, see the server's url attribute
+MOCK_PAGE_SIZE_DEFAULT = 100  # files.list/changes.list page size if none is requested
+MOCK_PAGE_SIZE_MAX = 1000  # largest page Drive returns
+MOCK_ITEM_FIELDS_DEFAULT = ["kind", "id", "name", "mimeType"]  # fields returned when no fields are requested
+
+# Drive query tokens: quoted string, punctuation/operators, words
+QUERY_TOKEN = re.compile(r"\s*(?:(?P<string>'(?:[^'\\]|\\.)*')|(?P<op>!=|<=|>=|[=<>(){}])|(?P<word>[A-Za-z_][\w.]*))")
+
+
+def mock_drive_add_item(server, name: str, mime_type: str = "text/plain", parents: list = None,
+                        app_properties: dict = None, content: bytes = b"", created_time: str = ""):
+    """
+    Adds an item (file or folder) to the mock, ex: to seed test data.
+
+    :param server: Mock drive server, as returned by start_mock_drive
+    :type server: ThreadingHTTPServer
+    :param name: Item name
+    :type name: str
+    :param mime_type: Item MIME type, MIMETYPE_FOLDER for a folder
+    :type mime_type: str
+    :param parents: IDs of the parent folders, defaults to ["root"]
+    :type parents: list
+    :param app_properties: Private app properties (ex: {'seleniumRunId': '3f9c2a7e51b0'})
+    :type app_properties: dict
+    :param content: File content (sets size and md5Checksum)
+    :type content: bytes
+    :param created_time: Created time (RFC 3339), defaults to now
+    :type created_time: str
+    :return: The item
+    :rtype: dict
+    """
+
+    return server.drive.create_item({'name': name, 'mimeType': mime_type, 'parents': parents or ["root"],
+                                     'appProperties': app_properties or {}, 'createdTime': created_time},
+                                    content=content)
+
+
+def mock_drive_add_page(server, pattern: str, render):
+    """
+    Serves an HTML page from the mock, for the GET requests whose path matches the pattern.  Pages get the injected
+    latency, but not the rate limit or errors (those only apply to API calls).
+
+    :param server: Mock drive server, as returned by start_mock_drive
+    :type server: ThreadingHTTPServer
+    :param pattern: Regular expression the whole path must match (ex: r"/drive/folders/([^/]+)"), its groups are
+        passed to render
+    :type pattern: str
+    :param render: Function that returns the page's HTML (str), called with the pattern's groups on every request
+    :type render: function
+    """
+
+    with server.drive.lock:
+        server.drive.pages.append((re.compile(pattern), render))
+
+
+def mock_drive_configure(server, latency_sec: float = None, jitter_sec: float = None, error_rate: float = None,
+                         rate_limit_per_sec: float = None, seed: int = None):
+    """
+    Changes the mock's injected latency, errors and rate limit (only the provided values are changed).
+
+    :param server: Mock drive server, as returned by start_mock_drive
+    :type server: ThreadingHTTPServer
+    :param latency_sec: Delay added to every HTTP request
+    :type latency_sec: float
+    :param jitter_sec: Random 0 to jitter_sec seconds added to the latency
+    :type jitter_sec: float
+    :param error_rate: Fraction (0 to 1) of API calls answered with a 500 backend error
+    :type error_rate: float
+    :param rate_limit_per_sec: API calls allowed per second (a batch counts each of its calls), the calls over the
+        limit are answered with a 403 userRateLimitExceeded; 0 for no limit
+    :type rate_limit_per_sec: float
+    :param seed: Seed of the random generator (jitter and errors), for repeatable runs
+    :type seed: int
+    """
+
+    config = {'latency_sec': latency_sec, 'jitter_sec': jitter_sec, 'error_rate': error_rate,
+              'rate_limit_per_sec': rate_limit_per_sec}
+    with server.drive.lock:
+        server.drive.config.update({key: value for key, value in config.items() if value is not None})
+        if seed is not None:
+            server.drive.rng.seed(seed)
+
+
+def mock_drive_items(server):
+    """
+    Gets a copy of every item in the mock.
+
+    :param server: Mock drive server, as returned by start_mock_drive
+    :type server: ThreadingHTTPServer
+    :return: Items by ID, {'IDvalue': {'id': 'IDvalue', 'name': 'x', 'mimeType': 'type', 'parents': [...], ...}}
+    :rtype: dict
+    """
+
+    with server.drive.lock:
+        return json.loads(json.dumps(server.drive.items))
+
+
+def parse_drive_query(query: str):
+    """
+    Parses a Drive API query (the subset the test issues, see the module summary) into a function that tells if an
+    item matches it.
+
+    :param query: Drive API query (ex: "mimeType != 'application/vnd.google-apps.folder' and name = 'a.txt'")
+    :type query: str
+    :return: Function with one parameter, the item (dict), that returns True if the item matches the query
+    :rtype: function
+    :raises ValueError: If the query can't be parsed
+    """
+
+    tokens = []
+    position = 0
+    query = query.strip()
+    while position < len(query):
+        match = QUERY_TOKEN.match(query, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Invalid query at position {position}: {query!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "string":
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        elif kind == "word" and value.lower() in ("and", "or", "not", "in", "has", "contains", "true", "false"):
+            value = value.lower()
+        tokens.append((kind, value))
+        position = match.end()
+
+    if not tokens:
+        return lambda item: True
+
+    parser = _QueryParser(tokens)
+    predicate = parser.parse_or()
+    if parser.position != len(tokens):
+        raise ValueError(f"Invalid query, unexpected {parser.peek()[1]!r}: {query!r}")
+    return predicate
+
+
+def start_mock_drive(host: str = MOCK_DRIVE_HOST, port: int = MOCK_DRIVE_PORT, latency_sec: float = 0,
+                     jitter_sec: float = 0, error_rate: float = 0, rate_limit_per_sec: float = 0, seed: int = 0):
+    """
+    Starts the mock Drive API server in a background thread.
+
+    :param host: Address to listen on
+    :type host: str
+    :param port: Port to listen on, 0 for any free port
+    :type port: int
+    :param latency_sec: Delay added to every HTTP request (see mock_drive_configure for the injection parameters)
+    :type latency_sec: float
+    :param jitter_sec: Random 0 to jitter_sec seconds added to the latency
+    :type jitter_sec: float
+    :param error_rate: Fraction (0 to 1) of API calls answered with a 500 backend error
+    :type error_rate: float
+    :param rate_limit_per_sec: API calls allowed per second, 0 for no limit
+    :type rate_limit_per_sec: float
+    :param seed: Seed of the random generator (jitter and errors), for repeatable runs
+    :type seed: int
+    :return: The server, its url attribute is the address to point the client at (ex: "http://127.0.0.1:50123")
+    :rtype: ThreadingHTTPServer
+    """
+
+    server = ThreadingHTTPServer((host, port), _MockDriveHandler)
+    server.daemon_threads = True
+    server.drive = _MockDriveState(seed=seed)
+    server.url = f"http://{server.server_address[0]}:{server.server_address[1]}"
+    mock_drive_configure(server, latency_sec=latency_sec, jitter_sec=jitter_sec, error_rate=error_rate,
+                         rate_limit_per_sec=rate_limit_per_sec)
+
+    threading.Thread(target=server.serve_forever, name="mockDrive", daemon=True).start()
+    logger.info(f"Mock Drive API listening on {server.url}")
+
+    return server
+
+
+def stop_mock_drive(server):
+    """
+    Stops the mock Drive API server.
+
+    :param server: Mock drive server, as returned by start_mock_drive
+    :type server: ThreadingHTTPServer
+    """
+
+    server.shutdown()
+    server.server_close()
+    logger.info(f"Mock Drive API on {server.url} stopped")
+
+
+class _QueryParser:
+    """Recursive descent parser of the Drive query tokens, each parse_* returns a predicate"""
+
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self, kind: str = None, value: str = None):
+        token = self.peek()
+        if token[0] is None or (kind and token[0] != kind) or (value and token[1] != value):
+            raise ValueError(f"Invalid query, expected {value or kind} but found {token[1]!r}")
+        self.position += 1
+        return token[1]
+
+    def parse_or(self):
+        terms = [self.parse_and()]
+        while self.peek() == ("word", "or"):
+            self.take()
+            terms.append(self.parse_and())
+        return terms[0] if len(terms) == 1 else lambda item: any(term(item) for term in terms)
+
+    def parse_and(self):
+        terms = [self.parse_not()]
+        while self.peek() == ("word", "and"):
+            self.take()
+            terms.append(self.parse_not())
+        return terms[0] if len(terms) == 1 else lambda item: all(term(item) for term in terms)
+
+    def parse_not(self):
+        if self.peek() == ("word", "not"):
+            self.take()
+            term = self.parse_not()
+            return lambda item: not term(item)
+        if self.peek() == ("op", "("):
+            self.take()
+            term = self.parse_or()
+            self.take("op", ")")
+            return term
+        return self.parse_term()
+
+    def parse_term(self):
+        kind, value = self.peek()
+
+        if kind == "string":  # 'value' in parents
+            self.take()
+            self.take("word", "in")
+            field = self.take("word")
+            return lambda item: value in item.get(field, [])
+
+        field = self.take("word")
+        if self.peek() == ("word", "has"):  # appProperties has { key='k' and value='v' }
+            self.take()
+            self.take("op", "{")
+            self.take("word", "key")
+            self.take("op", "=")
+            key = self.take("string")
+            self.take("word", "and")
+            self.take("word", "value")
+            self.take("op", "=")
+            expected = self.take("string")
+            self.take("op", "}")
+            return lambda item: item.get(field, {}).get(key) == expected
+
+        operator = self.take("word", "contains") if self.peek() == ("word", "contains") else self.take("op")
+        kind, expected = self.peek()
+        self.take()
+        if kind == "word" and expected in ("true", "false"):
+            expected = expected == "true"
+        elif kind != "string":
+            raise ValueError(f"Invalid query, expected a value but found {expected!r}")
+
+        compare = {'=': lambda actual: actual == expected, '!=': lambda actual: actual != expected,
+                   '<': lambda actual: actual < expected, '>': lambda actual: actual > expected,
+                   '<=': lambda actual: actual <= expected, '>=': lambda actual: actual >= expected,
+                   'contains': lambda actual: str(expected).lower() in str(actual).lower()}.get(operator)
+        if compare is None:
+            raise ValueError(f"Invalid query, unknown operator {operator!r}")
+        default = False if isinstance(expected, bool) else ""
+        return lambda item: compare(item.get(field, default))
+
+
+class _MockDriveState:
+    """The mock's items, changes, injection settings and request routing"""
+
+    def __init__(self, seed: int = 0):
+        self.lock = threading.RLock()
+        self.items = {}  # {'IDvalue': item}
+        self.changes = []  # [{'fileId': 'IDvalue', 'removed': bool, 'time': str}], the page token is an index
+        self.config = {'latency_sec': 0, 'jitter_sec': 0, 'error_rate': 0, 'rate_limit_per_sec': 0}
+        self.rng = random.Random(seed)
+        self.calls = collections.deque()  # monotonic time of the API calls in the last second, for the rate limit
+        self.next_id = 1
+        self.pages = []  # [(compiled path pattern, render function)], see mock_drive_add_page
+
+    def create_item(self, metadata: dict, content: bytes = None):
+        """Creates an item from files.create style metadata, returns it"""
+
+        with self.lock:
+            item_id = f"mock{self.next_id:010d}{uuid.UUID(int=self.rng.getrandbits(128)).hex[:12]}"
+            self.next_id += 1
+            item = {'kind': "drive#file", 'id': item_id, 'name': metadata.get('name', "Untitled"),
+                    'mimeType': metadata.get('mimeType') or "application/octet-stream",
+                    'parents': list(metadata.get('parents') or ["root"]),
+                    'createdTime': metadata.get('createdTime') or _now_rfc3339(), 'trashed': False,
+                    'appProperties': dict(metadata.get('appProperties') or {})}
+            if item['mimeType'] != MIMETYPE_FOLDER:
+                content = content or b""
+                item['size'] = str(len(content))
+                item['md5Checksum'] = hashlib.md5(content).hexdigest()
+            self.items[item_id] = item
+            self._add_change(item_id)
+            return item
+
+    def handle(self, method: str, uri: str, headers: dict, body: bytes):
+        """Answers one HTTP request, returns (status, headers, body)"""
+
+        config = self.config
+        delay = config['latency_sec'] + (self.rng.uniform(0, config['jitter_sec']) if config['jitter_sec'] else 0)
+        if delay:
+            time.sleep(delay)
+
+        split = urlsplit(uri)
+        if method == "GET":
+            for pattern, render in self.pages:
+                match = pattern.fullmatch(unquote(split.path))
+                if match:
+                    return 200, {'Content-Type': "text/html; charset=UTF-8"}, render(*match.groups()).encode()
+        if method == "POST" and split.path.rstrip("/").endswith("/batch/drive/v3"):
+            return self._handle_batch(headers, body)
+        return self._handle_call(method, split.path, parse_qs(split.query), headers, body)
+
+    def _add_change(self, item_id: str, removed: bool = False):
+        self.changes.append({'fileId': item_id, 'removed': removed, 'time': _now_rfc3339()})
+
+    def _delete(self, item_id: str):
+        """Deletes an item and everything inside it"""
+
+        children = [child_id for child_id, child in self.items.items() if item_id in child.get('parents', [])]
+        for child_id in children:
+            self._delete(child_id)
+        self.items.pop(item_id, None)
+        self._add_change(item_id, removed=True)
+
+    def _handle_batch(self, headers: dict, body: bytes):
+        """Splits a batch request and answers each of its requests, in a multipart/mixed response"""
+
+        message = email.parser.BytesParser().parsebytes(
+            f"Content-Type: {headers.get('content-type', '')}\r\n\r\n".encode() + body)
+        if not message.is_multipart():
+            return _error(400, "badRequest", "Batch request body is not multipart")
+
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = []
+        for part in message.get_payload():
+            payload = part.get_payload(decode=True) or b""
+            request, _, part_body = payload.replace(b"\r\n", b"\n").partition(b"\n\n")
+            request_line, *header_lines = request.decode().split("\n")
+            part_method, part_uri = request_line.split(" ")[:2]
+            part_headers = {line.split(":", 1)[0].strip().lower(): line.split(":", 1)[1].strip()
+                            for line in header_lines if ":" in line}
+            split = urlsplit(part_uri)
+            status, _, content = self._handle_call(part_method, split.path, parse_qs(split.query), part_headers,
+                                                   part_body)
+            content_id = re.sub(r"\r?\n(?=[ \t])", "", part.get('Content-ID', "")).strip("<>")  # unfold long IDs
+            parts.append(f"--{boundary}\r\nContent-Type: application/http\r\n"
+                         f"Content-ID: <response-{content_id}>\r\n\r\n"
+                         f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}\r\n"
+                         f"Content-Type: application/json; charset=UTF-8\r\n\r\n".encode() + content + b"\r\n")
+
+        content = b"".join(parts) + f"--{boundary}--\r\n".encode()
+        return 200, {'Content-Type': f"multipart/mixed; boundary={boundary}"}, content
+
+    def _handle_call(self, method: str, path: str, query: dict, headers: dict, body: bytes):
+        """Answers one API call (a request, or a request inside a batch), with the injected rate limit and errors"""
+
+        with self.lock:
+            if self.config['rate_limit_per_sec']:
+                now = time.monotonic()
+                while self.calls and now - self.calls[0] >= 1:
+                    self.calls.popleft()
+                if len(self.calls) >= self.config['rate_limit_per_sec']:
+                    return _error(403, "userRateLimitExceeded", "User Rate Limit Exceeded")
+                self.calls.append(now)
+            if self.config['error_rate'] and self.rng.random() < self.config['error_rate']:
+                return _error(500, "backendError", "Backend Error")
+
+            path = unquote(path).rstrip("/")
+            param = {key: values[0] for key, values in query.items()}
+            try:
+                for route_method, pattern, route in _ROUTES:
+                    match = re.search(pattern, path)
+                    if match and method == route_method:
+                        return route(self, param, headers, body, *match.groups())
+            except ValueError as e:  # invalid query or body
+                return _error(400, "invalid", str(e))
+
+        return _error(404, "notFound", f"No mock for {method} {path}")
+
+    def _files_create(self, param: dict, headers: dict, body: bytes):
+        item = self.create_item(json.loads(body or b"{}"))
+        return _ok(item, param.get('fields'))
+
+    def _files_delete(self, param: dict, headers: dict, body: bytes, item_id: str):
+        if item_id not in self.items:
+            return _error(404, "notFound", f"File not found: {item_id}.")
+        self._delete(item_id)
+        return 204, {}, b""
+
+    def _files_get(self, param: dict, headers: dict, body: bytes, item_id: str):
+        if item_id not in self.items:
+            return _error(404, "notFound", f"File not found: {item_id}.")
+        return _ok(self.items[item_id], param.get('fields'))
+
+    def _files_list(self, param: dict, headers: dict, body: bytes):
+        predicate = parse_drive_query(param.get('q', ""))
+        matches = [item for item in self.items.values() if predicate(item)]
+
+        start = int(param.get('pageToken') or 0)
+        size = min(int(param.get('pageSize') or MOCK_PAGE_SIZE_DEFAULT), MOCK_PAGE_SIZE_MAX)
+        result = {'kind': "drive#fileList", 'incompleteSearch': False, 'files': matches[start:start + size]}
+        if start + size < len(matches):
+            result['nextPageToken'] = str(start + size)
+        return _ok(result, param.get('fields'), list_key="files")
+
+    def _files_update(self, param: dict, headers: dict, body: bytes, item_id: str):
+        if item_id not in self.items:
+            return _error(404, "notFound", f"File not found: {item_id}.")
+        item = self.items[item_id]
+        metadata = json.loads(body or b"{}")
+
+        for key in ("name", "trashed", "mimeType"):
+            if key in metadata:
+                item[key] = metadata[key]
+        for key, value in metadata.get('appProperties', {}).items():  # None removes a property
+            if value is None:
+                item['appProperties'].pop(key, None)
+            else:
+                item['appProperties'][key] = value
+        for parent in filter(None, param.get('removeParents', "").split(",")):
+            item['parents'] = [existing for existing in item['parents'] if existing != parent]
+        for parent in filter(None, param.get('addParents', "").split(",")):
+            item['parents'].append(parent)
+
+        self._add_change(item_id)
+        return _ok(item, param.get('fields'))
+
+    def _files_upload(self, param: dict, headers: dict, body: bytes):
+        """Multipart upload (uploadType=multipart): a JSON metadata part and the file content part"""
+
+        message = email.parser.BytesParser().parsebytes(
+            f"Content-Type: {headers.get('content-type', '')}\r\n\r\n".encode() + body)
+        if not message.is_multipart():
+            return self._files_create(param, headers, b"{}")
+        metadata, *media = message.get_payload()
+        content = media[0].get_payload(decode=True) if media else b""
+        item = self.create_item(json.loads(metadata.get_payload(decode=True) or b"{}"), content=content)
+        return _ok(item, param.get('fields'))
+
+    def _changes_list(self, param: dict, headers: dict, body: bytes):
+        start = int(param.get('pageToken') or 0)
+        size = min(int(param.get('pageSize') or MOCK_PAGE_SIZE_DEFAULT), MOCK_PAGE_SIZE_MAX)
+        changes = []
+        for change in self.changes[start:start + size]:
+            record = {'kind': "drive#change", 'fileId': change['fileId'], 'removed': change['removed'],
+                      'time': change['time']}
+            if not change['removed'] and change['fileId'] in self.items:
+                record['file'] = self.items[change['fileId']]
+            changes.append(record)
+
+        result = {'kind': "drive#changeList", 'changes': changes}
+        if start + size < len(self.changes):
+            result['nextPageToken'] = str(start + size)
+        else:
+            result['newStartPageToken'] = str(len(self.changes))
+        return _ok(result, param.get('fields'), list_key="changes")
+
+    def _changes_start_token(self, param: dict, headers: dict, body: bytes):
+        return _ok({'kind': "drive#startPageToken", 'startPageToken': str(len(self.changes))}, param.get('fields'))
+
+
+class _MockDriveHandler(BaseHTTPRequestHandler):
+    """HTTP handler, passes every request to the server's _MockDriveState"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API (the client's connection pool reuses connections)
+
+    def do_DELETE(self):
+        self._answer("DELETE")
+
+    def do_GET(self):
+        self._answer("GET")
+
+    def do_PATCH(self):
+        self._answer("PATCH")
+
+    def do_POST(self):
+        self._answer("POST")
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _answer(self, method: str):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        headers = {key.lower(): value for key, value in self.headers.items()}
+        status, response_headers, content = self.server.drive.handle(method, self.path, headers, body)
+
+        self.send_response(status)
+        for key, value in {'Content-Type': "application/json; charset=UTF-8", **response_headers}.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+# (HTTP method, path pattern, handler), the first match answers the call (uploads before files.create)
+_ROUTES = [
+    ("POST", r"/upload/drive/v3/files$", _MockDriveState._files_upload),
+    ("GET", r"/drive/v3/files$", _MockDriveState._files_list),
+    ("POST", r"/drive/v3/files$", _MockDriveState._files_create),
+    ("GET", r"/drive/v3/files/([^/]+)$", _MockDriveState._files_get),
+    ("PATCH", r"/drive/v3/files/([^/]+)$", _MockDriveState._files_update),
+    ("DELETE", r"/drive/v3/files/([^/]+)$", _MockDriveState._files_delete),
+    ("GET", r"/drive/v3/changes/startPageToken$", _MockDriveState._changes_start_token),
+    ("GET", r"/drive/v3/changes$", _MockDriveState._changes_list),
+]
+
+_REASONS = {200: "OK", 204: "No Content", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+            500: "Internal Server Error"}
+
+
+def _apply_fields(value, fields: dict):
+    """Keeps only the requested fields (as parsed by _parse_fields) of a response"""
+
+    if fields is None:
+        return value
+    if isinstance(value, list):
+        return [_apply_fields(entry, fields) for entry in value]
+    if isinstance(value, dict):
+        return {key: _apply_fields(value[key], sub_fields) for key, sub_fields in fields.items() if key in value}
+    return value
+
+
+def _error(status: int, reason: str, message: str):
+    """Drive style JSON error response"""
+
+    body = {'error': {'errors': [{'domain': "global", 'reason': reason, 'message': message}], 'code': status,
+                      'message': message}}
+    return status, {}, json.dumps(body).encode()
+
+
+def _now_rfc3339():
+    """Current time, as Drive formats it (ex: 2026-10-18T14:03:12.123Z)"""
+
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def _ok(result: dict, fields: str = None, list_key: str = ""):
+    """200 response with the requested fields, the items of a list get the default item fields if none are requested"""
+
+    if fields:
+        result = _apply_fields(result, _parse_fields(fields))
+    elif list_key:
+        result = {**result, list_key: [_apply_fields(entry, dict.fromkeys(MOCK_ITEM_FIELDS_DEFAULT))
+                                       if list_key == "files" else entry for entry in result[list_key]]}
+    else:
+        result = _apply_fields(result, dict.fromkeys(MOCK_ITEM_FIELDS_DEFAULT + ['startPageToken']))
+    return 200, {}, json.dumps(result).encode()
+
+
+def _parse_fields(fields: str):
+    """Parses a fields parameter (ex: "nextPageToken, files(id, name)") into {'nextPageToken': None, 'files': {...}}"""
+
+    tokens = re.findall(r"[\w*]+|[(),]", fields)
+    position = 0
+
+    def parse_level():
+        nonlocal position
+        level = {}
+        while position < len(tokens) and tokens[position] != ")":
+            name = tokens[position]
+            position += 1
+            level[name] = None
+            if position < len(tokens) and tokens[position] == "(":
+                position += 1
+                level[name] = parse_level()
+                position += 1  # closing parenthesis
+            if position < len(tokens) and tokens[position] == ",":
+                position += 1
+        return level
+
+    parsed = parse_level()
+    return None if "*" in parsed else parsed
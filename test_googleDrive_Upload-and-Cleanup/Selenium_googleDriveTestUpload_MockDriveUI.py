@@ -0,0 +1,227 @@
+"""
+SUMMARY: Local replica of the Google Drive pages the UI helpers click through (gdrive_click_button_plus_new,
+    create_folder_newbutton, create_files_fileinput), served by the mock Drive API (see
+    Selenium_googleDriveTestUpload_MockDrive), so the UI steps can be benchmarked headless, offline and repeatably
+    instead of only against the live drive.google.com.  The pages use the same locators as the helpers:
+        - '+ New' button: button[guidedhelpid='new_menu_button']
+        - 'New folder' and 'File upload' menu items: [aria-label='New folder Alt+C then F'] and
+            [aria-label='File upload Alt+C then U']
+        - new folder dialog: the "Untitled folder" input (focused and highlighted, like Drive) and the "Create" span
+        - file upload: a hidden input[type='file'], added to the page when 'File upload' is clicked
+
+    Creating a folder and uploading files call the mock's files.create/files upload endpoints (the page and the API
+    share one address), so the API validations that follow see the new items.  Each UI step renders after a
+    configurable delay (see MOCK_UI_DELAYS_SEC), to model how long Drive takes to boot the page, open the menu, etc.
+
+    Point the test at the replica with set_drive_web_url and set_drive_api_endpoint, ex:
+        server = start_mock_drive()
+        mock_drive_add_ui(server, menu_delay_sec=0.2)
+        set_drive_web_url(server.url)
+        set_drive_api_endpoint(server.url)
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+import json
+import logging
+from Selenium_googleDriveTestUpload_DriveAPI import MIMETYPE_FOLDER
+from Selenium_googleDriveTestUpload_MockDrive import mock_drive_add_page
+
+logger = logging.getLogger('seleniumTest.mockDriveUI')  # mock drive UI logger
+
+# Global variables
+MOCK_UI_DELAYS_SEC = {  # how long each UI step takes to render, see mock_drive_configure_ui
+    'page': 0.5,  # page load -> '+ New' button (and the folder's items) rendered
+    'menu': 0.15,  # '+ New' clicked -> menu open
+    'dialog': 0.3,  # 'New folder' clicked -> new folder dialog open
+    'select': 0.2,  # dialog open -> "Untitled folder" text focused and highlighted
+    'create': 0.4,  # folder created (API call answered) -> dialog closed
+    'file_input': 0.1,  # 'File upload' clicked -> file upload input added
+}
+MOCK_UI_ROOT_PAGES = r"/drive/(?:home|my-drive)"  # pages showing the root folder ("My Drive")
+MOCK_UI_FOLDER_PAGE = r"/drive/folders/([^/]+)"  # folder page, by folder ID
+
+# The replica's page, __CONFIG__ is replaced by the page's settings (JSON): folder ID, items and delays
+MOCK_UI_PAGE = r"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Google Drive (local replica)</title>
+<style>
+body { font-family: sans-serif; margin: 0; }
+#sidebar { position: fixed; left: 0; top: 0; width: 220px; padding: 16px; }
+#main { margin-left: 256px; padding: 16px; }
+[role=menu] { position: absolute; left: 16px; top: 64px; background: #fff; border: 1px solid #ccc; padding: 4px 0; }
+[role=menuitem] { padding: 8px 16px; cursor: pointer; }
+[role=dialog] { position: fixed; top: 30%; left: 35%; background: #fff; border: 1px solid #ccc; padding: 24px; }
+</style>
+</head>
+<body>
+<div id="sidebar"></div>
+<div id="main"><div role="list" id="items"></div></div>
+<script>
+const CONFIG = __CONFIG__;
+
+function after(seconds, action) {
+    setTimeout(action, seconds * 1000);
+}
+
+function element(tag, attributes, text) {
+    const el = document.createElement(tag);
+    for (const [key, value] of Object.entries(attributes || {})) el.setAttribute(key, value);
+    if (text) el.textContent = text;
+    return el;
+}
+
+function addItem(name) {
+    document.getElementById('items').append(element('div', {role: 'listitem'}, name));
+}
+
+function api(path, contentType, body) {
+    return fetch(path, {method: 'POST', headers: {'Content-Type': contentType}, body: body})
+        .then((response) => response.json());
+}
+
+function closeMenu() {
+    const menu = document.getElementById('new-menu');
+    if (menu) menu.remove();
+}
+
+function openMenu() {
+    closeMenu();
+    after(CONFIG.delays.menu, () => {
+        const menu = element('div', {id: 'new-menu', role: 'menu'});
+        const newFolder = element('div', {role: 'menuitem', 'aria-label': 'New folder Alt+C then F'}, 'New folder');
+        const fileUpload = element('div', {role: 'menuitem', 'aria-label': 'File upload Alt+C then U'}, 'File upload');
+        newFolder.addEventListener('click', () => { closeMenu(); openFolderDialog(); });
+        fileUpload.addEventListener('click', () => { closeMenu(); addFileInput(); });
+        menu.append(newFolder, fileUpload);
+        document.body.append(menu);
+    });
+}
+
+function openFolderDialog() {
+    after(CONFIG.delays.dialog, () => {
+        const dialog = element('div', {role: 'dialog', 'aria-label': 'New folder'});
+        const input = element('input', {type: 'text', value: 'Untitled folder'});
+        const cancel = element('button', {type: 'button'});
+        const create = element('button', {type: 'button'});
+        cancel.append(element('span', {}, 'Cancel'));
+        create.append(element('span', {}, 'Create'));
+        cancel.addEventListener('click', () => dialog.remove());
+        create.addEventListener('click', () => {
+            create.disabled = true;
+            const metadata = {name: input.value, mimeType: CONFIG.folderMimeType, parents: [CONFIG.folderId]};
+            api('/drive/v3/files', 'application/json; charset=UTF-8', JSON.stringify(metadata)).then((item) => {
+                if (item.name) addItem(item.name);
+                after(CONFIG.delays.create, () => dialog.remove());
+            });
+        });
+        dialog.append(element('h2', {}, 'New folder'), input, cancel, create);
+        document.body.append(dialog);
+        after(CONFIG.delays.select, () => { input.focus(); input.select(); });
+    });
+}
+
+function addFileInput() {
+    after(CONFIG.delays.file_input, () => {
+        const input = element('input', {type: 'file', multiple: '', style: 'display: none'});
+        input.addEventListener('change', () => {
+            for (const file of input.files) upload(file);
+            input.remove();
+        });
+        document.body.append(input);
+    });
+}
+
+function upload(file) {
+    const boundary = 'replica' + Math.random().toString(16).slice(2);
+    const mimeType = file.type || 'application/octet-stream';
+    const metadata = JSON.stringify({name: file.name, mimeType: mimeType, parents: [CONFIG.folderId]});
+    const body = new Blob([
+        `--${boundary}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n${metadata}\r\n`,
+        `--${boundary}\r\nContent-Type: ${mimeType}\r\n\r\n`, file, `\r\n--${boundary}--\r\n`]);
+    return api('/upload/drive/v3/files?uploadType=multipart', `multipart/related; boundary=${boundary}`, body)
+        .then((item) => { if (item.name) addItem(item.name); });
+}
+
+after(CONFIG.delays.page, () => {
+    const button = element('button', {type: 'button', guidedhelpid: 'new_menu_button'}, 'New');
+    button.addEventListener('click', openMenu);
+    document.getElementById('sidebar').append(button);
+    CONFIG.items.forEach(addItem);
+});
+</script>
+</body>
+</html>
+"""
+
+
+def mock_drive_add_ui(server, **delays_sec):
+    """
+    Serves the Drive UI replica from the mock Drive API server: the home/"My Drive" pages (/drive/home,
+    /drive/my-drive) and the folder pages (/drive/folders/<folder ID>).
+
+    :param server: Mock drive server, as returned by start_mock_drive
+    :type server: ThreadingHTTPServer
+    :param delays_sec: Render delays to change from MOCK_UI_DELAYS_SEC, see mock_drive_configure_ui
+    """
+
+    server.drive_ui = {'delays': dict(MOCK_UI_DELAYS_SEC)}
+    mock_drive_configure_ui(server, **delays_sec)
+
+    mock_drive_add_page(server, MOCK_UI_ROOT_PAGES, lambda: render_drive_page(server, folder_id="root"))
+    mock_drive_add_page(server, MOCK_UI_FOLDER_PAGE, lambda folder_id: render_drive_page(server, folder_id=folder_id))
+    logger.info(f"Google Drive UI replica served from {server.url}/drive/my-drive")
+
+
+def mock_drive_configure_ui(server, page_delay_sec: float = None, menu_delay_sec: float = None,
+                            dialog_delay_sec: float = None, select_delay_sec: float = None,
+                            create_delay_sec: float = None, file_input_delay_sec: float = None):
+    """
+    Changes the replica's render delays (only the provided values are changed), used from the next page load on.
+
+    :param server: Mock drive server, with the replica added (see mock_drive_add_ui)
+    :type server: ThreadingHTTPServer
+    :param page_delay_sec: Page load -> '+ New' button (and the folder's items) rendered
+    :type page_delay_sec: float
+    :param menu_delay_sec: '+ New' clicked -> menu open
+    :type menu_delay_sec: float
+    :param dialog_delay_sec: 'New folder' clicked -> new folder dialog open
+    :type dialog_delay_sec: float
+    :param select_delay_sec: Dialog open -> "Untitled folder" text focused and highlighted
+    :type select_delay_sec: float
+    :param create_delay_sec: Folder created -> dialog closed
+    :type create_delay_sec: float
+    :param file_input_delay_sec: 'File upload' clicked -> file upload input added
+    :type file_input_delay_sec: float
+    """
+
+    delays = {'page': page_delay_sec, 'menu': menu_delay_sec, 'dialog': dialog_delay_sec, 'select': select_delay_sec,
+              'create': create_delay_sec, 'file_input': file_input_delay_sec}
+    with server.drive.lock:
+        server.drive_ui['delays'].update({step: value for step, value in delays.items() if value is not None})
+
+
+def render_drive_page(server, folder_id: str = "root"):
+    """
+    Renders the replica's page for a folder: its items (not trashed, folders first) and the current render delays.
+
+    :param server: Mock drive server, with the replica added (see mock_drive_add_ui)
+    :type server: ThreadingHTTPServer
+    :param folder_id: ID of the folder shown, "root" for "My Drive"
+    :type folder_id: str
+    :return: The page's HTML
+    :rtype: str
+    """
+
+    with server.drive.lock:
+        children = [item for item in server.drive.items.values()
+                    if folder_id in item.get('parents', []) and not item.get('trashed')]
+        delays = dict(server.drive_ui['delays'])
+
+    children.sort(key=lambda item: (item['mimeType'] != MIMETYPE_FOLDER, item['name'].lower()))
+    config = {'folderId': folder_id, 'folderMimeType': MIMETYPE_FOLDER, 'delays': delays,
+              'items': [item['name'] for item in children]}
+
+    # "</" is escaped so an item name can't close the script tag
+    return MOCK_UI_PAGE.replace("__CONFIG__", json.dumps(config).replace("</", "<\\/"))
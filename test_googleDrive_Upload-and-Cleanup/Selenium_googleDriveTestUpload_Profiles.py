@@ -0,0 +1,238 @@
+"""
+SUMMARY: Logged in Chrome profile template, and fast clones of it for new browsers.  Typing the email and password
+    through Google's sign in page is the slowest (and flakiest) step of the test, so instead the test logs in once,
+    into a template Chrome profile directory (user-data-dir, holding the session cookies and local storage), and each
+    new browser gets its own clone of the template.  The login is skipped unless the clone's session has expired, in
+    which case the browser logs in and the template is marked to be rebuilt.
+
+    Clones are copy-on-write (reflink, ex: Btrfs/XFS/APFS) where the file system supports it, so cloning costs almost
+    nothing; otherwise the template is copied, leaving out the caches.  Files are never hardlinked: Chrome updates its
+    SQLite files (ex: Cookies) in place, so a hardlinked clone would write into the template (and every other clone).
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+from contextlib import contextmanager
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from Selenium_googleDriveTestUpload_Connection import (configure_fortesting_googledrive, connect_googledrive,
+                                                       LAUNCH_PROFILE_BLOCK_DENY)
+
+logger = logging.getLogger('seleniumTest.profiles')  # profiles logger
+
+# Global variables
+PROFILE_TEMPLATE_DIR = os.path.join(tempfile.gettempdir(), "seleniumTestGoogleDriveUpload_template")
+PROFILE_ROOT = os.path.join(tempfile.gettempdir(), "seleniumTestGoogleDriveUpload_profiles")  # clones (workers/daemon)
+PROFILE_TEMPLATE_MARKER = "seleniumTemplate.json"  # written in the template once it is logged in and complete
+PROFILE_TEMPLATE_LOCK = ".lock"  # added to the template directory's path, held (across processes) while it is rebuilt
+# Chrome lock files (a copy would make Chrome think the clone is already open) and caches (safe to leave out)
+PROFILE_SKIP_NAMES = {"SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile", "LOCK", "Cache", "Code Cache",
+                      "GPUCache", "ShaderCache", "GrShaderCache", "GraphiteDawnCache", "DawnCache", "Crashpad",
+                      "CacheStorage", "ScriptCache", "BrowserMetrics"}
+PROFILE_LOCK_NAMES = {"SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile"}
+
+
+def clone_profile(clone_dir: str, template_dir: str = PROFILE_TEMPLATE_DIR):
+    """
+    Creates (replacing any existing one) a clone of the template profile, copy-on-write if the file system supports it,
+    otherwise a copy without the caches.
+
+    :param clone_dir: Directory of the new profile
+    :type clone_dir: str
+    :param template_dir: Directory of the template profile
+    :type template_dir: str
+    :return: How the clone was made, 'reflink' or 'copy'
+    :rtype: str
+    """
+
+    start = time.monotonic()
+    if os.path.exists(clone_dir):
+        shutil.rmtree(clone_dir)
+    os.makedirs(os.path.dirname(os.path.abspath(clone_dir)), exist_ok=True)
+
+    method = "reflink" if _clone_reflink(template_dir, clone_dir) else "copy"
+    if method == "copy":
+        shutil.copytree(template_dir, clone_dir, symlinks=True,
+                        ignore=lambda directory, names: [name for name in names if name in PROFILE_SKIP_NAMES])
+    else:  # everything was cloned, only the lock files need to go
+        for directory, dirnames, filenames in os.walk(clone_dir):
+            for name in set(dirnames + filenames) & PROFILE_LOCK_NAMES:
+                path = os.path.join(directory, name)
+                if os.path.isdir(path) and not os.path.islink(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+
+    logger.info(f"Cloned profile template to '{clone_dir}' ({method}) in {time.monotonic() - start:.2f} second(s)")
+
+    return method
+
+
+def connect_googledrive_profile(servicename: str, username: str, clone_dir: str,
+                                template_dir: str = PROFILE_TEMPLATE_DIR, launch_profile: str = "default"):
+    """
+    Connects to Google Drive with a clone of the logged in profile template (creating the template first if needed),
+    so the login is skipped.  If the clone's session has expired, the browser logs in and the template is marked to
+    be rebuilt the next time it is needed.
+
+    :param servicename: Name of the service for which the creds are used, as saved in the keyring.
+    :type servicename: str
+    :param username: Cred's username, as saved in the keyring.
+    :type username: str
+    :param clone_dir: Directory of this browser's profile (clone), replaced if it exists
+    :type clone_dir: str
+    :param template_dir: Directory of the template profile
+    :type template_dir: str
+    :param launch_profile: Chrome launch profile, see configure_fortesting_googledrive (the template itself is always
+        logged in with the default profile)
+    :type launch_profile: str
+    :return: webdriver connection to chrome, logged in and on the Google Drive home page
+    :rtype: webdriver
+    """
+
+    ensure_profile_template(servicename=servicename, username=username, template_dir=template_dir)
+    with _template_lock(template_dir):  # not while another process is replacing the template
+        clone_profile(clone_dir=clone_dir, template_dir=template_dir)
+
+    chrome_options = configure_fortesting_googledrive(user_data_dir=clone_dir, profile=launch_profile)
+    driver = connect_googledrive(servicename=servicename, username=username, chrome_options=chrome_options,
+                                 reuse_login=True, block_deny=LAUNCH_PROFILE_BLOCK_DENY[launch_profile])
+
+    if not driver.gdrive_reused_login:  # the clone (and so the template) was no longer logged in
+        logger.warning("Profile template session has expired, it will be rebuilt the next time it is needed")
+        marker = os.path.join(template_dir, PROFILE_TEMPLATE_MARKER)
+        if os.path.exists(marker):
+            os.remove(marker)
+
+    return driver
+
+
+def create_profile_template(servicename: str, username: str, template_dir: str = PROFILE_TEMPLATE_DIR):
+    """
+    Logs in once, into a new template profile, and closes the browser so Chrome writes the session to disk.  The
+    template is built in a temporary directory and then moved into place, so a half built template is never cloned;
+    the temporary directory is removed if the build fails.  The template's lock file is held while it is rebuilt, so
+    two processes never replace it at the same time.
+
+    :param servicename: Name of the service for which the creds are used, as saved in the keyring.
+    :type servicename: str
+    :param username: Cred's username, as saved in the keyring.
+    :type username: str
+    :param template_dir: Directory of the template profile, replaced if it exists
+    :type template_dir: str
+    """
+
+    with _template_lock(template_dir):
+        _build_profile_template(servicename=servicename, username=username, template_dir=template_dir)
+
+
+def ensure_profile_template(servicename: str, username: str, template_dir: str = PROFILE_TEMPLATE_DIR):
+    """
+    Creates the profile template if it doesn't exist, or was marked to be rebuilt (its session expired).  If another
+    process is already rebuilding it, waits for that process (the template's lock) instead of logging in again.
+
+    :param servicename: Name of the service for which the creds are used, as saved in the keyring.
+    :type servicename: str
+    :param username: Cred's username, as saved in the keyring.
+    :type username: str
+    :param template_dir: Directory of the template profile
+    :type template_dir: str
+    """
+
+    marker = os.path.join(template_dir, PROFILE_TEMPLATE_MARKER)
+    if os.path.exists(marker):
+        return
+
+    with _template_lock(template_dir):
+        if os.path.exists(marker):  # another process rebuilt it while this one waited for the lock
+            logger.debug(f"Profile template '{template_dir}' was created by another process")
+            return
+        _build_profile_template(servicename=servicename, username=username, template_dir=template_dir)
+
+
+def _build_profile_template(servicename: str, username: str, template_dir: str):
+    """Builds the template, see create_profile_template (the caller holds the template's lock)"""
+
+    logger.info(f"Creating logged in profile template '{template_dir}'")
+
+    parent_dir = os.path.dirname(os.path.abspath(template_dir))
+    os.makedirs(parent_dir, exist_ok=True)
+    build_dir = tempfile.mkdtemp(dir=parent_dir, prefix=".template-")
+
+    try:
+        chrome_options = configure_fortesting_googledrive(user_data_dir=build_dir)
+        driver = connect_googledrive(servicename=servicename, username=username, chrome_options=chrome_options)
+        driver.quit()  # quit (not close) so Chrome flushes the cookies and exits, releasing the profile
+
+        with open(os.path.join(build_dir, PROFILE_TEMPLATE_MARKER), "w") as marker:
+            json.dump({'username': username, 'created': time.time()}, marker)
+
+        if os.path.exists(template_dir):
+            shutil.rmtree(template_dir)
+        os.replace(build_dir, template_dir)
+    finally:
+        if os.path.exists(build_dir):  # the build failed before it was moved into place
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+    logger.info("Profile template created")
+
+
+@contextmanager
+def _template_lock(template_dir: str):
+    """
+    Holds the template's lock file (exclusive, across processes) while the template is rebuilt, same as the driver
+    cache's manifest lock (see Selenium_googleDriveTestUpload_DriverCache).  The lock file sits next to the template
+    directory, since the directory itself is replaced.
+    """
+
+    os.makedirs(os.path.dirname(os.path.abspath(template_dir)), exist_ok=True)
+    with open(os.path.abspath(template_dir) + PROFILE_TEMPLATE_LOCK, "a+") as lock_file:
+        if sys.platform.startswith("win"):
+            import msvcrt  # windows only
+            lock_file.seek(0)
+            while True:  # a login takes longer than LK_LOCK's 10 seconds of retries, keep waiting
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl  # not on windows
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _clone_reflink(template_dir: str, clone_dir: str):
+    """
+    Tries a copy-on-write clone of the whole template (Linux: cp --reflink=always, macOS: cp -c), returns False if the
+    file system (or OS) doesn't support it.
+    """
+
+    if sys.platform.startswith("linux"):
+        command = ["cp", "-a", "--reflink=always", template_dir, clone_dir]
+    elif sys.platform == "darwin":
+        command = ["cp", "-c", "-R", template_dir, clone_dir]
+    else:
+        return False
+
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if result.returncode != 0:
+        if os.path.exists(clone_dir):  # partial clone
+            shutil.rmtree(clone_dir)
+        return False
+
+    return True
+
@@ -0,0 +1,179 @@
+"""
+SUMMARY: Request blocking for the Chrome driver, using the Chrome DevTools Protocol (Network.setBlockedURLs).  Google
+    Drive pages pull in analytics, font and image traffic that the test never touches; blocking it makes the page loads
+    (ex: navigate_to_folder_by_calc_url, gdrive_click_button_plus_new) lighter and faster.
+
+    What is blocked is set per driver (ex: per scenario) with a deny list and an allow list, each made of category names
+    (see BLOCK_CATEGORIES) and/or URL patterns ('*' wildcards).  The allow list takes entries out of the deny list: a
+    denied pattern is dropped when an allowed pattern matches it, '*' matching anything (ex: deny=["analytics", "fonts",
+    "images"], allow=["*.svg"] keeps the icons, allow=["*googleusercontent.com*"] drops both googleusercontent.com
+    image patterns).  Chrome only has a block list, so an allowed pattern can't punch a hole in a wider denied one (ex:
+    allow=["*gstatic.com*"] doesn't unblock gstatic.com fonts, as "*.woff2" is still denied).
+
+    How many bytes a page transfers is read from the page's Resource Timing entries.  compare_page_bytes loads a page
+    with and without blocking and records how many bytes blocking saved (the launch profile benchmark records these
+    baselines, see Selenium_googleDriveTestUpload_BenchmarkProfiles); after that, every load of the page logs its
+    transfer size and the bytes saved, once the page is ready.
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+import logging
+import re
+import time
+
+logger = logging.getLogger('seleniumTest.requestBlocking')  # request blocking logger
+
+# Global variables
+BLOCK_CATEGORIES = {
+    'analytics': ["*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*play.google.com/log*",
+                  "*/gen_204*", "*/jserror*", "*csp.withgoogle.com*"],
+    'fonts': ["*fonts.gstatic.com*", "*fonts.googleapis.com*", "*.woff", "*.woff2", "*.ttf", "*.otf"],
+    'images': ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*lh3.googleusercontent.com*",
+               "*drive-thirdparty.googleusercontent.com*"],
+    'media': ["*.mp3", "*.mp4", "*.webm", "*.ogg"],
+}
+BLOCK_DEFAULT_DENY = ["analytics", "fonts", "images", "media"]  # used when no deny list is provided
+
+# Sum of the bytes transferred by the page's navigation and every resource loaded so far
+JS_PAGE_TRANSFER = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+return {bytes: entries.reduce((total, entry) => total + (entry.transferSize || 0), 0), requests: entries.length};
+"""
+
+_page_baselines = {}  # {'page': bytes transferred without blocking}, recorded by compare_page_bytes
+
+
+def compare_page_bytes(driver, url: str, page: str, settle_sec: float = 3):
+    """
+    Loads a page without blocking and then with the driver's blocking (cache disabled for both, so both are full
+    loads), and reports the bytes transferred each way.  The unblocked size is recorded as the page's baseline, used by
+    log_page_transfer on later loads.
+
+    :param driver: Selenium Chrome webdriver, with blocking set (see set_request_blocking)
+    :type driver: webdriver
+    :param url: Page to load
+    :type url: str
+    :param page: Name of the page in the reports (ex: "my-drive", "folder")
+    :type page: str
+    :param settle_sec: Time to let each load finish its background requests before measuring
+    :type settle_sec: float
+    :return: {'page': 'folder', 'bytes_unblocked': 2400000, 'bytes_blocked': 1500000, 'bytes_saved': 900000,
+        'requests_unblocked': 120, 'requests_blocked': 70}
+    :rtype: dict
+    """
+
+    patterns = getattr(driver, "gdrive_blocked_urls", [])
+
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+    try:
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+        unblocked = _load_and_measure(driver, url, settle_sec)
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        blocked = _load_and_measure(driver, url, settle_sec)
+    finally:
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": False})
+
+    _page_baselines[page] = unblocked['bytes']
+    result = {'page': page, 'bytes_unblocked': unblocked['bytes'], 'bytes_blocked': blocked['bytes'],
+              'bytes_saved': unblocked['bytes'] - blocked['bytes'], 'requests_unblocked': unblocked['requests'],
+              'requests_blocked': blocked['requests']}
+
+    logger.info(f"Page '{page}': {result['bytes_unblocked']:,} bytes ({result['requests_unblocked']} requests) "
+                f"unblocked, {result['bytes_blocked']:,} bytes ({result['requests_blocked']} requests) blocked, "
+                f"{result['bytes_saved']:,} bytes saved")
+
+    return result
+
+
+def log_page_transfer(driver, page: str):
+    """
+    Logs how many bytes the current page has transferred so far, and the bytes saved compared to the page's unblocked
+    baseline (if compare_page_bytes has recorded one).  Does nothing if the driver has no request blocking set.
+    Call it once the page is ready (ex: the '+ New' button can be clicked), right after driver.get only the navigation
+    itself has been counted.
+
+    :param driver: Selenium Chrome webdriver
+    :type driver: webdriver
+    :param page: Name of the page in the reports (ex: "my-drive", "folder")
+    :type page: str
+    :return: {'bytes': 1500000, 'requests': 70, 'bytes_saved': 900000 (None if no baseline)}, None if not blocking
+    :rtype: dict
+    """
+
+    if not getattr(driver, "gdrive_blocked_urls", None):
+        return None
+
+    transfer = driver.execute_script(JS_PAGE_TRANSFER)
+    baseline = _page_baselines.get(page)
+    transfer['bytes_saved'] = baseline - transfer['bytes'] if baseline is not None else None
+
+    saved = f", {transfer['bytes_saved']:,} bytes saved" if baseline is not None else ""
+    logger.info(f"Page '{page}' transferred {transfer['bytes']:,} bytes ({transfer['requests']} requests){saved}")
+
+    return transfer
+
+
+def resolve_block_patterns(deny: list = None, allow: list = None):
+    """
+    Builds the list of URL patterns to block from a deny list and an allow list, each made of category names (see
+    BLOCK_CATEGORIES) and/or URL patterns.  A denied pattern is taken out when an allowed pattern matches it ('*'
+    matching anything, ex: "*.svg" or "*googleusercontent.com*"); a narrower allowed pattern doesn't unblock part of
+    a wider denied one.
+
+    :param deny: Categories/patterns to block, defaults to BLOCK_DEFAULT_DENY
+    :type deny: list
+    :param allow: Categories/patterns to not block, even if denied
+    :type allow: list
+    :return: URL patterns to block, in order, without duplicates
+    :rtype: list
+    """
+
+    denied = _expand_block_entries(BLOCK_DEFAULT_DENY if deny is None else deny)
+    allowed = [re.compile(".*".join(re.escape(part) for part in pattern.split("*")))
+               for pattern in _expand_block_entries(allow or [])]
+
+    return [pattern for pattern in dict.fromkeys(denied) if not any(regex.fullmatch(pattern) for regex in allowed)]
+
+
+def set_request_blocking(driver, deny: list = None, allow: list = None):
+    """
+    Sets (replacing any previous setting) the URL patterns the driver blocks, for every page it loads from now on.
+    The patterns are saved on the driver (gdrive_blocked_urls), so page loads can report on them.
+
+    :param driver: Selenium Chrome webdriver
+    :type driver: webdriver
+    :param deny: Categories/patterns to block, defaults to BLOCK_DEFAULT_DENY (pass [] to stop blocking)
+    :type deny: list
+    :param allow: Categories/patterns to not block, even if denied
+    :type allow: list
+    :return: URL patterns now blocked
+    :rtype: list
+    """
+
+    patterns = resolve_block_patterns(deny=deny, allow=allow)
+    logger.info(f"Blocking {len(patterns)} URL pattern(s)")
+    logger.debug(f"Blocked URL patterns: {patterns}")
+
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    driver.gdrive_blocked_urls = patterns
+
+    return patterns
+
+
+def _expand_block_entries(entries: list):
+    """Replaces the category names in a deny/allow list with the category's URL patterns"""
+
+    patterns = []
+    for entry in entries:
+        patterns.extend(BLOCK_CATEGORIES.get(entry, [entry]))
+    return patterns
+
+
+def _load_and_measure(driver, url: str, settle_sec: float):
+    """Loads a page, waits for its background requests to settle and returns its transfer size"""
+
+    driver.get(url)
+    time.sleep(settle_sec)  # measurement only: lets late (lazy loaded) requests count towards the page
+    return driver.execute_script(JS_PAGE_TRANSFER)
@@ -0,0 +1,110 @@
+"""
+SUMMARY: Reusable wait engine for the test.  Instead of sleeping a fixed number of seconds after an action (and hoping
+    it was long enough), wait_until polls a readiness check (ex: the Drive API can see the uploaded file, or a dialog
+    has closed) with exponential backoff and jitter, up to an overall deadline.  Fast actions continue right away, slow
+    ones get more time.  How long each wait actually took is recorded, see get_wait_timings, and as a "wait" step in the
+    run's metrics (see Selenium_googleDriveTestUpload_Metrics).
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+import logging
+import random
+import threading
+import time
+from Selenium_googleDriveTestUpload_Metrics import record_span
+
+logger = logging.getLogger('seleniumTest.waits')  # waits logger
+
+# Global variables
+WAIT_TIMEOUT_SEC = 30  # default overall deadline for a wait
+WAIT_POLL_INITIAL_SEC = 0.1  # delay before the second check, grows by WAIT_POLL_BACKOFF after each check
+WAIT_POLL_MAX_SEC = 2  # longest delay between two checks
+WAIT_POLL_BACKOFF = 1.5  # multiplier applied to the delay after each check
+WAIT_POLL_JITTER = 0.2  # +/- fraction of random jitter applied to each delay
+
+_wait_timings = []  # [{'description': str, 'seconds': float, 'checks': int, 'success': bool}]
+_wait_timings_lock = threading.Lock()
+
+
+def get_wait_timings():
+    """
+    Gets how long each wait took, in the order they finished.
+
+    :return: List of wait timings, {'description': 'upload', 'seconds': 1.25, 'checks': 4, 'success': True}
+    :rtype: list
+    """
+
+    with _wait_timings_lock:
+        return list(_wait_timings)
+
+
+def reset_wait_timings():
+    """
+    Clears the recorded wait timings (ex: at the start of a test run).
+    """
+
+    with _wait_timings_lock:
+        _wait_timings.clear()
+
+
+def wait_until(predicate, description: str = "condition", timeout: float = WAIT_TIMEOUT_SEC,
+               poll_initial: float = WAIT_POLL_INITIAL_SEC, poll_max: float = WAIT_POLL_MAX_SEC,
+               backoff: float = WAIT_POLL_BACKOFF, jitter: float = WAIT_POLL_JITTER):
+    """
+    Polls predicate until it returns a truthy value or the timeout is reached.  The first check is made right away,
+    then the delay between checks starts at poll_initial and grows by backoff (with +/- jitter) up to poll_max.  An
+    exception raised by predicate counts as "not ready yet" (ex: element not on the page yet).
+
+    :param predicate: Function with no parameters that returns a truthy value once ready
+    :type predicate: function
+    :param description: What is being waited on, used in the log and the recorded timings
+    :type description: str
+    :param timeout: Overall deadline, in seconds
+    :type timeout: float
+    :param poll_initial: Delay before the second check, in seconds
+    :type poll_initial: float
+    :param poll_max: Longest delay between two checks, in seconds
+    :type poll_max: float
+    :param backoff: Multiplier applied to the delay after each check
+    :type backoff: float
+    :param jitter: +/- fraction of random jitter applied to each delay (ex: 0.2 = +/- 20%)
+    :type jitter: float
+    :return: The predicate's last return value: truthy if ready, falsy if the timeout was reached
+    """
+
+    logger.debug(f"Waiting (up to {timeout} second(s)) for {description}")
+
+    start = time.monotonic()
+    deadline = start + timeout
+    delay = poll_initial
+    checks = 0
+    result = None
+
+    while True:
+        checks += 1
+        try:
+            result = predicate()
+        except Exception as e:
+            logger.debug(f"Wait for {description}: check raised {type(e).__name__}, not ready yet")
+            result = None
+
+        now = time.monotonic()
+        if result or now >= deadline:
+            break
+
+        # sleep with backoff and jitter, but never past the deadline
+        time.sleep(min(delay * random.uniform(1 - jitter, 1 + jitter), deadline - now))
+        delay = min(delay * backoff, poll_max)
+
+    seconds = time.monotonic() - start
+    with _wait_timings_lock:
+        _wait_timings.append({'description': description, 'seconds': seconds, 'checks': checks,
+                              'success': bool(result)})
+    record_span("wait", seconds, success=bool(result), description=description, checks=checks)
+
+    if result:
+        logger.debug(f"Wait for {description}: ready after {seconds:.2f} second(s), {checks} check(s)")
+    else:
+        logger.warning(f"Wait for {description}: not ready after {seconds:.2f} second(s), {checks} check(s)")
+
+    return result
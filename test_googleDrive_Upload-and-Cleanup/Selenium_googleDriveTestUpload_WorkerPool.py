@@ -0,0 +1,188 @@
+"""
+SUMMARY: Runs test scenarios in parallel, with a pool of worker processes.  Each worker has its own Chrome WebDriver
+    (with its own, isolated Chrome profile directory) and its own log file, logs in once with connect_googledrive and
+    then runs scenarios from a shared job queue until the queue is empty.  Each worker's profile is a clone of the
+    logged in profile template (see Selenium_googleDriveTestUpload_Profiles), so workers normally skip the login.  The
+    results of all the jobs are gathered into a single summary.
+
+    SCENARIOS:
+        - "upload": the upload test (run_upload_scenario), kwargs: fldname, run_id
+
+    Each job gets its own run ID (unless its kwargs already have one), returned in the job's result, so everything a
+    job created can be cleaned up with cleanup_test(run_id=...).
+
+    *Since workers are separate processes (spawned), scripts that call run_scenarios_parallel must do so under
+    if __name__ == "__main__": (see the bottom of this file)
+
+NOTES: See README.txt file for requirements to run and all sources used
+"""
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from Selenium_googleDriveTestUpload_Connection import configure_keyring_googledrive
+from Selenium_googleDriveTestUpload_DriveAPI import new_run_id
+from Selenium_googleDriveTestUpload_ExecuteTest import run_upload_scenario
+from Selenium_googleDriveTestUpload_Logging import start_logging
+from Selenium_googleDriveTestUpload_Profiles import connect_googledrive_profile, ensure_profile_template, PROFILE_ROOT
+
+logger = logging.getLogger('seleniumTest.workerPool')  # worker pool logger
+
+# Global variables
+SCENARIOS = {"upload": run_upload_scenario}  # scenario name: function(driver, run_id, **kwargs)
+RESULT_POLL_SEC = 5  # how often to check that the workers are still alive while waiting on results
+
+
+def run_scenarios_parallel(servicename: str, username: str, jobs: list, workers: int = 0,
+                           profile_root: str = PROFILE_ROOT, launch_profile: str = "default"):
+    """
+    Runs the scenario jobs across a pool of worker processes, each with its own logged in Chrome WebDriver, and
+    gathers the results.
+
+    :param servicename: Name used to securely store the appropriate Google Drive credentials in the keyring
+    :type servicename: str
+    :param username: Google Drive credential's username
+    :type username: str
+    :param jobs: Scenarios to run, each as {'scenario': 'upload', 'kwargs': {'fldname': 'Testing Folder (Selenium)'}},
+        a new run ID is added to the kwargs of the jobs that don't have one
+    :type jobs: list
+    :param workers: Number of worker processes (browsers), defaults to the number of CPUs (but never more than jobs)
+    :type workers: int
+    :param profile_root: Directory where each worker's Chrome profile directory is created
+    :type profile_root: str
+    :param launch_profile: Chrome launch profile of the workers (ex: "performance" when running many workers), see
+        configure_fortesting_googledrive
+    :type launch_profile: str
+    :return: Summary of the run, in the following format:
+        {'jobs': 4, 'passed': 3, 'failed': 1, 'seconds': 95.2,
+         'results': [{'job': 0, 'worker': 1, 'scenario': 'upload', 'run_id': '3f9c2a7e51b0', 'success': True,
+                      'result': ..., 'seconds': 30.1, 'error': ''}]}
+    :rtype: dict
+    """
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    logger.info(f"Running {len(jobs)} scenario job(s) on {workers} worker(s)")
+
+    for job in jobs:  # fail fast, before any browsers are started
+        if job['scenario'] not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{job['scenario']}', available: {list(SCENARIOS)}")
+    jobs = [{**job, 'kwargs': {'run_id': new_run_id(), **job.get('kwargs', {})}} for job in jobs]
+
+    # Establish user creds (if needed) and the logged in profile template, once, before the workers start
+    configure_keyring_googledrive(servicename=servicename, username=username)
+    ensure_profile_template(servicename=servicename, username=username)
+
+    start = time.monotonic()
+    ctx = multiprocessing.get_context("spawn")  # fresh interpreter per worker, same on every OS
+    job_queue = ctx.Queue()
+    result_queue = ctx.Queue()
+    for job_num, job in enumerate(jobs):
+        job_queue.put((job_num, job))
+    for _ in range(workers):
+        job_queue.put(None)  # one stop signal per worker
+
+    processes = [ctx.Process(target=_worker_main, name=f"seleniumWorker-{worker_num}",
+                             args=(worker_num, servicename, username, profile_root, launch_profile, job_queue,
+                                   result_queue))
+                 for worker_num in range(1, workers + 1)]
+    for process in processes:
+        process.start()
+
+    # Gather the results, stop waiting if every worker has exited (ex: crashed) and no results are left
+    results = []
+    while len(results) < len(jobs):
+        try:
+            results.append(result_queue.get(timeout=RESULT_POLL_SEC))
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                logger.error("All workers exited before every job reported a result.")
+                break
+
+    for process in processes:
+        process.join()
+
+    # Jobs that never reported a result count as failed
+    reported = {result['job'] for result in results}
+    for job_num, job in enumerate(jobs):
+        if job_num not in reported:
+            results.append({'job': job_num, 'worker': None, 'scenario': job['scenario'],
+                            'run_id': job['kwargs']['run_id'], 'success': False, 'result': None, 'seconds': 0,
+                            'error': "No result reported (worker exited)"})
+
+    results.sort(key=lambda result: result['job'])
+    summary = {'jobs': len(jobs), 'passed': sum(result['success'] for result in results),
+               'failed': sum(not result['success'] for result in results), 'seconds': time.monotonic() - start,
+               'results': results}
+
+    logger.info(f"Scenario jobs complete: {summary['passed']} passed, {summary['failed']} failed, "
+                f"{summary['seconds']:.1f} second(s)")
+
+    return summary
+
+
+def _worker_main(worker_num: int, servicename: str, username: str, profile_root: str, launch_profile: str, job_queue,
+                 result_queue):
+    """
+    Worker process: connects with its own clone of the logged in Chrome profile, then runs jobs from the job queue
+    until it gets the stop signal (None), putting each job's result on the result queue.  If the login fails, the
+    worker still takes jobs off the queue and reports them as failed, so nothing is left waiting.
+    """
+
+    start_logging(filename=f"seleniumTestGoogleDriveUpload_worker-{worker_num}.log")
+    logger.info(f"----START: Worker {worker_num}----")
+
+    driver = None
+    login_error = ""
+    try:
+        driver = connect_googledrive_profile(servicename=servicename, username=username,
+                                             clone_dir=os.path.join(profile_root, f"worker-{worker_num}"),
+                                             launch_profile=launch_profile)
+    except Exception as e:
+        login_error = f"Worker {worker_num} could not connect to google drive: {e}"
+        logger.error(login_error)
+
+    try:
+        while True:
+            item = job_queue.get()
+            if item is None:  # stop signal
+                break
+
+            job_num, job = item
+            result = {'job': job_num, 'worker': worker_num, 'scenario': job['scenario'],
+                      'run_id': job['kwargs']['run_id'], 'success': False, 'result': None, 'seconds': 0,
+                      'error': login_error}
+            if driver is not None:
+                logger.info(f"Worker {worker_num}: running job {job_num}, scenario '{job['scenario']}'")
+                job_start = time.monotonic()
+                try:
+                    result['result'] = SCENARIOS[job['scenario']](driver=driver, **job['kwargs'])
+                    result['success'] = bool(result['result'])
+                except Exception as e:
+                    logger.error(f"Worker {worker_num}: job {job_num} failed. Error: {e}")
+                    result['error'] = str(e)
+                result['seconds'] = time.monotonic() - job_start
+
+            result_queue.put(result)
+    finally:
+        if driver is not None:
+            driver.quit()  # also stops this worker's ChromeDriver service
+        logger.info(f"----END: Worker {worker_num}----")
+
+
+if __name__ == "__main__":
+    from Selenium_googleDriveTestUpload_CleanUpTest import cleanup_test  # only used here, not by the workers
+
+    # Global variables
+    servicename = "---REPLACE-VALUE---"
+    username = "---REPLACE-VALUE---"
+    fld_test = "Testing Folder (Selenium)"
+
+    start_logging(filename="seleniumTestGoogleDriveUpload_workerPool.log")
+    summary_run = run_scenarios_parallel(servicename=servicename, username=username,
+                                         jobs=[{'scenario': "upload", 'kwargs': {'fldname': fld_test}}] * 4)
+    print(f"{summary_run['passed']} of {summary_run['jobs']} scenario job(s) passed")
+
+    # Clean up what each job created, by its run ID
+    for job_result in summary_run['results']:
+        cleanup_test(servicename=servicename, username=username, run_id=job_result['run_id'])
@@ -11,13 +11,61 @@ VERSION INFO:
 """
 
 import unittest
+import unitTests.test_Selenium_googleDriveTestUpload_APIProfiler as test_Selenium_googleDriveTest_APIProfiler
+import unitTests.test_Selenium_googleDriveTestUpload_BenchmarkImports as test_Selenium_googleDriveTest_BenchmarkImports
+import unitTests.test_Selenium_googleDriveTestUpload_BrowserDaemon as test_Selenium_googleDriveTest_BrowserDaemon
+import unitTests.test_Selenium_googleDriveTestUpload_CleanUpTest as test_Selenium_googleDriveTest_CleanUpTest
+import unitTests.test_Selenium_googleDriveTestUpload_CommandProfiler as test_Selenium_googleDriveTest_CommandProfiler
+import unitTests.test_Selenium_googleDriveTestUpload_DriveAPI as test_Selenium_googleDriveTest_DriveAPI
+import unitTests.test_Selenium_googleDriveTestUpload_DriveAsync as test_Selenium_googleDriveTest_DriveAsync
+import unitTests.test_Selenium_googleDriveTestUpload_DriveIndex as test_Selenium_googleDriveTest_DriveIndex
+import unitTests.test_Selenium_googleDriveTestUpload_DriverCache as test_Selenium_googleDriveTest_DriverCache
 import unitTests.test_Selenium_googleDriveTestUpload_Files as test_Selenium_googleDriveTest_Files
 import unitTests.test_Selenium_googleDriveTestUpload_Folders as test_Selenium_googleDriveTest_Folders
+import unitTests.test_Selenium_googleDriveTestUpload_Metrics as test_Selenium_googleDriveTest_Metrics
+import unitTests.test_Selenium_googleDriveTestUpload_MockDrive as test_Selenium_googleDriveTest_MockDrive
+import unitTests.test_Selenium_googleDriveTestUpload_MockDriveUI as test_Selenium_googleDriveTest_MockDriveUI
+import unitTests.test_Selenium_googleDriveTestUpload_Profiles as test_Selenium_googleDriveTest_Profiles
+import unitTests.test_Selenium_googleDriveTestUpload_RequestBlocking as test_Selenium_googleDriveTest_RequestBlocking
+import unitTests.test_Selenium_googleDriveTestUpload_Waits as test_Selenium_googleDriveTest_Waits
+import unitTests.test_Selenium_googleDriveTestUpload_WorkerPool as test_Selenium_googleDriveTest_WorkerPool
 
 # Load tests
+suite_apiprofiler = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_APIProfiler)
+suite_benchmarkimports = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_BenchmarkImports)
+suite_browserdaemon = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_BrowserDaemon)
+suite_cleanup = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_CleanUpTest)
+suite_commandprofiler = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_CommandProfiler)
+suite_driveapi = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_DriveAPI)
+suite_driveasync = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_DriveAsync)
+suite_driveindex = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_DriveIndex)
+suite_drivercache = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_DriverCache)
 suite_files = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_Files)
 suite_folders = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_Folders)
+suite_metrics = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_Metrics)
+suite_mockdrive = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_MockDrive)
+suite_mockdriveui = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_MockDriveUI)
+suite_profiles = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_Profiles)
+suite_requestblocking = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_RequestBlocking)
+suite_waits = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_Waits)
+suite_workerpool = unittest.TestLoader().loadTestsFromModule(test_Selenium_googleDriveTest_WorkerPool)
 
 # Execute tests
+unittest.TextTestRunner(verbosity=2).run(suite_apiprofiler)
+unittest.TextTestRunner(verbosity=2).run(suite_benchmarkimports)
+unittest.TextTestRunner(verbosity=2).run(suite_browserdaemon)
+unittest.TextTestRunner(verbosity=2).run(suite_cleanup)
+unittest.TextTestRunner(verbosity=2).run(suite_commandprofiler)
+unittest.TextTestRunner(verbosity=2).run(suite_driveapi)
+unittest.TextTestRunner(verbosity=2).run(suite_driveasync)
+unittest.TextTestRunner(verbosity=2).run(suite_driveindex)
+unittest.TextTestRunner(verbosity=2).run(suite_drivercache)
 unittest.TextTestRunner(verbosity=2).run(suite_files)
 unittest.TextTestRunner(verbosity=2).run(suite_folders)
+unittest.TextTestRunner(verbosity=2).run(suite_metrics)
+unittest.TextTestRunner(verbosity=2).run(suite_mockdrive)
+unittest.TextTestRunner(verbosity=2).run(suite_mockdriveui)
+unittest.TextTestRunner(verbosity=2).run(suite_profiles)
+unittest.TextTestRunner(verbosity=2).run(suite_requestblocking)
+unittest.TextTestRunner(verbosity=2).run(suite_waits)
+unittest.TextTestRunner(verbosity=2).run(suite_workerpool)
@@ -0,0 +1,88 @@
+"""
+Summary: Will test functions in Selenium_googleDriveTestUpload_APIProfiler module that have expected python results
+    (not Selenium or Google API), feeding the transport hooks made up request records
+"""
+import Selenium_googleDriveTestUpload_APIProfiler as APIProfiler
+import Selenium_googleDriveTestUpload_DriveAPI as DriveAPI
+from Selenium_googleDriveTestUpload_DriveAsync import delete_googledrive_items_async
+from Selenium_googleDriveTestUpload_Metrics import span
+from Selenium_googleDriveTestUpload_MockDrive import mock_drive_add_item, start_mock_drive, stop_mock_drive
+import asyncio
+import unittest
+
+DRIVE_URL = "https://www.googleapis.com/drive/v3"
+
+
+def request_record(method: str, uri: str, status: int = 200, request_body=None, response_body: bytes = b"{}"):
+    return {'method': method, 'uri': uri, 'status': status, 'seconds': 0.1, 'bytes_sent': len(request_body or b""),
+            'bytes_received': len(response_body), 'request_body': request_body, 'response_body': response_body,
+            'started': 0}
+
+
+class TestClass(unittest.TestCase):
+
+    def setUp(self):
+        APIProfiler.reset_api_records()
+        APIProfiler.start_api_profiler()
+
+    def tearDown(self):
+        APIProfiler.stop_api_profiler()
+        APIProfiler.reset_api_records()
+
+    def call_hooks(self, record: dict):
+        for hook in DriveAPI._transport_hooks:
+            hook(record)
+
+    def test_api_method(self):
+        """Tests api_method names the Drive API method from the HTTP method and URL"""
+        self.assertEqual(APIProfiler.api_method("GET", f"{DRIVE_URL}/files?q=name+%3D+%27x%27"), "files.list")
+        self.assertEqual(APIProfiler.api_method("GET", f"{DRIVE_URL}/files/abc123?fields=id"), "files.get")
+        self.assertEqual(APIProfiler.api_method("DELETE", f"{DRIVE_URL}/files/abc123"), "files.delete")
+        self.assertEqual(APIProfiler.api_method("POST", "https://www.googleapis.com/batch/drive/v3"), "batch")
+        self.assertEqual(APIProfiler.api_method("PUT", f"{DRIVE_URL}/other"), "PUT /drive/v3/other")
+
+    def test_quota_and_steps(self):
+        """Tests the profiler counts 1 quota unit per call and per batch part, throttling and the step of each call,
+        and is only hooked in once"""
+        APIProfiler.start_api_profiler()
+        with span("validate folder"):
+            self.call_hooks(request_record("GET", f"{DRIVE_URL}/files?q=name+%3D+%27x%27"))
+        with span("delete items"):
+            batch = b"--b\r\nContent-Type: application/http\r\n\r\nDELETE /drive/v3/files/1\r\n" * 3
+            self.call_hooks(request_record("POST", "https://www.googleapis.com/batch/drive/v3", request_body=batch,
+                                           response_body=b"HTTP/1.1 204\r\n\r\nHTTP/1.1 429\r\n\r\nHTTP/1.1 204\r\n"))
+        self.call_hooks(request_record("GET", f"{DRIVE_URL}/files/1", status=403,
+                                       response_body=b'{"error": {"errors": [{"reason": "userRateLimitExceeded"}]}}'))
+
+        records = APIProfiler.get_api_records()
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0]['q'], "name = 'x'")
+        summary = APIProfiler.summarize_api_calls()
+        self.assertEqual(summary['run']['calls'], 3)
+        self.assertEqual(summary['run']['quota_units'], 5)
+        self.assertEqual(summary['run']['throttled'], 2)
+        self.assertEqual(summary['run']['errors'], 1)
+        self.assertEqual(list(summary['steps']), ["delete items", "validate folder", APIProfiler.API_NO_STEP])
+        self.assertEqual(summary['steps']['delete items']['quota_units'], 3)
+
+    def test_steps_async(self):
+        """Tests the API calls made by the async deletes (on the DriveAsync thread pool) are attributed to the step open
+        in the caller, against the mock Drive API"""
+        server = start_mock_drive()
+        DriveAPI.set_drive_api_endpoint(server.url)
+        try:
+            items = [mock_drive_add_item(server, name=f"testFile-{num}.txt") for num in range(3)]
+            with span("delete items"):
+                results = asyncio.run(delete_googledrive_items_async(items=items))
+            self.assertTrue(all(results.values()))
+        finally:
+            DriveAPI.set_drive_api_endpoint("")
+            stop_mock_drive(server)
+
+        summary = APIProfiler.summarize_api_calls()
+        self.assertEqual(list(summary['steps']), ["delete items"])
+        self.assertEqual(summary['steps']['delete items']['calls'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
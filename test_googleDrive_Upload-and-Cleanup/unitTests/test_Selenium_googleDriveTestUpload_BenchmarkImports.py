@@ -0,0 +1,28 @@
+"""
+Summary: Will test that the modules import quickly and without loading any heavy dependencies (selenium, google
+    libraries, pyautogui...), using Selenium_googleDriveTestUpload_BenchmarkImports
+"""
+from Selenium_googleDriveTestUpload_BenchmarkImports import benchmark_imports, IMPORT_BUDGET_MS
+import unittest
+
+
+class TestClass(unittest.TestCase):
+
+    def test_benchmark_imports_no_heavy_dependencies(self):
+        """Tests that importing the modules doesn't load any heavy dependency, and doesn't fail without them"""
+        for module, stats in benchmark_imports().items():
+            with self.subTest(module=module):
+                self.assertIsNotNone(stats['ms'], msg=f"Import failed: {stats.get('error')}")
+                self.assertEqual(stats['heavy'], [])
+
+    def test_benchmark_imports_budget(self):
+        """Tests that the modules used by the unit tests import within the budget"""
+        results = benchmark_imports(modules=["Selenium_googleDriveTestUpload_Files",
+                                             "Selenium_googleDriveTestUpload_ExecuteTest"])
+        for module, stats in results.items():
+            with self.subTest(module=module):
+                self.assertLessEqual(stats['ms'], IMPORT_BUDGET_MS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Summary: Will test functions in Selenium_googleDriveTestUpload_BrowserDaemon module that have expected python results
+    (not Selenium or Google API): the daemon requests and the lease/release/reclaim of the sessions, with stand-in
+    drivers in the session pool (no browser is launched)
+"""
+import Selenium_googleDriveTestUpload_BrowserDaemon as BrowserDaemon
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+
+class FakeDriver:
+    """Stand-in for a Chrome webdriver, with only what the daemon reads from it"""
+
+    def __init__(self, num: int, responding: bool = True):
+        self.service = SimpleNamespace(service_url=f"http://127.0.0.1:{9500 + num}")
+        self.session_id = f"session{num}"
+        self.capabilities = {'browserName': "chrome"}
+        self.responding = responding
+        self.quit_called = False
+
+    @property
+    def current_url(self):
+        if not self.responding:
+            raise ConnectionRefusedError("browser is gone")
+        return "https://drive.google.com/drive/home"
+
+    def quit(self):
+        self.quit_called = True
+
+
+class TestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.resets = []
+        with BrowserDaemon._sessions_cond:
+            BrowserDaemon._sessions[:] = [{'num': num, 'driver': FakeDriver(num), 'lease_id': None, 'leased_at': 0,
+                                           'broken': False, 'resets': 0, 'relaunches': 0} for num in (1, 2)]
+
+    def tearDown(self):
+        with BrowserDaemon._sessions_cond:
+            BrowserDaemon._sessions.clear()
+
+    def fake_reset(self, session: dict):
+        """Records the reset, and whether another thread could take the pool lock while it ran"""
+        acquired = []
+
+        def try_lock():
+            acquired.append(BrowserDaemon._sessions_cond.acquire(timeout=1))
+            if acquired[0]:
+                BrowserDaemon._sessions_cond.release()
+
+        thread = threading.Thread(target=try_lock)
+        thread.start()
+        thread.join()
+        self.resets.append({'num': session['num'], 'lock_free': acquired[0]})
+
+    def test_handle_request_lease(self):
+        """Tests a lease request hands out each free session once, then times out when none is free"""
+        responses = [BrowserDaemon._handle_request({'command': "lease", 'timeout': 0.1})[0] for _ in range(3)]
+
+        self.assertTrue(responses[0]['ok'])
+        self.assertTrue(responses[1]['ok'])
+        self.assertEqual({responses[0]['session_id'], responses[1]['session_id']}, {"session1", "session2"})
+        self.assertNotEqual(responses[0]['lease_id'], responses[1]['lease_id'])
+        self.assertEqual(responses[0]['executor_url'], "http://127.0.0.1:9501")
+        self.assertEqual(responses[0]['capabilities'], {'browserName': "chrome"})
+        self.assertFalse(responses[2]['ok'])
+
+    def test_handle_request_release(self):
+        """Tests a release request frees the session only after its response is sent (the returned function)"""
+        lease = BrowserDaemon._handle_request({'command': "lease", 'timeout': 0.1})[0]
+
+        with mock.patch.object(BrowserDaemon, "_reset_session", side_effect=self.fake_reset):
+            response, after = BrowserDaemon._handle_request({'command': "release", 'lease_id': lease['lease_id']})
+            self.assertEqual(response, {'ok': True})
+            self.assertIsNotNone(BrowserDaemon._sessions[0]['lease_id'])
+            after()
+
+        self.assertEqual(self.resets, [{'num': 1, 'lock_free': True}])
+        self.assertIsNone(BrowserDaemon._sessions[0]['lease_id'])
+        self.assertEqual(BrowserDaemon._sessions[0]['leased_at'], 0)
+
+        response, after = BrowserDaemon._handle_request({'command': "release", 'lease_id': lease['lease_id']})
+        self.assertFalse(response['ok'])
+        self.assertIsNone(after)
+
+    def test_handle_request_status_and_unknown(self):
+        """Tests the status request reports the leased sessions, and an unknown command is refused"""
+        BrowserDaemon._handle_request({'command': "lease", 'timeout': 0.1})
+
+        response, after = BrowserDaemon._handle_request({'command': "status"})
+        self.assertEqual(response, {'ok': True, 'sessions': [
+            {'num': 1, 'leased': True, 'resets': 0, 'relaunches': 0},
+            {'num': 2, 'leased': False, 'resets': 0, 'relaunches': 0}]})
+        self.assertIsNone(after)
+
+        response, after = BrowserDaemon._handle_request({'command': "restart"})
+        self.assertEqual(response, {'ok': False, 'error': "Unknown command 'restart'"})
+        self.assertIsNone(after)
+
+    def test_lease_session_waits_for_release(self):
+        """Tests _lease_session waits for a released session when all the sessions are leased"""
+        first = BrowserDaemon._lease_session(timeout=0.1)
+        BrowserDaemon._lease_session(timeout=0.1)
+
+        with mock.patch.object(BrowserDaemon, "_reset_session", side_effect=self.fake_reset):
+            timer = threading.Timer(0.1, BrowserDaemon._release_session, args=[first])
+            timer.start()
+            session = BrowserDaemon._lease_session(timeout=5)
+            timer.join()
+
+        self.assertIs(session, first)
+        self.assertIsNotNone(session['lease_id'])
+
+    def test_lease_session_reclaim(self):
+        """Tests an abandoned lease is reclaimed with a new lease ID, and reset outside of the pool lock"""
+        old_ids = [BrowserDaemon._lease_session(timeout=0.1)['lease_id'] for _ in range(2)]
+        BrowserDaemon._sessions[1]['leased_at'] = time.monotonic() - BrowserDaemon.LEASE_MAX_SEC - 1
+
+        with mock.patch.object(BrowserDaemon, "_reset_session", side_effect=self.fake_reset):
+            session = BrowserDaemon._lease_session(timeout=1)
+
+        self.assertEqual(session['num'], 2)
+        self.assertNotIn(session['lease_id'], old_ids)
+        self.assertEqual(self.resets, [{'num': 2, 'lock_free': True}])
+
+        response, _ = BrowserDaemon._handle_request({'command': "release", 'lease_id': old_ids[1]})
+        self.assertFalse(response['ok'])
+
+    def test_lease_session_relaunch(self):
+        """Tests a session that doesn't respond is relaunched before being handed out"""
+        BrowserDaemon._sessions[0]['driver'] = broken = FakeDriver(1, responding=False)
+
+        with mock.patch.object(BrowserDaemon, "_launch_session", side_effect=lambda num: FakeDriver(num)):
+            session = BrowserDaemon._lease_session(timeout=0.1)
+
+        self.assertTrue(broken.quit_called)
+        self.assertIsNot(session['driver'], broken)
+        self.assertEqual(session['relaunches'], 1)
+
+    def test_release_session_relaunch_fails(self):
+        """Tests a session whose relaunch fails on release is still freed (marked broken), and relaunched on the next
+        lease"""
+        session = BrowserDaemon._lease_session(timeout=0.1)
+        BrowserDaemon._lease_session(timeout=0.1)
+        session['driver'].responding = False
+        waiter = {}
+
+        def lease_when_free():
+            try:
+                waiter['session'] = BrowserDaemon._lease_session(timeout=5)
+            except RuntimeError as e:
+                waiter['error'] = e
+
+        with mock.patch.object(BrowserDaemon, "_reset_session", side_effect=BrowserDaemon._relaunch_session), \
+                mock.patch.object(BrowserDaemon, "_launch_session", side_effect=RuntimeError("chrome did not start")):
+            thread = threading.Thread(target=lease_when_free)
+            thread.start()
+            BrowserDaemon._release_session(session)
+            thread.join()
+
+        self.assertIsNone(session['lease_id'])
+        self.assertTrue(session['broken'])
+        self.assertIn('error', waiter)  # the waiter got the session, its relaunch failed too
+
+        with mock.patch.object(BrowserDaemon, "_launch_session", side_effect=lambda num: FakeDriver(num)):
+            leased = BrowserDaemon._lease_session(timeout=0.1)
+
+        self.assertIs(leased, session)
+        self.assertFalse(session['broken'])
+        self.assertTrue(session['driver'].responding)
+        self.assertEqual(session['relaunches'], 1)
+
+    def test_lease_session_reclaim_relaunch_fails(self):
+        """Tests a reclaimed session whose relaunch fails has its lease cleared (marked broken) before the error is
+        raised"""
+        for _ in range(2):
+            BrowserDaemon._lease_session(timeout=0.1)
+        session = BrowserDaemon._sessions[1]
+        session['leased_at'] = time.monotonic() - BrowserDaemon.LEASE_MAX_SEC - 1
+
+        with mock.patch.object(BrowserDaemon, "_reset_session", side_effect=BrowserDaemon._relaunch_session), \
+                mock.patch.object(BrowserDaemon, "_launch_session", side_effect=RuntimeError("chrome did not start")):
+            with self.assertRaises(RuntimeError):
+                BrowserDaemon._lease_session(timeout=1)
+
+        self.assertIsNone(session['lease_id'])
+        self.assertTrue(session['broken'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Summary: Will test functions in Selenium_googleDriveTestUpload_CleanUpTest module that have expected python results (not
+    Selenium or Google API), the clean up itself runs against the local mock Drive API
+"""
+from Selenium_googleDriveTestUpload_CleanUpTest import cleanup_test, plan_cleanup
+from Selenium_googleDriveTestUpload_DriveAPI import set_drive_api_endpoint
+from Selenium_googleDriveTestUpload_MockDrive import (mock_drive_add_item, mock_drive_items, start_mock_drive,
+                                                      stop_mock_drive)
+import os
+import tempfile
+import unittest
+
+MIMETYPE_FOLDER = "application/vnd.google-apps.folder"
+
+
+class TestClass(unittest.TestCase):
+
+    def test_plan_cleanup_empty(self):
+        """Tests plan_cleanup with no items, expects nothing to delete"""
+        plan = plan_cleanup(items=[])
+        self.assertEqual(plan, {'delete': [], 'skip': {}})
+
+    def test_plan_cleanup_file_in_folder(self):
+        """Tests plan_cleanup for a test file inside a test folder, only the folder should be deleted"""
+        items = [{'id': 'fld1', 'mimeType': MIMETYPE_FOLDER, 'parents': ['root']},
+                 {'id': 'file1', 'mimeType': 'text/plain', 'parents': ['fld1']}]
+        plan = plan_cleanup(items=items)
+        self.assertEqual([item['id'] for item in plan['delete']], ['fld1'])
+        self.assertEqual(plan['skip'], {'file1': 'fld1'})
+
+    def test_plan_cleanup_nested_folders(self):
+        """Tests plan_cleanup for test folders nested inside each other, only the top-most folder should be deleted
+        and the skipped items should point to it"""
+        items = [{'id': 'file1', 'mimeType': 'text/plain', 'parents': ['fld2']},
+                 {'id': 'fld2', 'mimeType': MIMETYPE_FOLDER, 'parents': ['fld1']},
+                 {'id': 'fld1', 'mimeType': MIMETYPE_FOLDER, 'parents': ['root']}]
+        plan = plan_cleanup(items=items)
+        self.assertEqual([item['id'] for item in plan['delete']], ['fld1'])
+        self.assertEqual(plan['skip'], {'file1': 'fld1', 'fld2': 'fld1'})
+
+    def test_plan_cleanup_stray_file(self):
+        """Tests plan_cleanup for a test file that is not inside any of the test folders, it should also be deleted"""
+        items = [{'id': 'fld1', 'mimeType': MIMETYPE_FOLDER, 'parents': ['root']},
+                 {'id': 'file1', 'mimeType': 'text/plain', 'parents': ['otherFolder']},
+                 {'id': 'file2', 'mimeType': 'text/plain'}]  # no parents (ex: shared with the account)
+        plan = plan_cleanup(items=items)
+        self.assertEqual([item['id'] for item in plan['delete']], ['fld1', 'file1', 'file2'])
+        self.assertEqual(plan['skip'], {})
+
+    def test_plan_cleanup_parent_cycle(self):
+        """Tests plan_cleanup does not loop forever if the parents fields contain a cycle"""
+        items = [{'id': 'fld1', 'mimeType': MIMETYPE_FOLDER, 'parents': ['fld2']},
+                 {'id': 'fld2', 'mimeType': MIMETYPE_FOLDER, 'parents': ['fld1']}]
+        plan = plan_cleanup(items=items)
+        self.assertEqual(len(plan['delete']) + len(plan['skip']), 2)
+
+    def test_cleanup_test_folder_name_prefix(self):
+        """Tests cleanup_test by name deletes every folder whose name starts with fldname (ex: with a run ID at the end)
+        and the stray test files, but not a folder that only contains fldname"""
+        server = start_mock_drive()
+        set_drive_api_endpoint(server.url)
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.chdir(tmpdir)  # the clean up writes its log and reports to the current folder
+            try:
+                for run_id in ["3f9c2a7e51b0", "8d1e4b6c2a90"]:
+                    fld = mock_drive_add_item(server, name=f"Testing Folder (Selenium) - {run_id}",
+                                              mime_type=MIMETYPE_FOLDER)
+                    mock_drive_add_item(server, name="testFile.txt", parents=[fld['id']])
+                mock_drive_add_item(server, name="testFile.txt")
+                other = mock_drive_add_item(server, name="Old Testing Folder (Selenium)", mime_type=MIMETYPE_FOLDER)
+
+                plan = cleanup_test(servicename="", username="", fldname="Testing Folder (Selenium)",
+                                    filename="testFile.txt")
+                self.assertEqual(len(plan['delete']), 3)
+                self.assertTrue(all(plan['results'].values()))
+                self.assertEqual(list(mock_drive_items(server)), [other['id']])
+            finally:
+                os.chdir(cwd)
+                set_drive_api_endpoint("")
+                stop_mock_drive(server)
+
+    def test_cleanup_test_no_name_or_run_id(self):
+        """Tests cleanup_test refuses to run without a run ID or a folder name, which would match every folder"""
+        with self.assertRaises(ValueError):
+            cleanup_test(servicename="", username="", dry_run=True)
+        with self.assertRaises(ValueError):
+            cleanup_test(servicename="", username="", filename="testFile.txt", dry_run=True)
+
+    def test_cleanup_test_folder_name_only(self):
+        """Tests cleanup_test with a folder name and no file name plans only the test folders, not the other items"""
+        server = start_mock_drive()
+        set_drive_api_endpoint(server.url)
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.chdir(tmpdir)  # the clean up writes its log and reports to the current folder
+            try:
+                fld = mock_drive_add_item(server, name="Testing Folder (Selenium) - 3f9c2a7e51b0",
+                                          mime_type=MIMETYPE_FOLDER)
+                mock_drive_add_item(server, name="Important Work", mime_type=MIMETYPE_FOLDER)
+                mock_drive_add_item(server, name="notes.txt")
+
+                plan = cleanup_test(servicename="", username="", fldname="Testing Folder (Selenium)", dry_run=True)
+                self.assertEqual([item['id'] for item in plan['delete']], [fld['id']])
+                self.assertEqual(len(mock_drive_items(server)), 3)
+            finally:
+                os.chdir(cwd)
+                set_drive_api_endpoint("")
+                stop_mock_drive(server)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Summary: Will test functions in Selenium_googleDriveTestUpload_CommandProfiler module that have expected python results
+    (not Selenium), using a stand-in for the driver's command executor
+"""
+import Selenium_googleDriveTestUpload_CommandProfiler as CommandProfiler
+from Selenium_googleDriveTestUpload_Metrics import span
+from types import SimpleNamespace
+import unittest
+
+
+class FakeExecutor:
+    """Stand-in for selenium's RemoteConnection, fails the 'fail' command"""
+
+    def execute(self, command, params):
+        if command == "fail":
+            raise RuntimeError("command failed")
+        return {'value': None}
+
+
+class TestClass(unittest.TestCase):
+
+    def setUp(self):
+        CommandProfiler.reset_command_records()
+
+    def tearDown(self):
+        CommandProfiler.reset_command_records()
+
+    def test_command_histogram(self):
+        """Tests command_histogram puts each latency in the first bucket it fits in"""
+        histogram = CommandProfiler.command_histogram([0.001, 0.005, 0.006, 0.3, 5])
+        self.assertEqual(histogram['<=5ms'], 2)
+        self.assertEqual(histogram['<=10ms'], 1)
+        self.assertEqual(histogram['<=500ms'], 1)
+        self.assertEqual(histogram['>2500ms'], 1)
+        self.assertEqual(sum(histogram.values()), 5)
+
+    def test_profile_driver_commands(self):
+        """Tests profile_driver_commands records each command with its step, including failed commands, and only wraps
+        the executor once"""
+        driver = SimpleNamespace(command_executor=FakeExecutor())
+        CommandProfiler.profile_driver_commands(driver)
+        CommandProfiler.profile_driver_commands(driver)
+
+        driver.command_executor.execute("get", {})
+        with span("create folder"):
+            driver.command_executor.execute("findElement", {})
+            driver.command_executor.execute("findElement", {})
+            with self.assertRaises(RuntimeError):
+                driver.command_executor.execute("fail", {})
+
+        records = CommandProfiler.get_command_records()
+        self.assertEqual([record['step'] for record in records],
+                         [CommandProfiler.COMMAND_NO_STEP] + ["create folder"] * 3)
+        summary = CommandProfiler.summarize_commands()
+        self.assertEqual(list(summary), ["create folder", CommandProfiler.COMMAND_NO_STEP])
+        self.assertEqual(summary['create folder']['commands'], {'findElement': 2, 'fail': 1})
+        self.assertEqual(summary['create folder']['failures'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
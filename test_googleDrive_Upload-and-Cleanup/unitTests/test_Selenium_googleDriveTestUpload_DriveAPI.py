@@ -0,0 +1,189 @@
+"""
+Summary: Will test functions in Selenium_googleDriveTestUpload_DriveAPI module that have expected python results (not
+    Selenium or Google API), the API calls against the local mock Drive API (localhost only)
+"""
+from Selenium_googleDriveTestUpload_DriveAPI import (add_transport_hook, BATCH_LIMIT, build_name_queries,
+                                                     delete_googledrive_item, delete_googledrive_items_batch,
+                                                     escape_query_value, get_service_googledrive,
+                                                     list_googledrive_items, remove_transport_hook,
+                                                     set_drive_api_endpoint)
+from Selenium_googleDriveTestUpload_MockDrive import (mock_drive_add_item, mock_drive_configure, mock_drive_items,
+                                                      start_mock_drive, stop_mock_drive)
+from Selenium_googleDriveTestUpload_Files import delete_file_googledrive_by_id
+from Selenium_googleDriveTestUpload_Folders import delete_folder_googledrive_by_id
+import threading
+import unittest
+
+
+class TestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.server = start_mock_drive()
+        set_drive_api_endpoint(self.server.url)
+        self.records = []
+        add_transport_hook(self.records.append)
+
+    def tearDown(self):
+        remove_transport_hook(self.records.append)
+        set_drive_api_endpoint("")
+        stop_mock_drive(self.server)
+
+    def calls(self, path: str):
+        """Number of HTTP requests made to a path of the API (ex: "/drive/v3/files")"""
+        return len([record for record in self.records if record['uri'].split("?")[0].endswith(path)])
+
+    def test_escape_query_value_quote(self):
+        """Tests escape_query_value against a name with a single quote"""
+        self.assertEqual(escape_query_value("Ryan's file.txt"), "Ryan\\'s file.txt")
+
+    def test_escape_query_value_backslash(self):
+        """Tests escape_query_value against a name with a backslash, which must be escaped before the quotes"""
+        self.assertEqual(escape_query_value("a\\'b"), "a\\\\\\'b")
+
+    def test_build_name_queries_single_query(self):
+        """Tests build_name_queries for a few names, expects them all OR-combined into one query"""
+        queries = build_name_queries(names=["a.txt", "b.txt"], query_base="trashed=false")
+        self.assertEqual(queries, ["(name = 'a.txt' or name = 'b.txt') and trashed=false"])
+
+    def test_build_name_queries_duplicates(self):
+        """Tests build_name_queries removes duplicate names"""
+        queries = build_name_queries(names=["a.txt", "a.txt"])
+        self.assertEqual(queries, ["(name = 'a.txt')"])
+
+    def test_build_name_queries_chunked(self):
+        """Tests build_name_queries splits the names into several queries to stay under the maximum length, and that
+        every name is in exactly one query"""
+        names = [f"TestFile_googleDriveTestUpload-{i}.txt" for i in range(100)]
+        queries = build_name_queries(names=names, query_base="trashed=false", max_length=500)
+        self.assertGreater(len(queries), 1)
+        for query in queries:
+            self.assertLessEqual(len(query), 500)
+        for name in names:
+            self.assertEqual(sum(f"name = '{name}'" in query for query in queries), 1)
+
+    def test_build_name_queries_empty(self):
+        """Tests build_name_queries with no names, expects no queries"""
+        self.assertEqual(build_name_queries(names=[]), [])
+
+    def test_list_googledrive_items_pagination(self):
+        """Tests list_googledrive_items follows nextPageToken until every item has been read, one files.list call per
+        page"""
+        created = {mock_drive_add_item(self.server, name=f"testFile-{i}.txt")['id'] for i in range(250)}
+        mock_drive_add_item(self.server, name="other.txt")
+
+        items = list(list_googledrive_items(query="name contains 'testFile-'", fields="id, name", page_size=100))
+
+        self.assertEqual({item['id'] for item in items}, created)
+        self.assertEqual(len(items), 250)
+        self.assertEqual(self.calls("/drive/v3/files"), 3)
+
+    def test_list_googledrive_items_lazy(self):
+        """Tests list_googledrive_items only requests the next page once the current one has been used up"""
+        for i in range(250):
+            mock_drive_add_item(self.server, name=f"testFile-{i}.txt")
+
+        items = list_googledrive_items(query="trashed=false", page_size=100)
+        self.assertEqual(self.calls("/drive/v3/files"), 0)
+        next(items)
+        self.assertEqual(self.calls("/drive/v3/files"), 1)
+        for _ in range(100):
+            next(items)
+        self.assertEqual(self.calls("/drive/v3/files"), 2)
+        items.close()
+
+    def test_delete_googledrive_items_batch_over_limit(self):
+        """Tests delete_googledrive_items_batch splits more deletes than the batch limit into several batch requests,
+        and deletes every item"""
+        item_ids = [mock_drive_add_item(self.server, name=f"testFile-{i}.txt")['id'] for i in range(BATCH_LIMIT + 50)]
+        kept = mock_drive_add_item(self.server, name="other.txt")
+
+        results = delete_googledrive_items_batch(item_ids=item_ids + item_ids[:5])  # duplicates are only sent once
+
+        self.assertEqual(results, dict.fromkeys(item_ids, True))
+        self.assertEqual(self.calls("/batch/drive/v3"), 2)
+        self.assertEqual(list(mock_drive_items(self.server)), [kept['id']])
+
+    def test_delete_googledrive_items_batch_already_deleted(self):
+        """Tests delete_googledrive_items_batch counts an item that is already gone (404) as deleted, and a failed
+        delete (injected server error) as not deleted"""
+        item = mock_drive_add_item(self.server, name="testFile-1.txt")
+        self.assertEqual(delete_googledrive_items_batch(item_ids=[item['id'], "missingID"]),
+                         {item['id']: True, "missingID": True})
+
+        item = mock_drive_add_item(self.server, name="testFile-2.txt")
+        mock_drive_configure(self.server, error_rate=1)
+        self.assertEqual(delete_googledrive_items_batch(item_ids=[item['id']]), {item['id']: False})
+        self.assertIn(item['id'], mock_drive_items(self.server))
+
+    def test_delete_googledrive_item_already_deleted(self):
+        """Tests delete_googledrive_item, and the file/folder delete helpers that call it, count an item that is already
+        gone (404) as deleted, the same as delete_googledrive_items_batch"""
+        item = mock_drive_add_item(self.server, name="testFile-1.txt")
+        self.assertTrue(delete_googledrive_item(item_id=item['id']))
+        self.assertNotIn(item['id'], mock_drive_items(self.server))
+
+        self.assertTrue(delete_googledrive_item(item_id="missingID"))
+        self.assertTrue(delete_file_googledrive_by_id(file_id="missingID"))
+        self.assertTrue(delete_folder_googledrive_by_id(fld_id="missingID"))
+
+        item = mock_drive_add_item(self.server, name="testFile-2.txt")
+        mock_drive_configure(self.server, error_rate=1)
+        self.assertFalse(delete_file_googledrive_by_id(file_id=item['id']))
+
+    def test_transport_record(self):
+        """Tests the pooled transport sends the calls to the set endpoint and gives each hook a record of the request"""
+        mock_drive_add_item(self.server, name="testFile-1.txt")
+
+        self.assertEqual(len(list(list_googledrive_items(query="trashed=false", fields="id, name"))), 1)
+
+        self.assertEqual(len(self.records), 1)
+        record = self.records[0]
+        self.assertEqual(record['method'], "GET")
+        self.assertEqual(record['status'], 200)
+        self.assertTrue(record['uri'].startswith(f"{self.server.url}/drive/v3/files?"))
+        self.assertIn(b"testFile-1.txt", record['response_body'])
+        self.assertEqual(record['bytes_sent'], 0)
+        self.assertEqual(record['bytes_decompressed'], len(record['response_body']))
+        self.assertEqual(record['bytes_received'], record['bytes_decompressed'])  # the mock doesn't compress
+        self.assertGreaterEqual(record['seconds'], 0)
+
+    def test_transport_hooks(self):
+        """Tests a failing hook doesn't break the API call, and a removed hook is no longer called"""
+        def broken_hook(record):
+            raise RuntimeError("broken hook")
+
+        add_transport_hook(broken_hook)
+        try:
+            self.assertEqual(list(list_googledrive_items(query="trashed=false")), [])
+        finally:
+            remove_transport_hook(broken_hook)
+        self.assertEqual(len(self.records), 1)
+
+        remove_transport_hook(self.records.append)
+        list(list_googledrive_items(query="trashed=false"))
+        self.assertEqual(len(self.records), 1)
+
+    def test_transport_shared_across_threads(self):
+        """Tests the threads making API calls at the same time share one service (and transport), and all succeed"""
+        for i in range(20):
+            mock_drive_add_item(self.server, name=f"testFile-{i}.txt")
+        services = []
+        counts = []
+
+        def list_items():
+            services.append(get_service_googledrive())
+            counts.append(len(list(list_googledrive_items(query="trashed=false", page_size=5))))
+
+        threads = [threading.Thread(target=list_items) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(counts, [20] * 8)
+        self.assertEqual(len({id(service) for service in services}), 1)
+        self.assertEqual(self.calls("/drive/v3/files"), 8 * 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Summary: Will test functions in Selenium_googleDriveTestUpload_DriveAsync module that have expected python results
+    (not Selenium or Google API), with the Drive API helpers replaced by slow stand-ins or against the local mock Drive
+    API
+"""
+import Selenium_googleDriveTestUpload_DriveAsync as DriveAsync
+from Selenium_googleDriveTestUpload_DriveAPI import delete_googledrive_items_batch, set_drive_api_endpoint
+from Selenium_googleDriveTestUpload_MockDrive import (mock_drive_add_item, mock_drive_items, start_mock_drive,
+                                                      stop_mock_drive)
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import unittest
+from unittest import mock
+
+
+class TestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.concurrency = DriveAsync.ASYNC_CONCURRENCY
+        DriveAsync.configure_async_googledrive(concurrency=3)
+
+    def tearDown(self):
+        DriveAsync.configure_async_googledrive(concurrency=self.concurrency)
+
+    def slow_delete(self, item_id: str):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05)
+        with self.lock:
+            self.in_flight -= 1
+        return True
+
+    def test_delete_googledrive_items_async_bounded(self):
+        """Tests delete_googledrive_items_async deletes every item with no more than the set concurrency in flight"""
+        items = [{'id': f"file{num}", 'mimeType': 'text/plain'} for num in range(10)]
+        with mock.patch.object(DriveAsync, "delete_googledrive_item", side_effect=self.slow_delete):
+            results = asyncio.run(DriveAsync.delete_googledrive_items_async(items=items))
+        self.assertEqual(results, {item['id']: True for item in items})
+        self.assertEqual(self.max_in_flight, 3)
+
+    def test_delete_googledrive_items_async_deadline(self):
+        """Tests delete_googledrive_items_async cancels the deletes not started by the deadline (reported as False)"""
+        items = [{'id': f"file{num}", 'mimeType': 'text/plain'} for num in range(12)]
+        with mock.patch.object(DriveAsync, "delete_googledrive_item", side_effect=self.slow_delete) as delete:
+            results = asyncio.run(DriveAsync.delete_googledrive_items_async(items=items, deadline_sec=0.08))
+        self.assertEqual(len(results), 12)
+        self.assertIn(False, results.values())
+        self.assertLess(delete.call_count, 12)
+        self.assertLessEqual(self.max_in_flight, 3)
+
+    def test_delete_googledrive_items_async_timeout_keeps_slot(self):
+        """Tests a delete that times out keeps its slot until its thread is done, so no more than the set concurrency
+        is ever in flight"""
+        items = [{'id': f"file{num}", 'mimeType': 'text/plain'} for num in range(9)]
+        DriveAsync._executor = ThreadPoolExecutor(max_workers=len(items))  # more threads than slots
+        with mock.patch.object(DriveAsync, "delete_googledrive_item", side_effect=self.slow_delete):
+            results = asyncio.run(DriveAsync.delete_googledrive_items_async(items=items, timeout=0.01))
+        self.assertEqual(results, {item['id']: False for item in items})
+        self.assertEqual(self.max_in_flight, 3)
+
+    def test_run_limited_cancelled_after_finishing(self):
+        """Tests a call whose thread already finished when it is cancelled returns its result instead of being
+        reported as cancelled"""
+        finished = threading.Event()
+
+        def quick_delete(item_id: str):
+            finished.set()
+            return True
+
+        async def cancel_after_finish():
+            task = asyncio.ensure_future(DriveAsync._run_limited(quick_delete, 5, item_id="file1"))
+            await asyncio.sleep(0)  # the task submits the call to the thread pool
+            finished.wait(timeout=1)  # blocks the loop, so the task can't see the result before it is cancelled
+            time.sleep(0.05)
+            task.cancel()
+            return await task
+
+        self.assertTrue(asyncio.run(cancel_after_finish()))
+
+    def test_delete_googledrive_items_async_already_gone(self):
+        """Tests delete_googledrive_items_async counts an item that is already gone (404) as deleted, same as the
+        batched deletes (delete_googledrive_items_batch), against the mock Drive API"""
+        server = start_mock_drive()
+        set_drive_api_endpoint(server.url)
+        try:
+            folder = mock_drive_add_item(server, name="Testing Folder", mime_type="application/vnd.google-apps.folder")
+            file = mock_drive_add_item(server, name="testFile.txt", parents=[folder['id']])
+            items = [folder, file, {'id': "missingID", 'mimeType': "text/plain"}]
+
+            results = asyncio.run(DriveAsync.delete_googledrive_items_async(items=items))
+            self.assertEqual(results, {item['id']: True for item in items})
+            self.assertEqual(mock_drive_items(server), {})
+            self.assertEqual(delete_googledrive_items_batch(item_ids=[item['id'] for item in items]), results)
+        finally:
+            set_drive_api_endpoint("")
+            stop_mock_drive(server)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Summary: Will test functions in Selenium_googleDriveTestUpload_DriveIndex module that have expected python results
+    (not Selenium or Google API), against the local mock Drive API (localhost only)
+"""
+import Selenium_googleDriveTestUpload_DriveIndex as DriveIndex
+from Selenium_googleDriveTestUpload_Files import validate_files_exist
+from Selenium_googleDriveTestUpload_DriveAPI import (add_transport_hook, delete_googledrive_item, MIMETYPE_FOLDER,
+                                                     remove_transport_hook, set_drive_api_endpoint)
+from Selenium_googleDriveTestUpload_MockDrive import mock_drive_add_item, start_mock_drive, stop_mock_drive
+import unittest
+
+
+class TestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.server = start_mock_drive()
+        set_drive_api_endpoint(self.server.url)
+        self.folder = mock_drive_add_item(self.server, name="Testing Folder", mime_type=MIMETYPE_FOLDER)
+        self.file = mock_drive_add_item(self.server, name="testFile-1.txt", parents=[self.folder['id']],
+                                        content=b"hello")
+        self.uris = []
+        add_transport_hook(self.record_uri)
+
+    def tearDown(self):
+        remove_transport_hook(self.record_uri)
+        DriveIndex.disable_index_googledrive()
+        set_drive_api_endpoint("")
+        stop_mock_drive(self.server)
+
+    def record_uri(self, record: dict):
+        self.uris.append(record['uri'])
+
+    def changes_list_calls(self):
+        return len([uri for uri in self.uris if "/drive/v3/changes?" in uri])
+
+    def test_seed(self):
+        """Tests enable_index_googledrive seeds the index from a full listing, answered by name, parent and ID"""
+        DriveIndex.enable_index_googledrive(max_staleness_sec=60)
+
+        self.assertTrue(DriveIndex.index_enabled())
+        by_name = DriveIndex.index_find_items(name="testFile-1.txt", is_folder=False, parent=self.folder['id'])
+        self.assertEqual([item['id'] for item in by_name], [self.file['id']])
+        self.assertEqual(by_name[0]['md5Checksum'], self.file['md5Checksum'])
+        self.assertEqual([item['id'] for item in DriveIndex.index_find_items(parent=self.folder['id'])],
+                         [self.file['id']])
+        self.assertEqual(len(DriveIndex.index_find_items(item_id=self.folder['id'], is_folder=True)), 1)
+        self.assertEqual(DriveIndex.index_find_items(item_id=self.folder['id'], is_folder=False), [])
+
+    def test_incremental_sync(self):
+        """Tests an item created after the seed is found by a look up, through an incremental sync (changes.list)"""
+        DriveIndex.enable_index_googledrive(max_staleness_sec=60, min_recheck_sec=0)
+        created = mock_drive_add_item(self.server, name="testFile-2.txt", parents=[self.folder['id']])
+
+        items = DriveIndex.index_find_items(name="testFile-2.txt", parent=self.folder['id'])
+
+        self.assertEqual([item['id'] for item in items], [created['id']])
+        self.assertEqual(self.changes_list_calls(), 1)
+        self.assertEqual(len(DriveIndex.index_find_items(parent=self.folder['id'])), 2)
+
+    def test_removal(self):
+        """Tests an item deleted after the seed is taken out of the index (name and parent look ups) by the next sync"""
+        DriveIndex.enable_index_googledrive(max_staleness_sec=60, min_recheck_sec=0)
+        self.assertTrue(delete_googledrive_item(self.file['id']))
+
+        DriveIndex.sync_index_googledrive(force=True)
+
+        self.assertEqual(DriveIndex.index_find_items(name="testFile-1.txt", recheck_missing=False), [])
+        self.assertEqual(DriveIndex.index_find_items(parent=self.folder['id'], recheck_missing=False), [])
+
+    def test_missing_recheck_interval(self):
+        """Tests repeated look ups of a missing item sync at most once per min_recheck_sec"""
+        DriveIndex.enable_index_googledrive(max_staleness_sec=600, min_recheck_sec=60)
+
+        for _ in range(5):
+            self.assertEqual(DriveIndex.index_find_items(name="missing.txt"), [])
+        self.assertEqual(self.changes_list_calls(), 0)
+
+        DriveIndex._index['synced'] -= 60  # last sync is now older than min_recheck_sec
+        for _ in range(5):
+            self.assertEqual(DriveIndex.index_find_items(name="missing.txt"), [])
+        self.assertEqual(self.changes_list_calls(), 1)
+
+    def test_validate_files_exist_polling(self):
+        """Tests validate_files_exist polled for missing files (as create_files_fileinput does) syncs the index at most
+        once per min_recheck_sec, and finds a file created after the last sync once the interval has passed"""
+        DriveIndex.enable_index_googledrive(max_staleness_sec=600, min_recheck_sec=60)
+        filenames = ["testFile-1.txt", "testFile-2.txt", "testFile-3.txt"]
+
+        for _ in range(5):
+            results = validate_files_exist(filenames=filenames, fld_id=self.folder['id'])
+        self.assertEqual(self.changes_list_calls(), 0)
+        self.assertEqual([name for name, result in results.items() if result['found']], ["testFile-1.txt"])
+
+        created = mock_drive_add_item(self.server, name="testFile-2.txt", parents=[self.folder['id']])
+        DriveIndex._index['synced'] -= 60  # last sync is now older than min_recheck_sec
+        for _ in range(5):
+            results = validate_files_exist(filenames=filenames, fld_id=self.folder['id'])
+        self.assertEqual(self.changes_list_calls(), 1)
+        self.assertEqual(results["testFile-2.txt"]['id'], created['id'])
+        self.assertFalse(results["testFile-3.txt"]['found'])
+
+
+if __name__ == '__main__':
+    unittest.main()
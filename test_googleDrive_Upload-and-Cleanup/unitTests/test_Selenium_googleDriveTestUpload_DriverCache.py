@@ -0,0 +1,92 @@
+"""
+Summary: Will test functions in Selenium_googleDriveTestUpload_DriverCache module that have expected python results
+    (not Selenium), using a temporary cache directory and no network
+"""
+import Selenium_googleDriveTestUpload_DriverCache as DriverCache
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+
+class TestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        DriverCache._resolved.clear()
+        os.makedirs(os.path.join(self.cache_dir, "129"))
+        self.driver_path = os.path.join(self.cache_dir, "129", "chromedriver")
+        with open(self.driver_path, "wb") as driver:
+            driver.write(b"cached driver")
+        DriverCache._write_manifest(self.cache_dir, {'129': {'file': os.path.join("129", "chromedriver"),
+                                                             'sha256': DriverCache._sha256(self.driver_path),
+                                                             'resolved': 1}})
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_resolve_chromedriver_cache_hit(self):
+        """Tests resolve_chromedriver returns the cached driver, without downloading, when the checksum matches"""
+        with mock.patch.object(DriverCache, "_download_chromedriver") as download:
+            path = DriverCache.resolve_chromedriver(cache_dir=self.cache_dir, chrome_major="129")
+        self.assertEqual(path, self.driver_path)
+        download.assert_not_called()
+
+    def test_resolve_chromedriver_checksum_mismatch(self):
+        """Tests resolve_chromedriver downloads the driver again when the cached binary fails its checksum"""
+        with open(self.driver_path, "wb") as driver:
+            driver.write(b"corrupted driver")
+        with mock.patch.object(DriverCache, "_download_chromedriver", return_value="downloaded") as download:
+            path = DriverCache.resolve_chromedriver(cache_dir=self.cache_dir, chrome_major="129")
+        self.assertEqual(path, "downloaded")
+        download.assert_called_once()
+
+    def test_resolve_chromedriver_unknown_chrome_version(self):
+        """Tests resolve_chromedriver uses the most recently cached driver when the Chrome version can't be found"""
+        with mock.patch.object(DriverCache, "get_chrome_major_version", return_value=""), \
+                mock.patch.object(DriverCache, "_download_chromedriver") as download:
+            path = DriverCache.resolve_chromedriver(cache_dir=self.cache_dir)
+        self.assertEqual(path, self.driver_path)
+        download.assert_not_called()
+
+    def test_driver_major_version(self):
+        """Tests _driver_major_version reads the major version from the driver's --version output (empty if it can't
+        be run)"""
+        output = subprocess.CompletedProcess(args=[], returncode=0, stdout="ChromeDriver 129.0.6668.100 (abc)\n")
+        with mock.patch.object(DriverCache.subprocess, "run", return_value=output):
+            self.assertEqual(DriverCache._driver_major_version(self.driver_path), "129")
+        with mock.patch.object(DriverCache.subprocess, "run", side_effect=OSError("not executable")):
+            self.assertEqual(DriverCache._driver_major_version(self.driver_path), "")
+
+    def test_add_to_cache_concurrent(self):
+        """Tests _add_to_cache keeps every entry of the manifest when several drivers are added at the same time"""
+        downloaded_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, downloaded_dir)
+        majors = [str(major) for major in range(130, 138)]
+        for major in majors:
+            os.makedirs(os.path.join(downloaded_dir, major))
+            with open(os.path.join(downloaded_dir, major, "chromedriver"), "wb") as driver:
+                driver.write(f"driver {major}".encode())
+
+        threads = [threading.Thread(target=DriverCache._add_to_cache,
+                                    kwargs={'cache_dir': self.cache_dir, 'chrome_major': major,
+                                            'downloaded': os.path.join(downloaded_dir, major, "chromedriver")})
+                   for major in majors]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        manifest = DriverCache._read_manifest(self.cache_dir)
+        self.assertEqual(sorted(manifest), ["129"] + majors)
+        for major in majors:
+            path = DriverCache.resolve_chromedriver(cache_dir=self.cache_dir, chrome_major=major)
+            with open(path, "rb") as driver:
+                self.assertEqual(driver.read(), f"driver {major}".encode())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,7 +12,11 @@ VERSION INFO:
 """
 
 import os
-from Selenium_googleDriveTestUpload_Files import find_testfiles, replace_backslash, validate_file_exists
+from Selenium_googleDriveTestUpload_DriveAPI import set_drive_api_endpoint
+from Selenium_googleDriveTestUpload_Files import (_file_exists_by_name, find_testfiles, replace_backslash,
+                                                  validate_file_exists)
+from Selenium_googleDriveTestUpload_Metrics import get_spans, reset_metrics
+from Selenium_googleDriveTestUpload_MockDrive import mock_drive_add_item, start_mock_drive, stop_mock_drive
 import unittest
 
 
@@ -95,6 +99,25 @@ class TestClass(unittest.TestCase):
         with self.assertRaises(SystemExit):
             validate_file_exists()
 
+    def test_file_exists_by_name_quiet(self):
+        """Tests _file_exists_by_name (polled by create_file_newbutton) finds a file by name and folder, against the
+        local mock Drive API, without recording a step or logging at INFO"""
+        server = start_mock_drive()
+        set_drive_api_endpoint(server.url)
+        reset_metrics()
+        try:
+            folder = mock_drive_add_item(server, name="Testing Folder", mime_type="application/vnd.google-apps.folder")
+            mock_drive_add_item(server, name="testFile-1.txt", parents=[folder['id']])
+
+            with self.assertNoLogs("seleniumTest.files", level="INFO"):
+                self.assertTrue(_file_exists_by_name(filename="testFile-1.txt", fld_id=folder['id']))
+                self.assertFalse(_file_exists_by_name(filename="testFile-2.txt", fld_id=folder['id']))
+                self.assertFalse(_file_exists_by_name(filename="testFile-1.txt", fld_id="otherFolder"))
+            self.assertEqual(get_spans(), [])
+        finally:
+            set_drive_api_endpoint("")
+            stop_mock_drive(server)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,78 @@
+"""
+Summary: Will test functions in Selenium_googleDriveTestUpload_Metrics module that have expected python results (not
+    Selenium or Google API)
+"""
+import Selenium_googleDriveTestUpload_Metrics as Metrics
+import asyncio
+import contextvars
+import threading
+import unittest
+
+
+class TestClass(unittest.TestCase):
+
+    def setUp(self):
+        Metrics.reset_metrics()
+
+    def tearDown(self):
+        Metrics.reset_metrics()
+
+    def test_percentile(self):
+        """Tests percentile interpolates between the closest ranks (same results as numpy's default)"""
+        values = [4, 1, 3, 2, 5]
+        self.assertEqual(Metrics.percentile(values, 50), 3)
+        self.assertEqual(Metrics.percentile(values, 0), 1)
+        self.assertEqual(Metrics.percentile(values, 100), 5)
+        self.assertAlmostEqual(Metrics.percentile(values, 90), 4.6)
+        self.assertAlmostEqual(Metrics.percentile([1, 2], 95), 1.95)
+        self.assertIsNone(Metrics.percentile([], 50))
+
+    def test_span_nested_and_failed(self):
+        """Tests span records the parent of nested spans, and a failed span when the block raises an exception"""
+        with Metrics.span("outer"):
+            self.assertEqual(Metrics.current_span_name(), "outer")
+            with self.assertRaises(ValueError):
+                with Metrics.span("inner"):
+                    raise ValueError("step failed")
+        self.assertEqual(Metrics.current_span_name(), "")
+
+        spans = {record['name']: record for record in Metrics.get_spans()}
+        self.assertEqual(spans['inner']['parent'], "outer")
+        self.assertFalse(spans['inner']['success'])
+        self.assertTrue(spans['outer']['success'])
+
+    def test_span_context(self):
+        """Tests current_span_name is seen by asyncio tasks and by threads run with the caller's context, but not by a
+        plain thread"""
+        seen = {}
+
+        async def task():
+            seen['task'] = Metrics.current_span_name()
+
+        def in_thread(key: str):
+            seen[key] = Metrics.current_span_name()
+
+        with Metrics.span("delete items"):
+            asyncio.run(task())
+            thread = threading.Thread(target=contextvars.copy_context().run, args=[in_thread, "copied"])
+            thread.start()
+            thread.join()
+            thread = threading.Thread(target=in_thread, args=["plain"])
+            thread.start()
+            thread.join()
+
+        self.assertEqual(seen, {'task': "delete items", 'copied': "delete items", 'plain': ""})
+
+    def test_summarize_spans(self):
+        """Tests summarize_spans counts, failures and percentiles per step name"""
+        spans = [{'name': "upload", 'seconds': seconds, 'success': seconds < 4} for seconds in [1, 2, 3, 4]]
+        summary = Metrics.summarize_spans(spans=spans)
+        self.assertEqual(summary['upload']['count'], 4)
+        self.assertEqual(summary['upload']['failures'], 1)
+        self.assertEqual(summary['upload']['total'], 10)
+        self.assertEqual(summary['upload']['p50'], 2.5)
+        self.assertEqual(summary['upload']['max'], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
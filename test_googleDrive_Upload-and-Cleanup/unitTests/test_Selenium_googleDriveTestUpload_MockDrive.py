@@ -0,0 +1,86 @@
+"""
+Summary: Will test functions in Selenium_googleDriveTestUpload_MockDrive module that have expected python results (not
+    Selenium or Google API): the query parser, and the mock server's answers over HTTP (localhost only)
+"""
+import Selenium_googleDriveTestUpload_MockDrive as MockDrive
+import json
+import unittest
+import urllib.error
+import urllib.parse
+import urllib.request
+
+MIMETYPE_FOLDER = "application/vnd.google-apps.folder"
+
+
+class TestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockDrive.start_mock_drive()
+        self.folder = MockDrive.mock_drive_add_item(self.server, name="Testing Folder", mime_type=MIMETYPE_FOLDER,
+                                                    app_properties={'seleniumRunId': "run1"})
+        self.files = [MockDrive.mock_drive_add_item(self.server, name=f"testFile-{num}.txt",
+                                                    parents=[self.folder['id']]) for num in range(5)]
+
+    def tearDown(self):
+        MockDrive.stop_mock_drive(self.server)
+
+    def request(self, method: str, path: str, body: bytes = None, headers: dict = None):
+        request = urllib.request.Request(self.server.url + path, data=body, method=method, headers=headers or {})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as error:
+            return error.code, error.read()
+
+    def test_parse_drive_query(self):
+        """Tests parse_drive_query with the kinds of queries the test issues"""
+        item = {'name': "it's a test.txt", 'mimeType': "text/plain", 'parents': ["fld1"], 'trashed': False,
+                'appProperties': {'seleniumRunId': "run1"}}
+        cases = {
+            "name = 'it\\'s a test.txt' and trashed=false": True,
+            f"mimeType != '{MIMETYPE_FOLDER}' and 'fld1' in parents": True,
+            "(name = 'a.txt' or name = 'b.txt') and trashed=false": False,
+            "appProperties has { key='seleniumRunId' and value='run1' }": True,
+            "not name contains 'TEST'": False,
+            "": True,
+        }
+        for query, expected in cases.items():
+            with self.subTest(query=query):
+                self.assertEqual(MockDrive.parse_drive_query(query)(item), expected)
+        with self.assertRaises(ValueError):
+            MockDrive.parse_drive_query("name = ")
+
+    def test_files_list_pages_and_fields(self):
+        """Tests files.list returns the matching items, in pages, with only the requested fields"""
+        query = urllib.parse.quote(f"'{self.folder['id']}' in parents and trashed=false")
+        status, content = self.request("GET", f"/drive/v3/files?q={query}&pageSize=3&fields=nextPageToken,files(id)")
+        result = json.loads(content)
+        self.assertEqual(status, 200)
+        self.assertEqual(result['files'], [{'id': item['id']} for item in self.files[:3]])
+
+        status, content = self.request("GET", f"/drive/v3/files?q={query}&pageSize=3&fields=nextPageToken,files(id)"
+                                              f"&pageToken={result['nextPageToken']}")
+        result = json.loads(content)
+        self.assertEqual(len(result['files']), 2)
+        self.assertNotIn('nextPageToken', result)
+
+    def test_batch_delete_and_rate_limit(self):
+        """Tests a batch request answers each of its deletes (404 for a missing item), and the injected rate limit"""
+        boundary = "batch_test"
+        body = "".join(f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <base + {item_id}>\r\n\r\n"
+                       f"DELETE /drive/v3/files/{item_id}?alt=json HTTP/1.1\r\n\r\n\r\n"
+                       for item_id in [self.files[0]['id'], "missing"]) + f"--{boundary}--"
+        status, content = self.request("POST", "/batch/drive/v3", body=body.encode(),
+                                       headers={'Content-Type': f"multipart/mixed; boundary={boundary}"})
+        self.assertEqual(status, 200)
+        self.assertIn(f"Content-ID: <response-base + {self.files[0]['id']}>\r\n\r\nHTTP/1.1 204", content.decode())
+        self.assertIn("Content-ID: <response-base + missing>\r\n\r\nHTTP/1.1 404", content.decode())
+        self.assertNotIn(self.files[0]['id'], MockDrive.mock_drive_items(self.server))
+
+        MockDrive.mock_drive_configure(self.server, rate_limit_per_sec=2)
+        statuses = [self.request("GET", f"/drive/v3/files/{self.folder['id']}")[0] for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 403])
+
+
+if __name__ == '__main__':
+    unittest.main()
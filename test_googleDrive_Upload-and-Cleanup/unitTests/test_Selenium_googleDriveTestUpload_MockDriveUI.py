@@ -0,0 +1,90 @@
+"""
+Summary: Will test functions in Selenium_googleDriveTestUpload_MockDriveUI module that have expected python results (not
+    Selenium or Google API): the replica's pages and settings, and the API calls the pages make (localhost only)
+"""
+import Selenium_googleDriveTestUpload_GoogleDrive_webItems as webItems
+import Selenium_googleDriveTestUpload_MockDrive as MockDrive
+import Selenium_googleDriveTestUpload_MockDriveUI as MockDriveUI
+import json
+import re
+import unittest
+import urllib.request
+
+MIMETYPE_FOLDER = "application/vnd.google-apps.folder"
+
+
+class TestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockDrive.start_mock_drive()
+        MockDriveUI.mock_drive_add_ui(self.server, menu_delay_sec=0.05)
+        self.folder = MockDrive.mock_drive_add_item(self.server, name="Testing Folder", mime_type=MIMETYPE_FOLDER)
+
+    def tearDown(self):
+        MockDrive.stop_mock_drive(self.server)
+        webItems.set_drive_web_url("")
+
+    def get_page(self, path: str):
+        with urllib.request.urlopen(self.server.url + path) as response:
+            html = response.read().decode()
+        return html, json.loads(re.search(r"const CONFIG = (.*);", html).group(1))
+
+    def test_pages_use_helper_locators(self):
+        """Tests the home, My Drive and folder pages are served with the locators the UI helpers use"""
+        for path in ["/drive/home", "/drive/my-drive", f"/drive/folders/{self.folder['id']}"]:
+            with self.subTest(path=path):
+                html, config = self.get_page(path)
+                for locator in ["guidedhelpid: 'new_menu_button'", "'aria-label': 'New folder Alt+C then F'",
+                                "'aria-label': 'File upload Alt+C then U'", "value: 'Untitled folder'",
+                                "element('span', {}, 'Create')", "type: 'file'"]:
+                    self.assertIn(locator, html)
+                self.assertEqual(config['folderId'], "root" if "folders" not in path else self.folder['id'])
+
+    def test_page_items_and_delays(self):
+        """Tests a folder page lists its items (folders first, script safe) and mock_drive_configure_ui's delays"""
+        MockDrive.mock_drive_add_item(self.server, name="b</script>.txt", parents=[self.folder['id']])
+        MockDrive.mock_drive_add_item(self.server, name="z folder", mime_type=MIMETYPE_FOLDER,
+                                      parents=[self.folder['id']])
+        MockDriveUI.mock_drive_configure_ui(self.server, dialog_delay_sec=1.5)
+
+        html, config = self.get_page(f"/drive/folders/{self.folder['id']}")
+        self.assertEqual(config['items'], ["z folder", "b</script>.txt"])
+        self.assertEqual(html.count("</script>"), 1)
+        self.assertEqual(config['delays']['dialog'], 1.5)
+        self.assertEqual(config['delays']['menu'], 0.05)
+        self.assertEqual(config['delays']['page'], MockDriveUI.MOCK_UI_DELAYS_SEC['page'])
+
+    def test_page_api_calls(self):
+        """Tests the folder creation and multipart upload requests the page sends are answered by the mock"""
+        metadata = {'name': "New Folder", 'mimeType': MIMETYPE_FOLDER, 'parents': [self.folder['id']]}
+        request = urllib.request.Request(self.server.url + "/drive/v3/files", data=json.dumps(metadata).encode(),
+                                         headers={'Content-Type': "application/json; charset=UTF-8"}, method="POST")
+        with urllib.request.urlopen(request) as response:
+            self.assertEqual(json.loads(response.read())['name'], "New Folder")
+
+        boundary = "replica0123abcd"
+        metadata = {'name': "testFile-1.txt", 'mimeType': "text/plain", 'parents': [self.folder['id']]}
+        body = (f"--{boundary}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n{json.dumps(metadata)}\r\n"
+                f"--{boundary}\r\nContent-Type: text/plain\r\n\r\nhello\r\n--{boundary}--\r\n").encode()
+        request = urllib.request.Request(self.server.url + "/upload/drive/v3/files?uploadType=multipart", data=body,
+                                         headers={'Content-Type': f"multipart/related; boundary={boundary}"},
+                                         method="POST")
+        with urllib.request.urlopen(request) as response:
+            self.assertEqual(response.status, 200)
+
+        items = {item['name']: item for item in MockDrive.mock_drive_items(self.server).values()
+                 if self.folder['id'] in item['parents']}
+        self.assertEqual(items["New Folder"]['mimeType'], MIMETYPE_FOLDER)
+        self.assertEqual(items["testFile-1.txt"]['size'], "5")
+
+    def test_set_drive_web_url(self):
+        """Tests set_drive_web_url points the Google Drive page addresses at the replica, and back"""
+        self.assertEqual(webItems.drive_web_url("/drive/my-drive"), "https://drive.google.com/drive/my-drive")
+        webItems.set_drive_web_url(self.server.url + "/")
+        self.assertEqual(webItems.drive_web_url("/drive/my-drive"), f"{self.server.url}/drive/my-drive")
+        webItems.set_drive_web_url("")
+        self.assertEqual(webItems.drive_web_url(), "https://drive.google.com")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Summary: Will test functions in Selenium_googleDriveTestUpload_Profiles module that have expected python results
+    (not Selenium or Google API): cloning the profile template, and building it with a stand-in for connect_googledrive
+    (no browser is launched)
+"""
+import Selenium_googleDriveTestUpload_Profiles as Profiles
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+
+class FakeDriver:
+    """Stand-in for the webdriver returned by connect_googledrive, writes a session file into its profile on quit"""
+
+    def __init__(self, user_data_dir: str):
+        self.user_data_dir = user_data_dir
+
+    def quit(self):
+        with open(os.path.join(self.user_data_dir, "Cookies"), "w") as cookies:
+            cookies.write("session")
+
+
+class TestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.template_dir = os.path.join(self.tmpdir.name, "template")
+        self.logins = 0
+        self.logins_lock = threading.Lock()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def fake_configure(self, user_data_dir: str = None, **kwargs):
+        return {'user_data_dir': user_data_dir}
+
+    def fake_connect(self, servicename: str, username: str, chrome_options: dict, **kwargs):
+        with self.logins_lock:
+            self.logins += 1
+        time.sleep(0.05)  # long enough for the other threads to reach the template's lock
+        return FakeDriver(chrome_options['user_data_dir'])
+
+    def build_dirs(self):
+        return [name for name in os.listdir(self.tmpdir.name) if name.startswith(".template-")]
+
+    def test_ensure_profile_template(self):
+        """Tests ensure_profile_template builds the template (with the marker) once, and only rebuilds it once the
+        marker is removed"""
+        with mock.patch.object(Profiles, "configure_fortesting_googledrive", side_effect=self.fake_configure), \
+                mock.patch.object(Profiles, "connect_googledrive", side_effect=self.fake_connect):
+            Profiles.ensure_profile_template(servicename="", username="tester", template_dir=self.template_dir)
+            Profiles.ensure_profile_template(servicename="", username="tester", template_dir=self.template_dir)
+            self.assertEqual(self.logins, 1)
+
+            os.remove(os.path.join(self.template_dir, Profiles.PROFILE_TEMPLATE_MARKER))
+            Profiles.ensure_profile_template(servicename="", username="tester", template_dir=self.template_dir)
+
+        self.assertEqual(self.logins, 2)
+        self.assertTrue(os.path.exists(os.path.join(self.template_dir, "Cookies")))
+        self.assertTrue(os.path.exists(os.path.join(self.template_dir, Profiles.PROFILE_TEMPLATE_MARKER)))
+        self.assertEqual(self.build_dirs(), [])
+
+    def test_ensure_profile_template_concurrent(self):
+        """Tests several callers that all find the template missing build it only once (the others wait on the
+        template's lock)"""
+        with mock.patch.object(Profiles, "configure_fortesting_googledrive", side_effect=self.fake_configure), \
+                mock.patch.object(Profiles, "connect_googledrive", side_effect=self.fake_connect):
+            threads = [threading.Thread(target=Profiles.ensure_profile_template,
+                                        kwargs={'servicename': "", 'username': "tester",
+                                                'template_dir': self.template_dir}) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(self.logins, 1)
+        self.assertTrue(os.path.exists(os.path.join(self.template_dir, Profiles.PROFILE_TEMPLATE_MARKER)))
+
+    def test_create_profile_template_login_fails(self):
+        """Tests a failed login leaves no build directory behind, and the existing template untouched"""
+        os.makedirs(self.template_dir)
+        with open(os.path.join(self.template_dir, "Cookies"), "w") as cookies:
+            cookies.write("old session")
+
+        with mock.patch.object(Profiles, "configure_fortesting_googledrive", side_effect=self.fake_configure), \
+                mock.patch.object(Profiles, "connect_googledrive", side_effect=RuntimeError("sign in failed")):
+            with self.assertRaises(RuntimeError):
+                Profiles.create_profile_template(servicename="", username="tester", template_dir=self.template_dir)
+
+        self.assertEqual(self.build_dirs(), [])
+        with open(os.path.join(self.template_dir, "Cookies")) as cookies:
+            self.assertEqual(cookies.read(), "old session")
+
+    def test_clone_profile_copy(self):
+        """Tests clone_profile (copy) replaces an existing clone and leaves out the caches and Chrome's lock files"""
+        for path in ["Default/Cookies", "Default/Cache/data_0", "Local State", "SingletonLock"]:
+            os.makedirs(os.path.dirname(os.path.join(self.template_dir, path)), exist_ok=True)
+            with open(os.path.join(self.template_dir, path), "w") as file:
+                file.write(path)
+        clone_dir = os.path.join(self.tmpdir.name, "clones", "worker-1")
+        os.makedirs(clone_dir)
+        with open(os.path.join(clone_dir, "stale.txt"), "w") as file:
+            file.write("from the last run")
+
+        with mock.patch.object(Profiles, "_clone_reflink", return_value=False):
+            method = Profiles.clone_profile(clone_dir=clone_dir, template_dir=self.template_dir)
+
+        self.assertEqual(method, "copy")
+        self.assertEqual(sorted(os.listdir(clone_dir)), ["Default", "Local State"])
+        self.assertEqual(os.listdir(os.path.join(clone_dir, "Default")), ["Cookies"])
+
+    def test_clone_profile_lock_files(self):
+        """Tests clone_profile never leaves Chrome's lock files in the clone, whichever way it was cloned"""
+        os.makedirs(os.path.join(self.template_dir, "Default"))
+        for path in ["Default/Cookies", "SingletonLock", "Default/lockfile"]:
+            with open(os.path.join(self.template_dir, path), "w") as file:
+                file.write(path)
+        clone_dir = os.path.join(self.tmpdir.name, "worker-1")
+
+        method = Profiles.clone_profile(clone_dir=clone_dir, template_dir=self.template_dir)
+
+        self.assertIn(method, ["reflink", "copy"])
+        self.assertEqual(os.listdir(clone_dir), ["Default"])
+        self.assertEqual(os.listdir(os.path.join(clone_dir, "Default")), ["Cookies"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+"""
+Summary: Will test functions in Selenium_googleDriveTestUpload_RequestBlocking module that have expected python results
+    (not Selenium)
+"""
+from Selenium_googleDriveTestUpload_RequestBlocking import BLOCK_CATEGORIES, resolve_block_patterns
+import unittest
+
+
+class TestClass(unittest.TestCase):
+
+    def test_resolve_block_patterns_categories(self):
+        """Tests resolve_block_patterns expands category names and keeps plain URL patterns as they are"""
+        patterns = resolve_block_patterns(deny=["fonts", "*example.com/track*"])
+        self.assertEqual(patterns, BLOCK_CATEGORIES['fonts'] + ["*example.com/track*"])
+
+    def test_resolve_block_patterns_allow(self):
+        """Tests resolve_block_patterns takes allowed categories/patterns out of the denied ones"""
+        patterns = resolve_block_patterns(deny=["images", "media"], allow=["media", "*.svg"])
+        self.assertNotIn("*.svg", patterns)
+        self.assertNotIn("*.mp4", patterns)
+        self.assertIn("*.png", patterns)
+
+    def test_resolve_block_patterns_allow_wildcards(self):
+        """Tests resolve_block_patterns takes out the denied patterns an allowed wildcard pattern matches, but not the
+        wider denied patterns"""
+        patterns = resolve_block_patterns(deny=["fonts", "images"], allow=["*googleusercontent.com*", "*gstatic.com*"])
+        self.assertNotIn("*lh3.googleusercontent.com*", patterns)
+        self.assertNotIn("*drive-thirdparty.googleusercontent.com*", patterns)
+        self.assertNotIn("*fonts.gstatic.com*", patterns)
+        self.assertIn("*.woff2", patterns)
+        self.assertIn("*fonts.googleapis.com*", patterns)
+
+    def test_resolve_block_patterns_empty_deny(self):
+        """Tests resolve_block_patterns blocks nothing for an empty deny list (not the default categories)"""
+        self.assertEqual(resolve_block_patterns(deny=[]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Summary: Will test functions in Selenium_googleDriveTestUpload_Waits module that have expected python results (not
+    Selenium)
+"""
+from Selenium_googleDriveTestUpload_Waits import get_wait_timings, reset_wait_timings, wait_until
+import time
+import unittest
+
+
+class TestClass(unittest.TestCase):
+
+    def setUp(self):
+        reset_wait_timings()
+
+    def test_wait_until_ready_immediately(self):
+        """Tests wait_until for a predicate that is ready right away, expects a single check and no sleeping"""
+        result = wait_until(lambda: "ready", description="immediate")
+        self.assertEqual(result, "ready")
+        self.assertEqual(get_wait_timings()[0]['checks'], 1)
+
+    def test_wait_until_ready_after_checks(self):
+        """Tests wait_until for a predicate that becomes ready on the third check"""
+        calls = []
+
+        def predicate():
+            calls.append(1)
+            return len(calls) >= 3
+
+        self.assertTrue(wait_until(predicate, description="third check", timeout=5, poll_initial=0.01))
+        timing = get_wait_timings()[0]
+        self.assertEqual(timing['checks'], 3)
+        self.assertTrue(timing['success'])
+
+    def test_wait_until_timeout(self):
+        """Tests wait_until for a predicate that is never ready, expects a falsy result once the deadline passes (and
+        not much later)"""
+        start = time.monotonic()
+        result = wait_until(lambda: False, description="never", timeout=0.3, poll_initial=0.05, poll_max=0.1)
+        elapsed = time.monotonic() - start
+        self.assertFalse(result)
+        self.assertGreaterEqual(elapsed, 0.3)
+        self.assertLess(elapsed, 1)
+        self.assertFalse(get_wait_timings()[0]['success'])
+
+    def test_wait_until_predicate_exception(self):
+        """Tests wait_until keeps polling when the predicate raises an exception (not ready yet)"""
+        calls = []
+
+        def predicate():
+            calls.append(1)
+            if len(calls) < 2:
+                raise LookupError("element not found yet")
+            return True
+
+        self.assertTrue(wait_until(predicate, description="exception", timeout=5, poll_initial=0.01))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Summary: Will test functions in Selenium_googleDriveTestUpload_WorkerPool module that have expected python results
+    (not Selenium or Google API): the job/result flow, with the workers run as threads and stand-ins for the browser
+    connection and the scenarios (no browser is launched)
+"""
+import Selenium_googleDriveTestUpload_WorkerPool as WorkerPool
+import queue
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+
+class FakeDriver:
+    """Stand-in for a worker's Chrome webdriver"""
+
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+class TestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.drivers = []
+        self.patches = [mock.patch.object(WorkerPool, "start_logging"),
+                        mock.patch.object(WorkerPool, "configure_keyring_googledrive"),
+                        mock.patch.object(WorkerPool, "ensure_profile_template"),
+                        mock.patch.dict(WorkerPool.SCENARIOS, {'upload': self.fake_scenario}),
+                        # workers as threads, so they see the stand-ins
+                        mock.patch.object(WorkerPool.multiprocessing, "get_context",
+                                          return_value=SimpleNamespace(Queue=queue.Queue, Process=threading.Thread))]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+
+    def fake_connect(self, **kwargs):
+        driver = FakeDriver()
+        self.drivers.append(driver)
+        return driver
+
+    def fake_scenario(self, driver, run_id: str, fldname: str = ""):
+        if fldname == "fail":
+            raise RuntimeError("upload failed")
+        return {'run_id': run_id, 'fldname': fldname}
+
+    def test_run_scenarios_parallel(self):
+        """Tests every job is run once and reported in job order, with its own run ID (unless it has one), a failed
+        job is reported with its error, and every worker's driver is quit"""
+        jobs = [{'scenario': "upload", 'kwargs': {'fldname': "Testing Folder (Selenium)"}},
+                {'scenario': "upload", 'kwargs': {'fldname': "fail"}},
+                {'scenario': "upload", 'kwargs': {'fldname': "Testing Folder (Selenium)", 'run_id': "myrun"}}]
+
+        with mock.patch.object(WorkerPool, "connect_googledrive_profile", side_effect=self.fake_connect):
+            summary = WorkerPool.run_scenarios_parallel(servicename="", username="", jobs=jobs, workers=2)
+
+        self.assertEqual((summary['jobs'], summary['passed'], summary['failed']), (3, 2, 1))
+        self.assertEqual([result['job'] for result in summary['results']], [0, 1, 2])
+        self.assertEqual(summary['results'][0]['result']['run_id'], summary['results'][0]['run_id'])
+        self.assertEqual(summary['results'][1]['error'], "upload failed")
+        self.assertEqual(summary['results'][2]['run_id'], "myrun")
+        self.assertEqual(len({result['run_id'] for result in summary['results']}), 3)
+        self.assertEqual(len(self.drivers), 2)
+        self.assertTrue(all(driver.quit_called for driver in self.drivers))
+
+    def test_run_scenarios_parallel_login_fails(self):
+        """Tests that if the workers can't connect, every job is still reported, as failed with the login error"""
+        jobs = [{'scenario': "upload", 'kwargs': {'fldname': "Testing Folder (Selenium)"}}] * 3
+
+        with mock.patch.object(WorkerPool, "connect_googledrive_profile", side_effect=RuntimeError("no chrome")):
+            summary = WorkerPool.run_scenarios_parallel(servicename="", username="", jobs=jobs, workers=2)
+
+        self.assertEqual((summary['passed'], summary['failed']), (0, 3))
+        self.assertTrue(all("no chrome" in result['error'] for result in summary['results']))
+
+    def test_run_scenarios_parallel_unknown_scenario(self):
+        """Tests an unknown scenario is refused before any worker is started"""
+        with mock.patch.object(WorkerPool, "connect_googledrive_profile", side_effect=self.fake_connect):
+            with self.assertRaises(ValueError):
+                WorkerPool.run_scenarios_parallel(servicename="", username="", jobs=[{'scenario': "download"}])
+
+        self.assertEqual(self.drivers, [])
+
+
+if __name__ == '__main__':
+    unittest.main()